@@ -1,13 +1,16 @@
 """Handlers for all OLS-related REST API endpoints."""
 
+import asyncio
 import dataclasses
+import functools
 import json
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Generator, Optional, Union
+from typing import Any, Callable, Generator, Optional, TypeVar, Union
 
 import psycopg2
 import pytz
@@ -40,7 +43,9 @@ from ols.src.query_helpers.question_validator import QuestionValidator
 from ols.src.quota.quota_limiter import QuotaLimiter
 from ols.src.quota.token_usage_history import TokenUsageHistory
 from ols.utils import errors_parsing, suid
-from ols.utils.token_handler import PromptTooLongError
+from ols.utils.background_writer import BackgroundWriter
+from ols.utils.token_handler import PromptTooLongError, TokenHandler
+from ols.utils.transcript_segments import get_segment_writer
 
 KEYWORDS = keywords.KEYWORDS
 INVALID_QUERY_RESP = prompts.INVALID_QUERY_RESP
@@ -50,6 +55,30 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["query"])
 auth_dependency = get_auth_dependency(config.ols_config, virtual_path="/ols-access")
 
+# bounded executor for blocking calls made by async endpoints
+blocking_calls_executor = ThreadPoolExecutor(
+    max_workers=constants.BLOCKING_CALLS_MAX_WORKERS,
+    thread_name_prefix="ols-blocking",
+)
+
+# transcripts are written in background, nobody waits for them
+transcripts_writer = BackgroundWriter(
+    "ols-transcripts",
+    max_workers=constants.TRANSCRIPTS_WRITER_MAX_WORKERS,
+    max_pending=constants.TRANSCRIPTS_WRITER_MAX_PENDING,
+)
+
+T = TypeVar("T")
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking function in bounded executor, not blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        blocking_calls_executor, functools.partial(func, *args, **kwargs)
+    )
+
+
 query_responses: dict[int | str, dict[str, Any]] = {
     200: {
         "description": "Query is valid and correct response from LLM is returned",
@@ -106,7 +135,7 @@ def merge_tools_info(tool_calls: list[dict], tool_results: list[dict]) -> list[d
 
 
 @router.post("/query", responses=query_responses)
-def conversation_request(
+async def conversation_request(
     llm_request: LLMRequest,
     auth: Any = Depends(auth_dependency),
     user_id: Optional[str] = None,
@@ -121,9 +150,9 @@ def conversation_request(
     Returns:
         Response containing the processed information.
     """
-    processed_request = process_request(auth, llm_request)
+    processed_request = await run_blocking(process_request, auth, llm_request)
 
-    summarizer_response: SummarizerResponse | Generator
+    summarizer_response: SummarizerResponse
 
     if not processed_request.valid:
         # response containing info about query that can not be validated
@@ -134,11 +163,10 @@ def conversation_request(
             None,
         )
     else:
-        summarizer_response = generate_response(
+        summarizer_response = await agenerate_response(
             processed_request.conversation_id,
             llm_request,
             processed_request.previous_input,
-            streaming=False,
             user_token=processed_request.user_token,
         )
 
@@ -190,7 +218,8 @@ def conversation_request(
             )
         )
 
-    store_conversation_history(
+    await run_blocking(
+        store_conversation_history,
         processed_request.user_id,
         processed_request.conversation_id,
         llm_request,
@@ -203,7 +232,8 @@ def conversation_request(
     if config.ols_config.user_data_collection.transcripts_disabled:
         logger.debug("transcripts collections is disabled in configuration")
     else:
-        store_transcript(
+        await transcripts_writer.submit(
+            store_transcript,
             processed_request.user_id,
             processed_request.conversation_id,
             processed_request.valid,
@@ -229,7 +259,8 @@ def conversation_request(
     input_tokens = calc_input_tokens(summarizer_response.token_counter)
     output_tokens = calc_output_tokens(summarizer_response.token_counter)
 
-    consume_tokens(
+    await run_blocking(
+        consume_tokens,
         config.quota_limiters,
         config.token_usage_history,
         processed_request.user_id,
@@ -239,8 +270,8 @@ def conversation_request(
         llm_request.model or config.ols_config.default_model,
     )
 
-    available_quotas = get_available_quotas(
-        config.quota_limiters, processed_request.user_id
+    available_quotas = await run_blocking(
+        get_available_quotas, config.quota_limiters, processed_request.user_id
     )
 
     return LLMResponse(
@@ -359,7 +390,10 @@ def process_request(auth: Any, llm_request: LLMRequest) -> ProcessedRequest:
     )
 
     previous_input = retrieve_previous_input(
-        user_id, llm_request.conversation_id, skip_user_id_check
+        user_id,
+        llm_request.conversation_id,
+        skip_user_id_check,
+        max_tokens=history_tokens_limit(llm_request),
     )
     timestamps["retrieve previous input"] = time.time()
 
@@ -496,15 +530,46 @@ def retrieve_conversation_id(llm_request: LLMRequest) -> str:
     return conversation_id
 
 
+def history_tokens_limit(llm_request: LLMRequest) -> Optional[int]:
+    """Get the most tokens conversation history can take in the model's prompt.
+
+    Only the history fitting into the context window is read from cache,
+    the history is truncated to the tokens really available when the prompt
+    is generated.
+    """
+    provider = llm_request.provider or config.ols_config.default_provider
+    model = llm_request.model or config.ols_config.default_model
+    provider_config = config.llm_config.providers.get(provider)
+    model_config = provider_config.models.get(model) if provider_config else None
+    if model_config is None:
+        # unknown provider/model is reported by its validation
+        return None
+    return (
+        model_config.context_window_size
+        - model_config.parameters.max_tokens_for_response
+    )
+
+
 def retrieve_previous_input(
-    user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    user_id: str,
+    conversation_id: str,
+    skip_user_id_check: bool = False,
+    max_tokens: Optional[int] = None,
 ) -> list[CacheEntry]:
-    """Retrieve previous user input, if exists."""
+    """Retrieve previous user input, if exists.
+
+    Only the most recent entries, not exceeding `max_tokens` tokens, are
+    retrieved (plus the entry exceeding the limit, so it is known that
+    the history is truncated).
+    """
     try:
         previous_input = []
         if conversation_id:
-            cache_content = config.conversation_cache.get(
-                user_id, conversation_id, skip_user_id_check
+            cache_content = config.conversation_cache.get_tail(
+                user_id,
+                conversation_id,
+                max_tokens=max_tokens,
+                skip_user_id_check=skip_user_id_check,
             )
             if cache_content is not None:
                 previous_input = cache_content
@@ -593,29 +658,71 @@ def generate_response(
         )
         logger.debug("%s Generated response: %s", conversation_id, response)
         return response
-    except PromptTooLongError as summarizer_error:
+    except Exception as summarizer_error:
+        raise summarizer_http_exception(summarizer_error)
+
+
+async def agenerate_response(
+    conversation_id: str,
+    llm_request: LLMRequest,
+    previous_input: list[CacheEntry],
+    user_token: Optional[str] = None,
+) -> SummarizerResponse:
+    """Generate complete response without blocking the event loop.
+
+    Args:
+        conversation_id: The unique identifier for the conversation.
+        llm_request: The request containing a query.
+        previous_input: The history of the conversation (if available).
+        user_token: The user token used for authorization.
+
+    Returns:
+        SummarizerResponse with the complete response.
+    """
+    try:
+        docs_summarizer = await run_blocking(
+            DocsSummarizer,
+            provider=llm_request.provider,
+            model=llm_request.model,
+            system_prompt=llm_request.system_prompt,
+            user_token=user_token,
+        )
+        history = CacheEntry.cache_entries_to_history(previous_input)
+        response = await docs_summarizer.acreate_response(
+            llm_request.query,
+            config.rag_index_loader.get_retriever(),
+            history,
+        )
+        logger.debug("%s Generated response: %s", conversation_id, response)
+        return response
+    except Exception as summarizer_error:
+        raise summarizer_http_exception(summarizer_error)
+
+
+def summarizer_http_exception(summarizer_error: Exception) -> HTTPException:
+    """Log error raised during response generation and convert it to HTTP exception."""
+    if isinstance(summarizer_error, PromptTooLongError):
         logger.error("Prompt is too long: %s", summarizer_error)
-        raise HTTPException(
+        return HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail={
                 "response": "Prompt is too long",
                 "cause": str(summarizer_error),
             },
         )
-    except Exception as summarizer_error:
-        logger.error("Error while obtaining answer for user question")
-        logger.exception(summarizer_error)
-        status_code, response_text, cause = errors_parsing.parse_generic_llm_error(
-            summarizer_error
-        )
-        response_text, cause = errors_parsing.handle_known_errors(response_text, cause)
-        raise HTTPException(
-            status_code=status_code,
-            detail={
-                "response": response_text,
-                "cause": cause,
-            },
-        )
+    logger.error("Error while obtaining answer for user question")
+    logger.exception(summarizer_error)
+    status_code, response_text, cause = errors_parsing.parse_generic_llm_error(
+        summarizer_error
+    )
+    response_text, cause = errors_parsing.handle_known_errors(response_text, cause)
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "response": response_text,
+            "cause": cause,
+        },
+    )
 
 
 def validate_requested_provider_model(llm_request: LLMRequest) -> None:
@@ -670,6 +777,12 @@ def store_conversation_history(
             if llm_request.model:
                 response_message.response_metadata["model"] = llm_request.model
 
+            # tokens are counted just once, when messages are stored, so
+            # history truncation does not need to encode whole history again
+            token_handler = TokenHandler()
+            token_handler.store_message_tokens_count(query_message)
+            token_handler.store_message_tokens_count(response_message)
+
             cache_entry = CacheEntry(
                 query=query_message,
                 response=response_message,
@@ -861,6 +974,9 @@ def store_transcript(
 ) -> None:
     """Store transcript in the local filesystem.
 
+    Transcript is stored in its own file, or appended to segment file when
+    transcript segments are configured.
+
     Args:
         user_id: The user ID (UUID).
         conversation_id: The conversation ID (UUID).
@@ -874,12 +990,6 @@ def store_transcript(
         tool_results: The list of tool results.
         attachments: The list of `Attachment` objects.
     """
-    # Creates transcripts path only if it doesn't exist. The `exist_ok=True` prevents
-    # race conditions in case of multiple server instances trying to set up transcripts
-    # at the same location.
-    transcripts_path = construct_transcripts_path(user_id, conversation_id)
-    transcripts_path.mkdir(parents=True, exist_ok=True)
-
     data_to_store = {
         "metadata": {
             "provider": llm_request.provider or config.ols_config.default_provider,
@@ -897,6 +1007,21 @@ def store_transcript(
         "attachments": [attachment.model_dump() for attachment in attachments],
     }
 
+    user_data_collection = config.ols_config.user_data_collection
+    if user_data_collection.transcripts_segments is not None:
+        get_segment_writer(
+            user_data_collection.transcripts_storage,  # type: ignore [arg-type]
+            user_data_collection.transcripts_segments,
+        ).append(data_to_store)
+        logger.debug("transcript appended to segment")
+        return
+
+    # Creates transcripts path only if it doesn't exist. The `exist_ok=True` prevents
+    # race conditions in case of multiple server instances trying to set up transcripts
+    # at the same location.
+    transcripts_path = construct_transcripts_path(user_id, conversation_id)
+    transcripts_path.mkdir(parents=True, exist_ok=True)
+
     # stores feedback in a file under unique uuid
     transcript_file_path = transcripts_path / f"{suid.get_suid()}.json"
     with open(transcript_file_path, "w", encoding="utf-8") as transcript_file:
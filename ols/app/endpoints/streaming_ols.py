@@ -4,16 +4,20 @@ This module defines the endpoint and supporting functions for handling
 streaming queries.
 """
 
+import asyncio
 import json
 import logging
 import time
+from collections.abc import Awaitable, Callable
+from contextlib import aclosing
 from typing import Any, AsyncGenerator, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from fastapi.responses import StreamingResponse
 from langchain_core.messages import ToolMessage
 
 from ols import config, constants
+from ols.app import metrics
 from ols.app.endpoints.ols import (
     calc_input_tokens,
     calc_output_tokens,
@@ -22,9 +26,12 @@ from ols.app.endpoints.ols import (
     get_available_quotas,
     log_processing_durations,
     process_request,
+    run_blocking,
     store_conversation_history,
     store_transcript,
+    transcripts_writer,
 )
+from ols.app.models.config import TokenCoalescingConfig
 from ols.app.models.models import (
     Attachment,
     ErrorResponse,
@@ -55,6 +62,14 @@ LLM_TOOL_CALL_EVENT = "tool_call"
 LLM_TOOL_RESULT_EVENT = "tool_result"
 
 
+# yielded by cancel_on_disconnect when no item was generated for a while
+STREAM_IDLE = object()
+
+
+class ClientDisconnectedError(Exception):
+    """Client disconnected before the response was streamed."""
+
+
 query_responses: dict[int | str, dict[str, Any]] = {
     200: {
         "description": "Query is valid and stream/events from endpoint is returned",
@@ -78,6 +93,7 @@ query_responses: dict[int | str, dict[str, Any]] = {
 @router.post("/streaming_query", responses=query_responses)
 def conversation_request(
     llm_request: LLMRequest,
+    request: Request,
     auth: Any = Depends(auth_dependency),
     user_id: Optional[str] = None,
 ) -> StreamingResponse:
@@ -85,6 +101,7 @@ def conversation_request(
 
     Args:
         llm_request: The incoming request containing query details.
+        request: The HTTP request, used to detect client disconnection.
         auth: The authentication context, provided by dependency injection.
         user_id: Optional user ID used only when no-op auth is enabled.
 
@@ -117,6 +134,7 @@ def conversation_request(
             llm_request.media_type,
             processed_request.timestamps,
             processed_request.skip_user_id_check,
+            request.is_disconnected,
         ),
         status_code=status.HTTP_200_OK,
         media_type=llm_request.media_type,
@@ -132,6 +150,166 @@ async def invalid_response_generator() -> AsyncGenerator[StreamedChunk, None]:
     yield StreamedChunk(type="text", text=INVALID_QUERY_RESP)
 
 
+async def cancel_on_disconnect(  # noqa: C901
+    generator: AsyncGenerator[Any, None],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    check_interval: float = constants.STREAMING_DISCONNECT_CHECK_INTERVAL,
+    idle_interval: Optional[float] = None,
+) -> AsyncGenerator[Any, None]:
+    """Iterate the generator until the client disconnects.
+
+    The generator runs in its own task, so it is cancelled even while it
+    waits for the LLM or tools and nothing is sent to the client.
+    Cancellation propagates into LLM streaming and tool calls.
+
+    Args:
+        generator: The async generator providing summarizer responses.
+        is_disconnected: Check whether the client disconnected.
+        check_interval: How often (in seconds) the client connection is checked.
+        idle_interval: Yield `STREAM_IDLE` when the generator provides no
+            item for this many seconds (eg. to flush buffered tokens).
+
+    Yields:
+        Items provided by the generator.
+
+    Raises:
+        ClientDisconnectedError: When the client disconnected.
+    """
+    items: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+    async def produce() -> None:
+        async with aclosing(generator):
+            async for item in generator:
+                await items.put(item)
+
+    producer = asyncio.create_task(produce())
+    last_check = time.monotonic()
+    try:
+        while True:
+            if time.monotonic() - last_check >= check_interval:
+                if await is_disconnected():
+                    producer.cancel()
+                    await asyncio.wait({producer})
+                    raise ClientDisconnectedError
+                last_check = time.monotonic()
+            if not items.empty():
+                yield items.get_nowait()
+                continue
+            if producer.done():
+                # re-raise error from the generator, if any
+                producer.result()
+                return
+            timeout = max(0.0, check_interval - (time.monotonic() - last_check))
+            if idle_interval is not None:
+                timeout = min(timeout, idle_interval)
+            getter = asyncio.ensure_future(items.get())
+            done, _ = await asyncio.wait(
+                {getter, producer},
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if getter in done:
+                yield getter.result()
+                continue
+            # item stays in the queue, when it was not taken yet
+            getter.cancel()
+            if idle_interval is not None and not done:
+                yield STREAM_IDLE
+    finally:
+        producer.cancel()
+
+
+def record_cancelled_generation(llm_request: LLMRequest, streamed_tokens: int) -> None:
+    """Record generation cancelled because client disconnected.
+
+    Args:
+        llm_request: The original request.
+        streamed_tokens: Number of tokens streamed before the cancellation.
+    """
+    provider = llm_request.provider or config.ols_config.default_provider
+    model = llm_request.model or config.ols_config.default_model
+    metrics.llm_generations_cancelled_total.labels(provider, model).inc()
+
+    # the generation could use at most max_tokens_for_response tokens
+    try:
+        max_tokens = (
+            config.llm_config.providers[provider]  # type: ignore [index]
+            .models[model]  # type: ignore [index]
+            .parameters.max_tokens_for_response
+        )
+    except KeyError:
+        max_tokens = constants.DEFAULT_MAX_TOKENS_FOR_RESPONSE
+    saved_tokens = max(0, max_tokens - streamed_tokens)
+    metrics.llm_token_saved_total.labels(provider, model).inc(saved_tokens)
+
+
+def token_coalescing(llm_request: LLMRequest) -> TokenCoalescingConfig:
+    """Get token coalescing configuration, request can override any option."""
+    coalescing = config.ols_config.token_coalescing
+    if llm_request.token_coalescing is None:
+        return coalescing
+    return coalescing.model_copy(
+        update=llm_request.token_coalescing.model_dump(exclude_unset=True)
+    )
+
+
+class TokenCoalescer:
+    """Coalesces token events, so they are sent in fewer, larger writes.
+
+    Every token is still sent as its own event (with its own id), only the
+    events are buffered and written together.
+    """
+
+    def __init__(self, media_type: str, coalescing: TokenCoalescingConfig) -> None:
+        """Initialize token coalescer."""
+        self.media_type = media_type
+        self.max_tokens = coalescing.max_tokens
+        self.max_bytes = coalescing.max_bytes
+        self.max_delay = coalescing.max_delay_ms / 1000
+        self._events: list[str] = []
+        self._size = 0
+        self._first_at = 0.0
+
+    @property
+    def flush_interval(self) -> Optional[float]:
+        """How often buffered tokens need to be checked, None when not buffered."""
+        if self.max_tokens == 1 or self.max_delay == 0:
+            return None
+        return self.max_delay
+
+    def add(self, idx: int, token: str) -> str:
+        """Buffer token event.
+
+        Returns:
+            str: Buffered events when they should be sent, empty string otherwise.
+        """
+        event = token_event(idx, token, self.media_type)
+        if not self._events:
+            self._first_at = time.monotonic()
+        self._events.append(event)
+        self._size += len(event)
+        if (
+            len(self._events) >= self.max_tokens
+            or self._size >= self.max_bytes
+            or self.due()
+        ):
+            return self.flush()
+        return ""
+
+    def due(self) -> bool:
+        """Check if the oldest buffered token waits for too long."""
+        return bool(self._events) and (
+            time.monotonic() - self._first_at >= self.max_delay
+        )
+
+    def flush(self) -> str:
+        """Return all buffered events and clear the buffer."""
+        events = "".join(self._events)
+        self._events.clear()
+        self._size = 0
+        return events
+
+
 def format_stream_data(d: dict) -> str:
     """Format outbound data in the Event Stream Format."""
     data = json.dumps(d)
@@ -182,6 +360,28 @@ def stream_event(data: dict, event_type: str, media_type: str) -> str:
     )
 
 
+def token_event(idx: int, token: str, media_type: str) -> str:
+    """Build token event, same as `stream_event` for token data.
+
+    Token events are the most frequent ones, so only the token itself is
+    JSON encoded.
+
+    Args:
+        idx: Index of the token in the response.
+        token: The token text.
+        media_type: Media type of the response (e.g. text or JSON).
+
+    Returns:
+        str: The formatted string or JSON to yield.
+    """
+    if media_type == MEDIA_TYPE_TEXT:
+        return token
+    return (
+        f'data: {{"event": "{LLM_TOKEN_EVENT}", '
+        f'"data": {{"id": {idx}, "token": {json.dumps(token)}}}}}\n\n'
+    )
+
+
 def stream_end_event(
     ref_docs: list[dict],
     truncated: bool,
@@ -283,7 +483,7 @@ def generic_llm_error(error: Exception, media_type: str) -> str:
     )
 
 
-def store_data(
+async def store_data(
     user_id: str,
     conversation_id: str,
     llm_request: LLMRequest,
@@ -300,6 +500,10 @@ def store_data(
 ) -> None:
     """Store conversation history and transcript if enabled.
 
+    Blocking writes are performed outside of the event loop. History is
+    stored before returning, so it is available for the next question
+    in the conversation, while transcript is written in background.
+
     Args:
         user_id: The user ID (UUID).
         conversation_id: The conversation ID (UUID).
@@ -315,7 +519,8 @@ def store_data(
         timestamps: Dictionary tracking timestamps for various stages.
         skip_user_id_check: Skip user_id usid check.
     """
-    store_conversation_history(
+    await run_blocking(
+        store_conversation_history,
         user_id,
         conversation_id,
         llm_request,
@@ -326,7 +531,8 @@ def store_data(
     )
 
     if not config.ols_config.user_data_collection.transcripts_disabled:
-        store_transcript(
+        await transcripts_writer.submit(
+            store_transcript,
             user_id,
             conversation_id,
             valid,
@@ -342,7 +548,7 @@ def store_data(
     timestamps["store transcripts"] = time.time()
 
 
-async def response_processing_wrapper(
+async def response_processing_wrapper(  # noqa: C901
     generator: AsyncGenerator[Any, None],
     user_id: str,
     conversation_id: str,
@@ -353,9 +559,13 @@ async def response_processing_wrapper(
     media_type: str,
     timestamps: dict[str, float],
     skip_user_id_check: bool,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
 ) -> AsyncGenerator[str, None]:
     """Process the response from the generator and handle metadata and errors.
 
+    When the client disconnects, generation of the response is cancelled
+    and neither conversation history nor quota usage is stored.
+
     Args:
         generator: The async generator providing summarizer responses.
         user_id: The user ID (UUID).
@@ -367,10 +577,17 @@ async def response_processing_wrapper(
         media_type: Media type of the response (e.g. text or JSON).
         timestamps: Dictionary tracking timestamps for various stages.
         skip_user_id_check: Skip user_id usid check.
+        is_disconnected: Check whether the client disconnected.
 
     Yields:
         str: The response items or error messages.
     """
+    coalescer = TokenCoalescer(media_type, token_coalescing(llm_request))
+    if is_disconnected is not None:
+        generator = cancel_on_disconnect(
+            generator, is_disconnected, idle_interval=coalescer.flush_interval
+        )
+
     if media_type == constants.MEDIA_TYPE_JSON:
         yield stream_start_event(conversation_id)
 
@@ -384,31 +601,33 @@ async def response_processing_wrapper(
 
     try:
         async for item in generator:
+            if item is STREAM_IDLE:
+                # don't keep tokens buffered while waiting for the LLM
+                if coalescer.due():
+                    yield coalescer.flush()
+                continue
             if not isinstance(item, StreamedChunk):
                 msg = f"Expecting StreamedChunk, but got {type(item)}: {item}"
                 logger.error(msg)
                 raise ValueError(msg)
             if item.type == "tool_call":
                 tool_calls.append(item.data)
-                yield stream_event(
+                yield coalescer.flush() + stream_event(
                     data=item.data,
                     event_type=LLM_TOOL_CALL_EVENT,
                     media_type=media_type,
                 )
             elif item.type == "tool_result":
                 tool_results.append(item.data)
-                yield stream_event(
+                yield coalescer.flush() + stream_event(
                     data=item.data,
                     event_type=LLM_TOOL_RESULT_EVENT,
                     media_type=media_type,
                 )
             elif item.type == "text":
                 response += item.text
-                yield stream_event(
-                    data={"id": idx, "token": item.text},
-                    event_type=LLM_TOKEN_EVENT,
-                    media_type=media_type,
-                )
+                if events := coalescer.add(idx, item.text):
+                    yield events
                 idx += 1
             elif item.type == "end":
                 rag_chunks = item.data["rag_chunks"]
@@ -421,14 +640,29 @@ async def response_processing_wrapper(
                 )
                 logger.error(msg)
                 raise ValueError(msg)
+    except ClientDisconnectedError:
+        logger.info(
+            "Client disconnected, response generation for conversation %s cancelled",
+            conversation_id,
+        )
+        record_cancelled_generation(llm_request, idx)
+        return  # nothing to store, response was not provided
+
     except PromptTooLongError as summarizer_error:
-        yield prompt_too_long_error(summarizer_error, media_type)
+        yield coalescer.flush() + prompt_too_long_error(summarizer_error, media_type)
         return  # stop execution after error
 
     except Exception as summarizer_error:
-        yield generic_llm_error(summarizer_error, media_type)
+        yield coalescer.flush() + generic_llm_error(summarizer_error, media_type)
         return  # stop execution after error
 
+    finally:
+        # stops generation also when sending to client failed
+        await generator.aclose()
+
+    if events := coalescer.flush():
+        yield events
+
     timestamps["generate response"] = time.time()
 
     # Log assistant's answer in JSON format
@@ -445,7 +679,7 @@ async def response_processing_wrapper(
         )
     )
 
-    store_data(
+    await store_data(
         user_id,
         conversation_id,
         llm_request,
@@ -464,7 +698,8 @@ async def response_processing_wrapper(
     input_tokens = calc_input_tokens(token_counter)
     output_tokens = calc_output_tokens(token_counter)
 
-    consume_tokens(
+    await run_blocking(
+        consume_tokens,
         config.quota_limiters,
         config.token_usage_history,
         user_id,
@@ -474,7 +709,9 @@ async def response_processing_wrapper(
         llm_request.model or config.ols_config.default_model,
     )
 
-    available_quotas = get_available_quotas(config.quota_limiters, user_id)
+    available_quotas = await run_blocking(
+        get_available_quotas, config.quota_limiters, user_id
+    )
 
     yield stream_end_event(
         build_referenced_docs(rag_chunks),
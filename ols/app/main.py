@@ -1,5 +1,6 @@
 """Entry point to FastAPI-based web service."""
 
+import asyncio
 import logging
 from collections.abc import AsyncGenerator, Awaitable, Callable
 
@@ -10,7 +11,9 @@ from starlette.routing import Mount, Route, WebSocketRoute
 
 from ols import config, constants, version
 from ols.app import metrics, routers
+from ols.app.endpoints.ols import transcripts_writer
 from ols.customize import metadata
+from ols.utils.transcript_segments import close_segment_writers
 
 app = FastAPI(
     title=f"Swagger {metadata.SERVICE_NAME} service - OpenAPI",
@@ -145,6 +148,17 @@ async def log_requests_responses(
     return response
 
 
+async def flush_background_writes() -> None:
+    """Wait for pending background writes before the service stops."""
+    await asyncio.to_thread(
+        transcripts_writer.flush, constants.BACKGROUND_WRITES_FLUSH_TIMEOUT
+    )
+    # buffered transcripts are written once all of them are submitted
+    await asyncio.to_thread(close_segment_writers)
+
+
+app.router.on_shutdown.append(flush_background_writes)
+
 routers.include_routers(app)
 
 app_routes_paths = [
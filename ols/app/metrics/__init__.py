@@ -4,7 +4,9 @@ from .metrics import (
     llm_calls_failures_total,
     llm_calls_total,
     llm_calls_validation_errors_total,
+    llm_generations_cancelled_total,
     llm_token_received_total,
+    llm_token_saved_total,
     llm_token_sent_total,
     provider_model_configuration,
     response_duration_seconds,
@@ -19,7 +21,9 @@ __all__ = [
     "llm_calls_failures_total",
     "llm_calls_total",
     "llm_calls_validation_errors_total",
+    "llm_generations_cancelled_total",
     "llm_token_received_total",
+    "llm_token_saved_total",
     "llm_token_sent_total",
     "provider_model_configuration",
     "response_duration_seconds",
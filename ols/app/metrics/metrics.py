@@ -47,6 +47,17 @@ llm_token_received_total = Counter(
     "ols_llm_token_received_total", "LLM tokens received", ["provider", "model"]
 )
 
+llm_generations_cancelled_total = Counter(
+    "ols_llm_generations_cancelled_total",
+    "LLM generations cancelled because client disconnected",
+    ["provider", "model"],
+)
+llm_token_saved_total = Counter(
+    "ols_llm_token_saved_total",
+    "LLM tokens not generated because client disconnected (upper bound estimate)",
+    ["provider", "model"],
+)
+
 # metric that indicates what provider + model customers are using so we can
 # understand what is popular/important
 provider_model_configuration = Gauge(
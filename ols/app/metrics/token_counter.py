@@ -1,7 +1,7 @@
 """Helper classes to count tokens sent and received by the LLM."""
 
 import logging
-from typing import Any
+from typing import Any, Optional
 
 from langchain.callbacks.base import AsyncCallbackHandler
 from langchain.llms.base import LLM
@@ -24,17 +24,24 @@ class GenericTokenCounter(AsyncCallbackHandler):  # pylint: disable=R0901
     - input_tokens_counted: number of input tokens counted by the handler
     - output_tokens: number of tokens received from LLM
     - llm_calls: number of LLM calls
+
+    Every following LLM call (tool calling round) sends the previous prompt
+    extended by new messages, so only the new suffix is encoded.
     """
 
-    def __init__(self, llm: LLM) -> None:
+    def __init__(self, llm: LLM, prompt_tokens: Optional[int] = None) -> None:
         """Initialize the token counter callback handler.
 
         Args:
             llm: The LLM instance.
+            prompt_tokens: Tokens of the first prompt if they are already known.
         """
         self.token_counter = TokenCounter()
         self.token_counter.llm = llm  # actual LLM instance
         self.token_handler = TokenHandler()  # used for counting input and output tokens
+        self.prompt_tokens = prompt_tokens
+        # last counted prompt together with its tokens count
+        self._counted_prompt: Optional[tuple[str, int]] = None
 
     async def on_llm_new_token(
         self,
@@ -51,12 +58,30 @@ class GenericTokenCounter(AsyncCallbackHandler):  # pylint: disable=R0901
         """Run when LLM starts running."""
         self.token_counter.llm_calls += 1
         for p in prompts:
-            self.token_counter.input_tokens += self.tokens_count(p)
+            self.token_counter.input_tokens += self.prompt_tokens_count(p)
 
     def tokens_count(self, text: str) -> int:
         """Compute tokens count for given input text."""
         return len(self.token_handler.text_to_tokens(text))
 
+    def prompt_tokens_count(self, prompt: str) -> int:
+        """Compute tokens count for prompt, reusing already counted prompt prefix."""
+        if self._counted_prompt is not None:
+            counted_prompt, counted_tokens = self._counted_prompt
+            if prompt.startswith(counted_prompt):
+                count = counted_tokens + self.tokens_count(
+                    prompt[len(counted_prompt) :]
+                )
+                self._counted_prompt = (prompt, count)
+                return count
+
+        if self.prompt_tokens is not None:
+            count, self.prompt_tokens = self.prompt_tokens, None
+        else:
+            count = self.tokens_count(prompt)
+        self._counted_prompt = (prompt, count)
+        return count
+
     def __str__(self) -> str:
         """Textual representation of GenericTokenCounter instance."""
         return (
@@ -92,15 +117,22 @@ class TokenMetricUpdater:
         ```
     """
 
-    def __init__(self, llm: LLM, provider: str, model: str) -> None:
+    def __init__(
+        self,
+        llm: LLM,
+        provider: str,
+        model: str,
+        prompt_tokens: Optional[int] = None,
+    ) -> None:
         """Initialize the token counter context manager.
 
         Args:
             llm: The LLM instance.
             provider: The provider name for labeling the metrics.
             model: The model name for labeling the metrics.
+            prompt_tokens: Tokens of the first prompt if they are already known.
         """
-        self.token_counter = GenericTokenCounter(llm=llm)
+        self.token_counter = GenericTokenCounter(llm=llm, prompt_tokens=prompt_tokens)
         self.provider = provider
         self.model = model
 
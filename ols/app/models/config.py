@@ -1,5 +1,6 @@
 """Config classes for the configuration structure."""
 
+import importlib.util
 import logging
 import os
 import re
@@ -11,6 +12,8 @@ from pydantic import (
     DirectoryPath,
     Field,
     FilePath,
+    NonNegativeInt,
+    PositiveFloat,
     PositiveInt,
     field_validator,
     model_validator,
@@ -182,6 +185,10 @@ class AuthenticationConfig(BaseModel):
     skip_tls_verification: bool = False
     k8s_cluster_api: Optional[AnyHttpUrl] = None
     k8s_ca_cert_path: Optional[FilePath] = None
+    k8s_auth_cache_max_entries: NonNegativeInt = constants.K8S_AUTH_CACHE_MAX_ENTRIES
+    k8s_auth_cache_ttl: NonNegativeInt = constants.K8S_AUTH_CACHE_TTL
+    k8s_auth_cache_negative_ttl: NonNegativeInt = constants.K8S_AUTH_CACHE_NEGATIVE_TTL
+    k8s_connection_pool_size: PositiveInt = constants.K8S_CONNECTION_POOL_SIZE
 
     def validate_yaml(self) -> None:
         """Validate YAML containing authentication configuration section."""
@@ -603,6 +610,12 @@ class MCPServerConfig(BaseModel):
     stdio: Optional[StdioTransportConfig] = None
     sse: Optional[SseTransportConfig] = None
     streamable_http: Optional[StreamableHttpTransportConfig] = None
+    # read-only tools which results can be reused for the same user
+    cacheable_tools: list[str] = []
+    tool_results_cache_ttl: PositiveInt = constants.MCP_TOOL_RESULTS_CACHE_TTL
+    # timeout of tool calls (in seconds), can be overridden for each tool
+    tool_timeout: PositiveInt = constants.MCP_TOOL_CALL_TIMEOUT
+    tool_timeouts: dict[str, PositiveInt] = {}
 
     @model_validator(mode="after")
     def correct_transport_specified(self) -> Self:
@@ -668,6 +681,8 @@ class PostgresConfig(BaseModel):
     gss_encmode: str = constants.POSTGRES_CACHE_GSSENCMODE
     ca_cert_path: Optional[FilePath] = None
     max_entries: PositiveInt = constants.POSTGRES_CACHE_MAX_ENTRIES
+    min_connections: NonNegativeInt = constants.POSTGRES_CACHE_MIN_CONNECTIONS
+    max_connections: PositiveInt = constants.POSTGRES_CACHE_MAX_CONNECTIONS
 
     def __init__(self, **data: Any) -> None:
         """Initialize configuration."""
@@ -682,6 +697,8 @@ class PostgresConfig(BaseModel):
         """Validate Postgres cache config."""
         if not 0 < self.port < 65536:
             raise ValueError("The port needs to be between 0 and 65536")
+        if self.min_connections > self.max_connections:
+            raise ValueError("min_connections can't be greater than max_connections")
         return self
 
 
@@ -689,6 +706,7 @@ class InMemoryCacheConfig(BaseModel):
     """In-memory cache configuration."""
 
     max_entries: Optional[int] = None
+    max_bytes: Optional[int] = None
 
     def __init__(self, data: Optional[dict] = None) -> None:
         """Initialize configuration and perform basic validation."""
@@ -708,16 +726,119 @@ class InMemoryCacheConfig(BaseModel):
                 " max_entries needs to be a non-negative integer"
             ) from e
 
+        max_bytes = data.get("max_bytes", constants.IN_MEMORY_CACHE_MAX_BYTES)
+        if max_bytes is not None:
+            try:
+                self.max_bytes = int(max_bytes)
+                if self.max_bytes <= 0:
+                    raise ValueError
+            except ValueError as e:
+                raise checks.InvalidConfigurationError(
+                    "invalid max_bytes for memory conversation cache,"
+                    " max_bytes needs to be a positive integer"
+                ) from e
+
     def __eq__(self, other: object) -> bool:
         """Compare two objects for equality."""
         if isinstance(other, InMemoryCacheConfig):
-            return self.max_entries == other.max_entries
+            return (
+                self.max_entries == other.max_entries
+                and self.max_bytes == other.max_bytes
+            )
         return False
 
     def validate_yaml(self) -> None:
         """Validate memory cache config."""
 
 
+class ShardedInMemoryCacheConfig(InMemoryCacheConfig):
+    """Sharded in-memory cache configuration.
+
+    The limits are global (divided between shards) unless `capacity_per_shard`
+    is set, in which case they apply to every shard.
+    """
+
+    shards: int = constants.SHARDED_MEMORY_CACHE_SHARDS
+    capacity_per_shard: bool = False
+
+    def __init__(self, data: Optional[dict] = None) -> None:
+        """Initialize configuration and perform basic validation."""
+        super().__init__(data)
+        if data is None:
+            return
+
+        try:
+            self.shards = int(data.get("shards", constants.SHARDED_MEMORY_CACHE_SHARDS))
+            if self.shards <= 0:
+                raise ValueError
+        except ValueError as e:
+            raise checks.InvalidConfigurationError(
+                "invalid shards for sharded memory conversation cache,"
+                " shards needs to be a positive integer"
+            ) from e
+        self.capacity_per_shard = data.get("capacity_per_shard", False)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare two objects for equality."""
+        if isinstance(other, ShardedInMemoryCacheConfig):
+            return (
+                super().__eq__(other)
+                and self.shards == other.shards
+                and self.capacity_per_shard == other.capacity_per_shard
+            )
+        return False
+
+    def shard_config(self) -> InMemoryCacheConfig:
+        """Construct configuration of one shard."""
+        shard_config = InMemoryCacheConfig()
+        shard_config.max_entries = self._shard_limit(self.max_entries)
+        shard_config.max_bytes = self._shard_limit(self.max_bytes)
+        return shard_config
+
+    def _shard_limit(self, limit: Optional[int]) -> Optional[int]:
+        """Compute limit of one shard, global limit is rounded up per shard."""
+        if limit is None or self.capacity_per_shard:
+            return limit
+        return -(-limit // self.shards)
+
+
+class TieredCacheConfig(BaseModel):
+    """Configuration of in-memory cache in front of Postgres cache."""
+
+    memory: Optional[InMemoryCacheConfig] = None
+    postgres: Optional[PostgresConfig] = None
+    invalidation: bool = False
+
+    def __init__(self, data: Optional[dict] = None) -> None:
+        """Initialize configuration and perform basic validation."""
+        super().__init__()
+        if data is None:
+            return
+
+        if constants.CACHE_TYPE_POSTGRES not in data:
+            raise checks.InvalidConfigurationError(
+                "tiered conversation cache requires Postgres configuration"
+            )
+        self.memory = InMemoryCacheConfig(data.get(constants.CACHE_TYPE_MEMORY, {}))
+        self.postgres = PostgresConfig(**data.get(constants.CACHE_TYPE_POSTGRES))
+        self.invalidation = data.get("invalidation", False)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare two objects for equality."""
+        if isinstance(other, TieredCacheConfig):
+            return (
+                self.memory == other.memory
+                and self.postgres == other.postgres
+                and self.invalidation == other.invalidation
+            )
+        return False
+
+    def validate_yaml(self) -> None:
+        """Validate tiered cache config."""
+        if self.memory is not None:
+            self.memory.validate_yaml()
+
+
 class QueryFilter(BaseModel):
     """QueryFilter configuration."""
 
@@ -770,9 +891,11 @@ class ConversationCacheConfig(BaseModel):
 
     type: Optional[str] = None
     memory: Optional[InMemoryCacheConfig] = None
+    sharded_memory: Optional[ShardedInMemoryCacheConfig] = None
     postgres: Optional[PostgresConfig] = None
+    tiered: Optional[TieredCacheConfig] = None
 
-    def __init__(self, data: Optional[dict] = None) -> None:
+    def __init__(self, data: Optional[dict] = None) -> None:  # noqa: C901
         """Initialize configuration and perform basic validation."""
         super().__init__()
         if data is None:
@@ -789,6 +912,15 @@ class ConversationCacheConfig(BaseModel):
                     self.memory = InMemoryCacheConfig(
                         data.get(constants.CACHE_TYPE_MEMORY)
                     )
+                case constants.CACHE_TYPE_SHARDED_MEMORY:
+                    if constants.CACHE_TYPE_SHARDED_MEMORY not in data:
+                        raise checks.InvalidConfigurationError(
+                            "sharded memory conversation cache type is specified,"
+                            " but sharded memory configuration is missing"
+                        )
+                    self.sharded_memory = ShardedInMemoryCacheConfig(
+                        data.get(constants.CACHE_TYPE_SHARDED_MEMORY)
+                    )
                 case constants.CACHE_TYPE_POSTGRES:
                     if constants.CACHE_TYPE_POSTGRES not in data:
                         raise checks.InvalidConfigurationError(
@@ -798,6 +930,15 @@ class ConversationCacheConfig(BaseModel):
                     self.postgres = PostgresConfig(
                         **data.get(constants.CACHE_TYPE_POSTGRES)
                     )
+                case constants.CACHE_TYPE_TIERED:
+                    if constants.CACHE_TYPE_TIERED not in data:
+                        raise checks.InvalidConfigurationError(
+                            "tiered conversation cache type is specified,"
+                            " but tiered configuration is missing"
+                        )
+                    self.tiered = TieredCacheConfig(
+                        data.get(constants.CACHE_TYPE_TIERED)
+                    )
                 case _:
                     raise checks.InvalidConfigurationError(
                         f"unknown conversation cache type: {self.type}"
@@ -809,7 +950,9 @@ class ConversationCacheConfig(BaseModel):
             return (
                 self.type == other.type
                 and self.memory == other.memory
+                and self.sharded_memory == other.sharded_memory
                 and self.postgres == other.postgres
+                and self.tiered == other.tiered
             )
         return False
 
@@ -821,8 +964,12 @@ class ConversationCacheConfig(BaseModel):
         match self.type:
             case constants.CACHE_TYPE_MEMORY:
                 self.memory.validate_yaml()
+            case constants.CACHE_TYPE_SHARDED_MEMORY:
+                self.sharded_memory.validate_yaml()
             case constants.CACHE_TYPE_POSTGRES:
                 pass  # it is validated by Pydantic already
+            case constants.CACHE_TYPE_TIERED:
+                self.tiered.validate_yaml()
             case _:
                 raise checks.InvalidConfigurationError(
                     f"unknown conversation cache type: {self.type}"
@@ -939,6 +1086,31 @@ class ReferenceContent(BaseModel):
                 index.validate_yaml()
 
 
+class TranscriptSegmentsConfig(BaseModel):
+    """Storage of transcripts in segment files.
+
+    Transcripts are buffered and appended to JSONL segment files instead
+    of being stored one file per transcript. Segment is closed (and can be
+    collected) when it reaches `max_bytes` or `max_age` seconds.
+    """
+
+    max_bytes: PositiveInt = constants.TRANSCRIPTS_SEGMENT_MAX_BYTES
+    max_age: PositiveInt = constants.TRANSCRIPTS_SEGMENT_MAX_AGE
+    flush_interval: PositiveFloat = constants.TRANSCRIPTS_SEGMENT_FLUSH_INTERVAL
+    max_buffered_bytes: PositiveInt = constants.TRANSCRIPTS_SEGMENT_MAX_BUFFERED_BYTES
+    compression: Literal["none", "gzip", "zstd"] = "gzip"
+
+    model_config = {"extra": "forbid"}
+
+    @field_validator("compression")
+    @classmethod
+    def check_compression_available(cls, value: str) -> str:
+        """Check that library providing the compression is installed."""
+        if value == "zstd" and importlib.util.find_spec("zstandard") is None:
+            raise ValueError("zstd compression requires 'zstandard' package")
+        return value
+
+
 class UserDataCollection(BaseModel):
     """User data collection configuration."""
 
@@ -946,6 +1118,7 @@ class UserDataCollection(BaseModel):
     feedback_storage: Optional[str] = None
     transcripts_disabled: bool = True
     transcripts_storage: Optional[str] = None
+    transcripts_segments: Optional[TranscriptSegmentsConfig] = None
 
     @model_validator(mode="after")
     def check_storage_location_is_set_when_needed(self) -> Self:
@@ -959,6 +1132,22 @@ class UserDataCollection(BaseModel):
         return self
 
 
+class TokenCoalescingConfig(BaseModel):
+    """Coalescing of streamed tokens into fewer writes.
+
+    Buffered tokens are sent when `max_tokens` tokens or `max_bytes` bytes
+    are buffered or when the oldest buffered token waits for `max_delay_ms`
+    milliseconds, whichever comes first. Setting `max_tokens` to 1 disables
+    coalescing.
+    """
+
+    max_tokens: PositiveInt = constants.STREAMING_COALESCE_MAX_TOKENS
+    max_bytes: PositiveInt = constants.STREAMING_COALESCE_MAX_BYTES
+    max_delay_ms: NonNegativeInt = constants.STREAMING_COALESCE_MAX_DELAY_MS
+
+    model_config = {"extra": "forbid"}
+
+
 class SchedulerConfig(BaseModel):
     """Scheduler configuration."""
 
@@ -1049,6 +1238,8 @@ class OLSConfig(BaseModel):
 
     proxy_config: Optional[ProxyConfig] = None
 
+    token_coalescing: TokenCoalescingConfig = TokenCoalescingConfig()
+
     def __init__(
         self, data: Optional[dict] = None, ignore_missing_certs: bool = False
     ) -> None:
@@ -1101,6 +1292,9 @@ class OLSConfig(BaseModel):
         )
         self.quota_handlers = QuotaHandlersConfig(data.get("quota_handlers", None))
         self.proxy_config = ProxyConfig(data.get("proxy_config"))
+        self.token_coalescing = TokenCoalescingConfig(
+            **data.get("token_coalescing", {})
+        )
 
     def __eq__(self, other: object) -> bool:
         """Compare two objects for equality."""
@@ -1124,6 +1318,7 @@ class OLSConfig(BaseModel):
                 == other.expire_llm_is_ready_persistent_state
                 and self.quota_handlers == other.quota_handlers
                 and self.proxy_config == other.proxy_config
+                and self.token_coalescing == other.token_coalescing
             )
         return False
 
@@ -10,7 +10,12 @@ from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from pydantic import BaseModel, field_validator, model_validator
 from pydantic.dataclasses import dataclass
 
-from ols.constants import MEDIA_TYPE_JSON, MEDIA_TYPE_TEXT
+from ols.app.models.config import TokenCoalescingConfig
+from ols.constants import (
+    HISTORY_MESSAGE_TOKENS_COUNT_KEY,
+    MEDIA_TYPE_JSON,
+    MEDIA_TYPE_TEXT,
+)
 from ols.customize import prompts
 from ols.utils import suid
 
@@ -72,6 +77,8 @@ class LLMRequest(BaseModel):
         model: The optional model.
         attachments: The optional attachments.
         media_type: The optional parameter for streaming response.
+        token_coalescing: The optional coalescing of streamed tokens,
+            overrides the service configuration.
 
     Example:
         ```python
@@ -86,6 +93,7 @@ class LLMRequest(BaseModel):
     system_prompt: Optional[str] = None
     attachments: Optional[list[Attachment]] = None
     media_type: Optional[str] = MEDIA_TYPE_TEXT
+    token_coalescing: Optional[TokenCoalescingConfig] = None
 
     # provides examples for /docs endpoint
     model_config = {
@@ -577,6 +585,29 @@ class TokenCounter:
     llm_calls: int = 0
 
 
+@dataclass
+class PromptTokenBudget:
+    """Model representing token counts of the parts a prompt is built from.
+
+    Every part is encoded just once while the prompt is assembled, the counts
+    are added up instead of encoding the whole prompt again.
+
+    Attributes:
+        instructions: tokens of system instruction and query
+        rag_context: tokens of RAG chunks used in the prompt
+        history: tokens of conversation history used in the prompt
+    """
+
+    instructions: int = 0
+    rag_context: int = 0
+    history: int = 0
+
+    @property
+    def total(self) -> int:
+        """Return number of tokens of the whole prompt."""
+        return self.instructions + self.rag_context + self.history
+
+
 @dataclass
 class ToolCall:
     """Model representing a tool call.
@@ -644,6 +675,19 @@ class CacheEntry(BaseModel):
             "attachments": [attachment.model_dump() for attachment in self.attachments],
         }
 
+    @staticmethod
+    def messages_tokens_count(*messages: Optional[BaseMessage]) -> int:
+        """Sum tokens counts stored in messages, unknown counts are taken as 0."""
+        return sum(
+            message.response_metadata.get(HISTORY_MESSAGE_TOKENS_COUNT_KEY) or 0
+            for message in messages
+            if message is not None
+        )
+
+    def tokens_count(self) -> int:
+        """Get tokens count of the entry stored along with its messages."""
+        return CacheEntry.messages_tokens_count(self.query, self.response)
+
     @classmethod
     def from_dict(cls, data: dict) -> Self:
         """Create a cache entry from a dictionary."""
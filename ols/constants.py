@@ -62,6 +62,10 @@ class GenericLLMParameters:
 # Max Iteration for tool calling
 MAX_ITERATIONS = 5
 
+# Maximum number of prompt templates cached by prompt generator, templates
+# differ by system prompt, model family and presence of tools/context/history
+PROMPT_TEMPLATE_CACHE_SIZE = 128
+
 
 # Token related constants
 
@@ -85,6 +89,10 @@ DEFAULT_TOKENIZER_MODEL = "cl100k_base"
 # Example: 1.05 means we increase by 5%.
 TOKEN_BUFFER_WEIGHT = 1.1
 
+# Key in message metadata storing tokens count of conversation history message,
+# so the message does not need to be encoded again on every conversation turn.
+HISTORY_MESSAGE_TOKENS_COUNT_KEY = "tokens_count"
+
 
 # RAG related constants
 
@@ -114,12 +122,22 @@ RAG_SIMILARITY_CUTOFF = 0.3
 # cache constants
 CACHE_TYPE_MEMORY = "memory"
 IN_MEMORY_CACHE_MAX_ENTRIES = 1000
+# size of the cached conversations is not limited by default
+IN_MEMORY_CACHE_MAX_BYTES = None
+CACHE_TYPE_SHARDED_MEMORY = "sharded_memory"
+# conversations are spread across shards, each shard has its own lock
+SHARDED_MEMORY_CACHE_SHARDS = 16
 CACHE_TYPE_POSTGRES = "postgres"
 POSTGRES_CACHE_HOST = "localhost"
 POSTGRES_CACHE_PORT = 5432
 POSTGRES_CACHE_DBNAME = "cache"
 POSTGRES_CACHE_USER = "postgres"
 POSTGRES_CACHE_MAX_ENTRIES = 1000
+# connections opened at start and maximum number of open connections
+POSTGRES_CACHE_MIN_CONNECTIONS = 1
+POSTGRES_CACHE_MAX_CONNECTIONS = 8
+# how long to wait for a free connection when all of them are in use
+POSTGRES_CACHE_POOL_TIMEOUT = 30  # in seconds
 
 # look at https://www.postgresql.org/docs/current/libpq-connect.html#LIBPQ-CONNECT-SSLMODE
 # for all possible options
@@ -129,6 +147,15 @@ POSTGRES_CACHE_SSL_MODE = "prefer"
 # for all possible options
 POSTGRES_CACHE_GSSENCMODE = "prefer"
 
+# in-memory cache in front of Postgres cache
+CACHE_TYPE_TIERED = "tiered"
+# channel announcing conversations changed by other service instances
+TIERED_CACHE_NOTIFY_CHANNEL = "ols_conversation_cache"
+# how often the invalidation listener checks whether to stop
+TIERED_CACHE_LISTENER_POLL_INTERVAL = 1  # in seconds
+# delay before the invalidation listener reconnects to the database
+TIERED_CACHE_LISTENER_RECONNECT_INTERVAL = 5  # in seconds
+
 
 # default indentity for local testing and deployment
 # "nil" UUID is used on purpose, because it will be easier to
@@ -203,6 +230,21 @@ DEFAULT_AUTHENTICATION_MODULE = "k8s"
 # All supported authentication modules
 SUPPORTED_AUTHENTICATION_MODULES = {"k8s", "noop", "noop-with-token"}
 
+# Maximum number of TokenReview/SubjectAccessReview decisions kept in memory
+# by k8s authentication module, zero value disables the cache
+K8S_AUTH_CACHE_MAX_ENTRIES = 10000
+
+# How long (in seconds) a positive auth. decision is reused
+K8S_AUTH_CACHE_TTL = 30
+
+# How long (in seconds) a negative auth. decision (invalid token, access
+# denied) is reused
+K8S_AUTH_CACHE_NEGATIVE_TTL = 5
+
+# Number of connections to K8S API server and number of threads used to
+# perform TokenReview/SubjectAccessReview outside of the event loop
+K8S_CONNECTION_POOL_SIZE = 10
+
 # Default configuration file name
 DEFAULT_CONFIGURATION_FILE = "olsconfig.yaml"
 
@@ -213,6 +255,40 @@ CONFIGURATION_DUMP_FILE_NAME = "configuration.json"
 # configuration file
 CONFIGURATION_FILE_NAME_ENV_VARIABLE = "OLS_CONFIG_FILE"
 
+# Maximum number of threads used by async endpoints to perform blocking calls
+# (conversation cache, quota limiters, transcripts storage)
+BLOCKING_CALLS_MAX_WORKERS = 16
+
+# Maximum number of threads writing transcripts in background
+TRANSCRIPTS_WRITER_MAX_WORKERS = 2
+
+# Maximum number of transcripts waiting to be written, requests wait for
+# a free slot when the limit is reached
+TRANSCRIPTS_WRITER_MAX_PENDING = 256
+
+# How long to wait for pending background writes on shutdown
+BACKGROUND_WRITES_FLUSH_TIMEOUT = 30  # in seconds
+
+# how often is checked whether client is still connected to response stream
+STREAMING_DISCONNECT_CHECK_INTERVAL = 0.5  # in seconds
+
+# streamed tokens are sent in one write when any of the limits is reached
+STREAMING_COALESCE_MAX_TOKENS = 16
+STREAMING_COALESCE_MAX_BYTES = 4096
+STREAMING_COALESCE_MAX_DELAY_MS = 50
+
+# transcript segments are stored in this subdirectory of transcripts storage
+TRANSCRIPTS_SEGMENTS_DIR = "segments"
+# suffix of segments still being written, those are not collected
+TRANSCRIPTS_SEGMENT_PART_SUFFIX = ".part"
+# segment is closed when it reaches the size or the age
+TRANSCRIPTS_SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+TRANSCRIPTS_SEGMENT_MAX_AGE = 300  # in seconds
+# buffered transcripts are appended to the segment this often
+TRANSCRIPTS_SEGMENT_FLUSH_INTERVAL = 5  # in seconds
+# transcripts are flushed immediately when there are more buffered bytes
+TRANSCRIPTS_SEGMENT_MAX_BUFFERED_BYTES = 1024 * 1024
+
 # Response streaming media types
 MEDIA_TYPE_TEXT = "text/plain"
 MEDIA_TYPE_JSON = "application/json"
@@ -235,6 +311,25 @@ STDIO_TRANSPORT_DEFAULT_CWD = "."
 STREAMABLE_HTTP_TRANSPORT_DEFAULT_TIMEOUT = 5  # in seconds
 STREAMABLE_HTTP_TRANSPORT_DEFAULT_READ_TIMEOUT = 10  # in seconds
 
+# persistent MCP client sessions
+# how long the list of tools provided by MCP server is cached
+MCP_TOOLS_CACHE_TTL = 300  # in seconds
+# unused MCP sessions are closed after this time
+MCP_SESSION_IDLE_TIMEOUT = 600  # in seconds
+# max number of MCP sessions kept open by one worker
+MCP_MAX_SESSIONS = 128
+# how long to wait for MCP session to be initialized
+MCP_SESSION_STARTUP_TIMEOUT = 30  # in seconds
+
+# cache of results of MCP tools marked as cacheable
+# how long are results of cacheable tool calls reused
+MCP_TOOL_RESULTS_CACHE_TTL = 30  # in seconds
+# max number of cached tool results in one worker
+MCP_TOOL_RESULTS_CACHE_MAX_ENTRIES = 1024
+
+# default timeout of a single MCP tool call
+MCP_TOOL_CALL_TIMEOUT = 60  # in seconds
+
 # timeout value for a single llm with tools round
 # Keeping it really high at this moment (until this is configurable)
 TOOL_CALL_ROUND_TIMEOUT = 300
@@ -1,18 +1,28 @@
 """Manage authentication flow for FastAPI endpoints with K8S/OCP."""
 
+import asyncio
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Self
+from typing import NamedTuple, Optional, Self
 
 import kubernetes.client
 from fastapi import HTTPException, Request
 from kubernetes.client.rest import ApiException
 from kubernetes.config import ConfigException
+from prometheus_client import Counter
 
 from ols import config
 from ols.constants import (
     DEFAULT_USER_NAME,
     DEFAULT_USER_UID,
+    K8S_AUTH_CACHE_MAX_ENTRIES,
+    K8S_AUTH_CACHE_NEGATIVE_TTL,
+    K8S_AUTH_CACHE_TTL,
     NO_USER_TOKEN,
     RUNNING_IN_CLUSTER,
 )
@@ -24,6 +34,15 @@ logger = logging.getLogger(__name__)
 
 CLUSTER_ID_LOCAL = "local"
 
+# the metrics are registered here and not in ols.app.metrics, because the
+# metrics module depends on auth. module (import cycle)
+auth_cache_hits_total = Counter(
+    "ols_auth_cache_hits_total", "K8S auth. decision cache hits", ["decision"]
+)
+auth_cache_misses_total = Counter(
+    "ols_auth_cache_misses_total", "K8S auth. decision cache misses"
+)
+
 
 class ClusterIDUnavailableError(Exception):
     """Cluster ID is not available."""
@@ -37,10 +56,12 @@ class K8sClientSingleton:
     """
 
     _instance = None
+    _lock = threading.Lock()
     _api_client = None
     _authn_api: kubernetes.client.AuthenticationV1Api
     _authz_api: kubernetes.client.AuthorizationV1Api
     _cluster_id = None
+    _executor: Optional[ThreadPoolExecutor] = None
 
     def __new__(cls: type[Self]) -> Self:
         """Create a new instance of the singleton, or returns the existing instance.
@@ -49,7 +70,7 @@ class K8sClientSingleton:
         and ensures that subsequent calls return the same instance.
         """
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            instance = super().__new__(cls)
             configuration = kubernetes.client.Configuration()
 
             try:
@@ -93,6 +114,11 @@ class K8sClientSingleton:
                 configuration.verify_ssl = (
                     not config.ols_config.authentication_config.skip_tls_verification
                 )
+                # one connection per executor thread, so concurrent
+                # reviews do not wait for a free connection
+                configuration.connection_pool_maxsize = (
+                    config.ols_config.authentication_config.k8s_connection_pool_size
+                )
                 configuration.ssl_ca_cert = (
                     config.ols_config.authentication_config.k8s_ca_cert_path
                     if config.ols_config.authentication_config.k8s_ca_cert_path
@@ -104,11 +130,33 @@ class K8sClientSingleton:
                 cls._custom_objects_api = kubernetes.client.CustomObjectsApi(api_client)
                 cls._authn_api = kubernetes.client.AuthenticationV1Api(api_client)
                 cls._authz_api = kubernetes.client.AuthorizationV1Api(api_client)
+                # publish the instance only when all API clients are ready, so
+                # concurrent callers (executor threads) never see a partially
+                # initialized singleton and a failed init is retried next time
+                cls._instance = instance
             except Exception as e:
                 logger.info("Failed to initialize Kubernetes client: %s", e)
                 raise
         return cls._instance
 
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        """Return the executor used to call the blocking Kubernetes client APIs.
+
+        The executor is bounded by the same size as the connection pool of the
+        Kubernetes API client, so auth. round-trips never block the event loop
+        and never compete for the default threadpool used by sync endpoints.
+        """
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    auth_config = config.ols_config.authentication_config
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=auth_config.k8s_connection_pool_size,
+                        thread_name_prefix="k8s-auth",
+                    )
+        return cls._executor
+
     @classmethod
     def get_authn_api(cls) -> kubernetes.client.AuthenticationV1Api:
         """Return the Authentication API client instance.
@@ -188,6 +236,10 @@ def get_user_info(token: str) -> Optional[kubernetes.client.V1TokenReview]:
 
     Returns:
         The user information if the token is valid, None otherwise.
+
+    Raises:
+        ApiException: If the TokenReview could not be performed by API server,
+            so the token validity is unknown.
     """
     auth_api = K8sClientSingleton.get_authn_api()
     token_review = kubernetes.client.V1TokenReview(
@@ -200,7 +252,7 @@ def get_user_info(token: str) -> Optional[kubernetes.client.V1TokenReview]:
         return None
     except ApiException as e:
         logger.error("API exception during TokenReview: %s", e)
-        return None
+        raise
     except Exception as e:
         logger.error("Unexpected error during TokenReview - Unauthorized: %s", e)
         raise HTTPException(
@@ -209,6 +261,110 @@ def get_user_info(token: str) -> Optional[kubernetes.client.V1TokenReview]:
         ) from e
 
 
+class AuthDecision(NamedTuple):
+    """Result of TokenReview and SubjectAccessReview for one token and path.
+
+    Attributes:
+        user_id: User ID, set only if the access is allowed.
+        username: User name, set only if the access is allowed.
+        detail: Reason of the denial, set only if the access is denied.
+    """
+
+    user_id: Optional[str] = None
+    username: Optional[str] = None
+    detail: Optional[str] = None
+
+    @property
+    def allowed(self) -> bool:
+        """Return True if the decision allows the access."""
+        return self.detail is None
+
+
+class AuthDecisionCache:
+    """Bounded LRU cache of auth. decisions with separate TTL for denials.
+
+    The bearer token itself is never stored, only its SHA-256 digest.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = K8S_AUTH_CACHE_MAX_ENTRIES,
+        ttl: float = K8S_AUTH_CACHE_TTL,
+        negative_ttl: float = K8S_AUTH_CACHE_NEGATIVE_TTL,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of stored decisions, zero disables the cache.
+            ttl: Lifetime (in seconds) of decisions that allow access.
+            negative_ttl: Lifetime (in seconds) of decisions that deny access.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: OrderedDict[tuple[str, str], tuple[float, AuthDecision]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def construct_key(token: str, virtual_path: str) -> tuple[str, str]:
+        """Construct cache key from token digest and virtual path."""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest(), virtual_path
+
+    def get(self, key: tuple[str, str]) -> Optional[AuthDecision]:
+        """Return the cached decision or None when missing or expired."""
+        if self.max_entries == 0:
+            return None
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] <= time.monotonic():
+                del self._entries[key]
+                item = None
+            if item is None:
+                auth_cache_misses_total.inc()
+                return None
+            self._entries.move_to_end(key)
+        decision = item[1]
+        auth_cache_hits_total.labels("allowed" if decision.allowed else "denied").inc()
+        return decision
+
+    def put(self, key: tuple[str, str], decision: AuthDecision) -> None:
+        """Store the decision, evicting the least recently used one if full."""
+        ttl = self.ttl if decision.allowed else self.negative_ttl
+        if self.max_entries == 0 or ttl == 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, decision)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def configure(self, max_entries: int, ttl: float, negative_ttl: float) -> None:
+        """Apply new limits, dropping the least recently used decisions over the size."""
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            self.negative_ttl = negative_ttl
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached decisions."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """Return number of stored decisions, including expired ones."""
+        with self._lock:
+            return len(self._entries)
+
+
+# one cache shared by all auth. dependencies (endpoints), the virtual path
+# is part of the key
+decision_cache = AuthDecisionCache()
+
+
 def _extract_bearer_token(header: str) -> str:
     """Extract the bearer token from an HTTP authorization header.
 
@@ -233,6 +389,12 @@ class AuthDependency(AuthDependencyInterface):
     def __init__(self, virtual_path: str = "/ols-access") -> None:
         """Initialize the required allowed paths for authorization checks."""
         self.virtual_path = virtual_path
+        auth_config = config.ols_config.authentication_config
+        decision_cache.configure(
+            auth_config.k8s_auth_cache_max_entries,
+            auth_config.k8s_auth_cache_ttl,
+            auth_config.k8s_auth_cache_negative_ttl,
+        )
 
     async def __call__(self, request: Request) -> tuple[str, str, bool, str]:
         """Validate FastAPI Requests for authentication and authorization.
@@ -274,11 +436,41 @@ class AuthDependency(AuthDependencyInterface):
                 status_code=401,
                 detail="Unauthorized: Bearer token not found or invalid",
             )
-        user_info = get_user_info(token)
-        if user_info is None:
+        cache_key = decision_cache.construct_key(token, self.virtual_path)
+        decision = decision_cache.get(cache_key)
+        if decision is None:
+            # the Kubernetes client is blocking, so the review has to run
+            # outside of the event loop
+            decision = await asyncio.get_running_loop().run_in_executor(
+                K8sClientSingleton.get_executor(), self._review, token
+            )
+            decision_cache.put(cache_key, decision)
+        if not decision.allowed:
+            raise HTTPException(status_code=403, detail=decision.detail)
+
+        return decision.user_id, decision.username, False, token
+
+    def _review(self, token: str) -> AuthDecision:
+        """Perform TokenReview and SubjectAccessReview for the given token.
+
+        Args:
+            token: The bearer token to be validated.
+
+        Returns:
+            The auth. decision for the token and the virtual path.
+
+        Raises:
+            HTTPException: If the review itself could not be performed.
+        """
+        try:
+            user_info = get_user_info(token)
+        except ApiException as e:
+            # the token validity is unknown, so the result must not be cached
             raise HTTPException(
                 status_code=403, detail="Forbidden: Invalid or expired token"
-            )
+            ) from e
+        if user_info is None:
+            return AuthDecision(detail="Forbidden: Invalid or expired token")
         if user_info.user.username == "kube:admin":
             user_info.user.uid = K8sClientSingleton.get_cluster_id()
         authorization_api = K8sClientSingleton.get_authz_api()
@@ -294,12 +486,10 @@ class AuthDependency(AuthDependencyInterface):
         )
         try:
             response = authorization_api.create_subject_access_review(sar)
-            if not response.status.allowed:
-                raise HTTPException(
-                    status_code=403, detail="Forbidden: User does not have access"
-                )
         except ApiException as e:
             logger.error("API exception during SubjectAccessReview: %s", e)
             raise HTTPException(status_code=403, detail="Internal server error") from e
+        if not response.status.allowed:
+            return AuthDecision(detail="Forbidden: User does not have access")
 
-        return user_info.user.uid, user_info.user.username, False, token
+        return AuthDecision(user_info.user.uid, user_info.user.username)
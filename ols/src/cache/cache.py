@@ -1,6 +1,8 @@
 """Abstract class that is parent for all cache implementations."""
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from typing import Optional
 
 from ols.app.models.models import CacheEntry
 from ols.utils.suid import check_suid
@@ -57,6 +59,69 @@ class Cache(ABC):
             The value (CacheEntry(s)) associated with the key, or None if not found.
         """
 
+    def get_tail(
+        self,
+        user_id: str,
+        conversation_id: str,
+        max_entries: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        skip_user_id_check: bool = False,
+    ) -> list[CacheEntry]:
+        """Retrieve the most recent entries of the conversation.
+
+        Entries are taken from the newest one until `max_entries` entries
+        are taken or their tokens count (stored with the entries) exceeds
+        `max_tokens`. The entry exceeding `max_tokens` is still returned,
+        so the caller can tell the history does not fit and is truncated.
+
+        This implementation reads the whole conversation, implementations
+        should read just the tail if they can.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            max_entries: Maximal number of entries, unlimited when None.
+            max_tokens: Maximal tokens count of entries, unlimited when None.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            The most recent CacheEntry(s) in chronological order.
+        """
+        entries = self.get(user_id, conversation_id, skip_user_id_check) or []
+        length = Cache.tail_length(
+            (entry.tokens_count() for entry in reversed(entries)),
+            max_entries,
+            max_tokens,
+        )
+        return entries[len(entries) - length :]
+
+    @staticmethod
+    def tail_length(
+        tokens_counts: Iterable[int],
+        max_entries: Optional[int],
+        max_tokens: Optional[int],
+    ) -> int:
+        """Get number of the most recent entries to return from conversation tail.
+
+        Args:
+            tokens_counts: Tokens counts of the entries, newest entry first.
+            max_entries: Maximal number of entries, unlimited when None.
+            max_tokens: Maximal tokens count of entries, unlimited when None.
+
+        Returns:
+            Number of entries in the tail.
+        """
+        length = 0
+        total_tokens = 0
+        for tokens_count in tokens_counts:
+            if max_entries is not None and length >= max_entries:
+                break
+            if max_tokens is not None and total_tokens > max_tokens:
+                break
+            length += 1
+            total_tokens += tokens_count
+        return length
+
     @abstractmethod
     def insert_or_append(
         self,
@@ -5,6 +5,8 @@ from ols.app.models.config import ConversationCacheConfig
 from ols.src.cache.cache import Cache
 from ols.src.cache.in_memory_cache import InMemoryCache
 from ols.src.cache.postgres_cache import PostgresCache
+from ols.src.cache.sharded_in_memory_cache import ShardedInMemoryCache
+from ols.src.cache.tiered_cache import TieredCache
 
 
 class CacheFactory:
@@ -15,16 +17,23 @@ class CacheFactory:
         """Create an instance of Cache based on loaded configuration.
 
         Returns:
-            An instance of `Cache` (either `PostgresCache` or `InMemoryCache`).
+            An instance of `Cache` (`PostgresCache`, `InMemoryCache`,
+            `ShardedInMemoryCache` or `TieredCache`).
         """
         match config.type:
             case constants.CACHE_TYPE_MEMORY:
                 return InMemoryCache(config.memory)
+            case constants.CACHE_TYPE_SHARDED_MEMORY:
+                return ShardedInMemoryCache(config.sharded_memory)
             case constants.CACHE_TYPE_POSTGRES:
                 return PostgresCache(config.postgres)
+            case constants.CACHE_TYPE_TIERED:
+                return TieredCache(config.tiered)
             case _:
                 raise ValueError(
                     f"Invalid cache type: {config.type}. "
-                    f"Use '{constants.CACHE_TYPE_POSTGRES}' or "
-                    f"'{constants.CACHE_TYPE_MEMORY}' options."
+                    f"Use '{constants.CACHE_TYPE_POSTGRES}', "
+                    f"'{constants.CACHE_TYPE_MEMORY}', "
+                    f"'{constants.CACHE_TYPE_SHARDED_MEMORY}' or "
+                    f"'{constants.CACHE_TYPE_TIERED}' options."
                 )
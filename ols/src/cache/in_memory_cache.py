@@ -2,38 +2,195 @@
 
 from __future__ import annotations
 
+import copy
+import json
 import threading
-from collections import deque
-from typing import TYPE_CHECKING, Any
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Union
 
-from ols.app.models.models import CacheEntry
+from langchain_core.messages import AIMessage, HumanMessage
+from prometheus_client import Counter, Gauge
+
+from ols.app.models.models import Attachment, CacheEntry, MessageEncoder
 
 if TYPE_CHECKING:
     from ols.app.models.config import InMemoryCacheConfig
 # pylint: disable-next=C0413
 from ols.src.cache.cache import Cache
 
+# the metrics are registered here and not in ols.app.metrics, because the
+# metrics module depends on config module that creates the cache (import cycle)
+cache_hits_total = Counter(
+    "ols_conversation_cache_hits_total", "In-memory conversation cache hits"
+)
+cache_misses_total = Counter(
+    "ols_conversation_cache_misses_total", "In-memory conversation cache misses"
+)
+cache_evictions_total = Counter(
+    "ols_conversation_cache_evictions_total",
+    "Conversations evicted from in-memory conversation cache",
+)
+cache_conversations = Gauge(
+    "ols_conversation_cache_conversations",
+    "Conversations stored in in-memory conversation cache",
+)
+cache_size_bytes = Gauge(
+    "ols_conversation_cache_size_bytes",
+    "Estimated size of conversations stored in in-memory conversation cache",
+)
 
-class InMemoryCache(Cache):
-    """An in-memory LRU cache implementation in O(1) time."""
+# the size gauges sum up all caches (cache shards), they are computed when read
+_caches: weakref.WeakSet[LRUCache] = weakref.WeakSet()
+cache_conversations.set_function(lambda: sum(len(c.cache) for c in list(_caches)))
+cache_size_bytes.set_function(lambda: sum(c.size for c in list(_caches)))
 
-    _instance = None
-    _lock = threading.Lock()
 
-    def __new__(cls: type[InMemoryCache], config: InMemoryCacheConfig) -> InMemoryCache:
-        """Implement Singleton pattern with thread safety."""
-        with cls._lock:
-            if not cls._instance:
-                cls._instance = super().__new__(cls)
-                cls._instance.initialize_cache(config)
-        return cls._instance
+class CachedMessage(NamedTuple):
+    """Immutable copy of a history message.
+
+    The dictionaries are private copies, messages created from the record
+    get their own (shallow) copies of them.
+    """
+
+    content: Union[str, list[Union[str, dict]]]
+    response_metadata: dict[str, Any]
+    additional_kwargs: dict[str, Any]
+
+    @classmethod
+    def from_message(cls, message: Union[HumanMessage, AIMessage]) -> CachedMessage:
+        """Copy the message into a new record."""
+        return cls(
+            copy.deepcopy(message.content),
+            copy.deepcopy(message.response_metadata),
+            copy.deepcopy(message.additional_kwargs),
+        )
+
+    def to_message(
+        self, message_type: type[Union[HumanMessage, AIMessage]]
+    ) -> Union[HumanMessage, AIMessage]:
+        """Create message of given type, the stored values are not validated again."""
+        return message_type.model_construct(
+            content=self.content,
+            response_metadata=dict(self.response_metadata),
+            additional_kwargs=dict(self.additional_kwargs),
+        )
+
+
+class CachedEntry(NamedTuple):
+    """Immutable conversation entry as stored in the cache.
+
+    Tokens count and size are computed once, when the entry is stored.
+    """
+
+    query: CachedMessage
+    response: CachedMessage
+    attachments: tuple[dict[str, str], ...]
+    tokens_count: int
+    size: int
+
+    @classmethod
+    def from_cache_entry(cls, cache_entry: CacheEntry) -> CachedEntry:
+        """Create record of the (already validated) cache entry."""
+        return cls(
+            CachedMessage.from_message(cache_entry.query),
+            CachedMessage.from_message(cache_entry.response),
+            tuple(attachment.model_dump() for attachment in cache_entry.attachments),
+            cache_entry.tokens_count(),
+            len(json.dumps(cache_entry.to_dict(), cls=MessageEncoder).encode("utf-8")),
+        )
+
+    def to_cache_entry(self) -> CacheEntry:
+        """Create cache entry from the record without validating it again."""
+        return CacheEntry.model_construct(
+            query=self.query.to_message(HumanMessage),
+            response=self.response.to_message(AIMessage),
+            attachments=[
+                Attachment.model_construct(**attachment)
+                for attachment in self.attachments
+            ],
+        )
+
+
+class CachedConversation:
+    """Entries of one conversation along with their total size.
+
+    `dropped` is the number of the oldest entries dropped from the conversation.
+    """
+
+    __slots__ = ("dropped", "entries", "size")
+
+    def __init__(self) -> None:
+        """Initialize empty conversation."""
+        self.entries: list[CachedEntry] = []
+        self.size = 0
+        self.dropped = 0
+
+    def append(self, entry: CachedEntry) -> None:
+        """Append entry to the conversation."""
+        self.entries.append(entry)
+        self.size += entry.size
+
+    def drop_oldest(self) -> int:
+        """Drop the oldest entry, return its size."""
+        entry = self.entries.pop(0)
+        self.size -= entry.size
+        self.dropped += 1
+        return entry.size
+
+
+class LRUCache(Cache):
+    """An in-memory LRU cache implementation in O(1) time.
+
+    Conversations are kept in an `OrderedDict` in the order of their use,
+    the least recently used conversations are evicted when the cache holds
+    more than `max_entries` conversations or their estimated size exceeds
+    `max_bytes`. All operations are performed under one lock.
+
+    Entries are stored as immutable records, so they can be shared by
+    readers and `CacheEntry` objects are created from them without
+    validating (and copying) the whole history again on every read.
+    """
+
+    def __init__(self, config: InMemoryCacheConfig) -> None:
+        """Create a new instance of in-memory cache."""
+        self.initialize_cache(config)
 
     def initialize_cache(self, config: InMemoryCacheConfig) -> None:
-        """Initialize the InMemoryCache."""
+        """Initialize the cache."""
         # pylint: disable=W0201
         self.capacity = config.max_entries
-        self.deque: deque[str] = deque()
-        self.cache: dict[str, list[dict[str, Any]]] = {}
+        self.max_bytes = config.max_bytes
+        self.cache: OrderedDict[str, CachedConversation] = OrderedDict()
+        self.size: int = 0
+        self._cache_lock = threading.Lock()
+        _caches.add(self)
+
+    def _lookup(self, key: str) -> Optional[CachedConversation]:
+        """Find conversation and mark it as the most recently used one."""
+        conversation = self.cache.get(key)
+        if conversation is None:
+            cache_misses_total.inc()
+            return None
+        self.cache.move_to_end(key)
+        cache_hits_total.inc()
+        return conversation
+
+    def _evict(self) -> None:
+        """Evict the least recently used conversations while over capacity."""
+        while self.cache and (
+            (self.capacity is not None and len(self.cache) > self.capacity)
+            or (self.max_bytes is not None and self.size > self.max_bytes)
+        ):
+            key, conversation = next(iter(self.cache.items()))
+            if key == next(reversed(self.cache)) and len(conversation.entries) > 1:
+                # conversation being appended is too big itself,
+                # its oldest entries are dropped instead of whole conversation
+                self.size -= conversation.drop_oldest()
+                continue
+            self.cache.popitem(last=False)
+            self.size -= conversation.size
+            cache_evictions_total.inc()
 
     def get(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
@@ -50,13 +207,49 @@ class InMemoryCache(Cache):
         """
         key = super().construct_key(user_id, conversation_id, skip_user_id_check)
 
-        if key not in self.cache:
-            return None
+        with self._cache_lock:
+            conversation = self._lookup(key)
+            if conversation is None:
+                return None
+            entries = conversation.entries.copy()
+        return [entry.to_cache_entry() for entry in entries]
+
+    def get_tail(
+        self,
+        user_id: str,
+        conversation_id: str,
+        max_entries: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        skip_user_id_check: bool = False,
+    ) -> list[CacheEntry]:
+        """Get the most recent entries of the conversation.
+
+        Only the entries in the tail are converted to `CacheEntry` objects.
+
+        Args:
+          user_id: User identification.
+          conversation_id: Conversation ID unique for given user.
+          max_entries: Maximal number of entries, unlimited when None.
+          max_tokens: Maximal tokens count of entries, unlimited when None.
+          skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+          The most recent entries in chronological order.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
 
-        self.deque.remove(key)
-        self.deque.appendleft(key)
-        value = self.cache[key].copy()
-        return [CacheEntry.from_dict(cache_entry) for cache_entry in value]
+        with self._cache_lock:
+            conversation = self._lookup(key)
+            if conversation is None:
+                return []
+            entries = conversation.entries
+            length = Cache.tail_length(
+                (entry.tokens_count for entry in reversed(entries)),
+                max_entries,
+                max_tokens,
+            )
+            tail = entries[len(entries) - length :]
+        return [entry.to_cache_entry() for entry in tail]
 
     def insert_or_append(
         self,
@@ -74,20 +267,17 @@ class InMemoryCache(Cache):
             skip_user_id_check: Skip user_id suid check.
         """
         key = super().construct_key(user_id, conversation_id, skip_user_id_check)
-        value = cache_entry.to_dict()
-
-        with self._lock:
-            if key not in self.cache:
-                if len(self.deque) == self.capacity:
-                    oldest = self.deque.pop()
-                    del self.cache[oldest]
-                self.cache[key] = [value]
+        entry = CachedEntry.from_cache_entry(cache_entry)
+
+        with self._cache_lock:
+            conversation = self.cache.get(key)
+            if conversation is None:
+                conversation = self.cache[key] = CachedConversation()
             else:
-                self.deque.remove(key)
-                old_value = self.cache[key]
-                old_value.append(value)
-                self.cache[key] = old_value
-            self.deque.appendleft(key)
+                self.cache.move_to_end(key)
+            conversation.append(entry)
+            self.size += entry.size
+            self._evict()
 
     def delete(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
@@ -104,13 +294,11 @@ class InMemoryCache(Cache):
         """
         key = super().construct_key(user_id, conversation_id, skip_user_id_check)
 
-        with self._lock:
-            if key not in self.cache:
+        with self._cache_lock:
+            conversation = self.cache.pop(key, None)
+            if conversation is None:
                 return False
-
-            # Remove from both cache and deque
-            del self.cache[key]
-            self.deque.remove(key)
+            self.size -= conversation.size
             return True
 
     def list(self, user_id: str, skip_user_id_check: bool = False) -> list[str]:
@@ -127,7 +315,7 @@ class InMemoryCache(Cache):
         super()._check_user_id(user_id, skip_user_id_check)
         prefix = f"{user_id}{Cache.COMPOUND_KEY_SEPARATOR}"
 
-        with self._lock:
+        with self._cache_lock:
             for key in self.cache:
                 if key.startswith(prefix):
                     # Extract conversation_id from the key
@@ -145,3 +333,21 @@ class InMemoryCache(Cache):
             True if the cache is ready, False otherwise.
         """
         return True
+
+
+class InMemoryCache(LRUCache):
+    """In-memory LRU cache shared by the whole process (singleton)."""
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls: type[InMemoryCache], config: InMemoryCacheConfig) -> InMemoryCache:
+        """Implement Singleton pattern with thread safety."""
+        with cls._lock:
+            if not cls._instance:
+                cls._instance = super().__new__(cls)
+                cls._instance.initialize_cache(config)
+        return cls._instance
+
+    def __init__(self, config: InMemoryCacheConfig) -> None:
+        """Do nothing, the only instance is initialized when it is created."""
@@ -2,110 +2,229 @@
 
 import json
 import logging
-from typing import Any
+from typing import Any, Callable, Optional, Sequence, TypeVar
 
 import psycopg2
+from psycopg2.pool import PoolError
 
+from ols import constants
 from ols.app.models.config import PostgresConfig
 from ols.app.models.models import CacheEntry, MessageDecoder, MessageEncoder
 from ols.src.cache.cache import Cache
 from ols.src.cache.cache_error import CacheError
-from ols.utils.connection_decorator import connection
+from ols.utils import suid
+from ols.utils.connection_pool import ConnectionPool, PoolTimeoutError
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class PostgresCache(Cache):
     """Cache that uses Postgres to store cached values.
 
-    The cache itself is stored in following table:
+    The cache itself is stored in following tables, one row per conversation
+    and one row per conversation turn (cache entry):
 
     ```
-         Column      |            Type             | Nullable | Default | Storage  |
-    -----------------+-----------------------------+----------+---------+----------+
-     user_id         | text                        | not null |         | extended |
-     conversation_id | text                        | not null |         | extended |
-     value           | bytea                       |          |         | extended |
-     updated_at      | timestamp without time zone |          |         | plain    |
+                        Table "public.conversations"
+         Column      |            Type             | Nullable | Storage  |
+    -----------------+-----------------------------+----------+----------+
+     user_id         | text                        | not null | extended |
+     conversation_id | text                        | not null | extended |
+     last_seq        | integer                     | not null | plain    |
+     updated_at      | timestamp without time zone |          | plain    |
+    Indexes:
+        "conversations_pkey" PRIMARY KEY, btree (user_id, conversation_id)
+        "conversations_updated_at" btree (updated_at)
+
+                    Table "public.conversation_entries"
+         Column      |            Type             | Nullable | Storage  |
+    -----------------+-----------------------------+----------+----------+
+     user_id         | text                        | not null | extended |
+     conversation_id | text                        | not null | extended |
+     seq             | integer                     | not null | plain    |
+     value           | bytea                       | not null | extended |
+     tokens          | integer                     | not null | plain    |
     Indexes:
-        "cache_pkey" PRIMARY KEY, btree (user_id, conversation_id)
-        "cache_key_key" UNIQUE CONSTRAINT, btree (key)
-        "timestamps" btree (updated_at)
-    Access method: heap
+        "conversation_entries_pkey" PRIMARY KEY, btree (user_id,
+                                                        conversation_id, seq)
+    Foreign-key constraints:
+        (user_id, conversation_id) REFERENCES conversations ON DELETE CASCADE
     ```
+
+    Appending a turn is a single INSERT of the new entry, the conversation
+    row holds the sequence number of its last entry. Tokens count of the
+    entry is stored with it, so the tail of the conversation that fits
+    into the given number of tokens is selected by the database. Conversations stored
+    in the original `cache` table (whole history in one row) are migrated
+    when the cache is initialized.
+
+    Connections are taken from a bounded pool for each operation, so
+    concurrent requests do not share one connection (and its transaction).
+
+    When `notify_channel` is set, every change of a conversation is
+    announced on the channel (in the same transaction), so other service
+    instances can drop their copies of the conversation.
     """
 
-    CREATE_CACHE_TABLE = """
-        CREATE TABLE IF NOT EXISTS cache (
+    CREATE_CONVERSATIONS_TABLE = """
+        CREATE TABLE IF NOT EXISTS conversations (
             user_id         text NOT NULL,
             conversation_id text NOT NULL,
-            value           bytea,
+            last_seq        integer NOT NULL,
             updated_at      timestamp,
             PRIMARY KEY(user_id, conversation_id)
         );
         """
 
+    CREATE_CONVERSATION_ENTRIES_TABLE = """
+        CREATE TABLE IF NOT EXISTS conversation_entries (
+            user_id         text NOT NULL,
+            conversation_id text NOT NULL,
+            seq             integer NOT NULL,
+            value           bytea NOT NULL,
+            tokens          integer NOT NULL DEFAULT 0,
+            PRIMARY KEY(user_id, conversation_id, seq),
+            FOREIGN KEY(user_id, conversation_id)
+                REFERENCES conversations(user_id, conversation_id)
+                ON DELETE CASCADE
+        );
+        """
+
     CREATE_INDEX = """
-        CREATE INDEX IF NOT EXISTS timestamps
-            ON cache (updated_at)
+        CREATE INDEX IF NOT EXISTS conversations_updated_at
+            ON conversations (updated_at)
         """
 
-    SELECT_CONVERSATION_HISTORY_STATEMENT = """
-        SELECT value
+    # serializes migrations run by more service instances
+    LOCK_MIGRATION_STATEMENT = """
+        SELECT pg_advisory_xact_lock(hashtext('ols.conversation_cache'))
+        """
+
+    QUERY_LEGACY_CACHE_TABLE = """
+        SELECT to_regclass('cache')
+        """
+
+    MIGRATE_LEGACY_CONVERSATIONS_STATEMENT = """
+        INSERT INTO conversations(user_id, conversation_id, last_seq, updated_at)
+        SELECT user_id, conversation_id,
+               jsonb_array_length(convert_from(value, 'UTF8')::jsonb), updated_at
           FROM cache
-         WHERE user_id=%s AND conversation_id=%s LIMIT 1
+         WHERE value IS NOT NULL
+        ON CONFLICT DO NOTHING
+        """
+
+    MIGRATE_LEGACY_ENTRIES_STATEMENT = """
+        INSERT INTO conversation_entries(user_id, conversation_id, seq, value, tokens)
+        SELECT cache.user_id, cache.conversation_id, entry.seq,
+               convert_to(entry.value::text, 'UTF8'),
+               COALESCE((entry.value #>> '{human_query,response_metadata,tokens_count}')
+                        ::integer, 0)
+               + COALESCE((entry.value #>> '{ai_response,response_metadata,tokens_count}')
+                          ::integer, 0)
+          FROM cache,
+               jsonb_array_elements(convert_from(cache.value, 'UTF8')::jsonb)
+               WITH ORDINALITY AS entry(value, seq)
+         WHERE cache.value IS NOT NULL
+        ON CONFLICT DO NOTHING
+        """
+
+    # the original table is kept, so it can be dropped once not needed
+    RETIRE_LEGACY_CACHE_TABLE = """
+        ALTER TABLE cache RENAME TO cache_migrated
         """
 
-    UPDATE_CONVERSATION_HISTORY_STATEMENT = """
-        UPDATE cache
-           SET value=%s, updated_at=CURRENT_TIMESTAMP
+    SELECT_CONVERSATION_HISTORY_STATEMENT = """
+        SELECT value
+          FROM conversation_entries
          WHERE user_id=%s AND conversation_id=%s
+         ORDER BY seq
         """
 
-    INSERT_CONVERSATION_HISTORY_STATEMENT = """
-        INSERT INTO cache(user_id, conversation_id, value, updated_at)
-        VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+    # entry is returned when tokens of newer entries do not exceed the limit
+    SELECT_CONVERSATION_TAIL_STATEMENT = """
+        SELECT value
+          FROM (SELECT seq, value,
+                       sum(tokens) OVER (ORDER BY seq DESC) - tokens AS newer_tokens
+                  FROM conversation_entries
+                 WHERE user_id=%(user_id)s AND conversation_id=%(conversation_id)s
+                 ORDER BY seq DESC
+                 LIMIT %(max_entries)s) AS tail
+         WHERE %(max_tokens)s::integer IS NULL OR newer_tokens <= %(max_tokens)s
+         ORDER BY seq
+        """
+
+    # conversation row is locked, so concurrent appends are serialized
+    APPEND_CONVERSATION_ENTRY_STATEMENT = """
+        WITH conversation AS (
+            INSERT INTO conversations(user_id, conversation_id, last_seq, updated_at)
+            VALUES (%s, %s, 1, CURRENT_TIMESTAMP)
+            ON CONFLICT (user_id, conversation_id) DO UPDATE
+               SET last_seq=conversations.last_seq + 1,
+                   updated_at=CURRENT_TIMESTAMP
+            RETURNING user_id, conversation_id, last_seq
+        )
+        INSERT INTO conversation_entries(user_id, conversation_id, seq, value, tokens)
+        SELECT user_id, conversation_id, last_seq, %s, %s
+          FROM conversation
+        RETURNING seq
         """
 
     DELETE_CONVERSATION_HISTORY_STATEMENT = """
-        DELETE FROM cache
+        DELETE FROM conversations
          WHERE (user_id, conversation_id) in
-               (SELECT user_id, conversation_id FROM cache ORDER BY updated_at LIMIT
+               (SELECT user_id, conversation_id FROM conversations ORDER BY updated_at LIMIT
         """
 
     QUERY_CACHE_SIZE = """
-        SELECT count(*) FROM cache;
+        SELECT count(*) FROM conversations;
         """
 
     DELETE_SINGLE_CONVERSATION_STATEMENT = """
-        DELETE FROM cache
+        DELETE FROM conversations
          WHERE user_id=%s AND conversation_id=%s
         """
 
+    # payload identifies the conversation and the service instance changing it
+    NOTIFY_STATEMENT = """
+        SELECT pg_notify(%s, %s)
+        """
+
     LIST_CONVERSATIONS_STATEMENT = """
         SELECT conversation_id
-        FROM cache
+        FROM conversations
         WHERE user_id=%s
         ORDER BY updated_at DESC
     """
 
-    def __init__(self, config: PostgresConfig) -> None:
+    def __init__(
+        self, config: PostgresConfig, notify_channel: Optional[str] = None
+    ) -> None:
         """Create a new instance of Postgres cache."""
         self.postgres_config = config
-
-        # initialize connection to DB
-        self.connect()
         self.capacity = config.max_entries
+        self.notify_channel = notify_channel
+        self.instance_id = suid.get_suid()
 
-    # pylint: disable=W0201
-    def connect(self) -> None:
-        """Initialize connection to database."""
         logger.info("Connecting to storage")
-        # make sure the connection will have known state
-        # even if PG is not alive
-        self.connection = None
+        self.pool = ConnectionPool(
+            self.connect,
+            min_size=config.min_connections,
+            max_size=config.max_connections,
+            timeout=constants.POSTGRES_CACHE_POOL_TIMEOUT,
+        )
+        try:
+            self.initialize_cache()
+        except Exception as e:
+            self.pool.close()
+            logger.exception("Error initializing Postgres cache:\n%s", e)
+            raise
+
+    def connect(self) -> psycopg2.extensions.connection:
+        """Open new connection to database."""
         config = self.postgres_config
-        self.connection = psycopg2.connect(
+        return psycopg2.connect(
             host=config.host,
             port=config.port,
             user=config.user,
@@ -115,45 +234,65 @@ class PostgresCache(Cache):
             sslrootcert=config.ca_cert_path,
             gssencmode=config.gss_encmode,
         )
-        try:
-            self.initialize_cache()
-        except Exception as e:
-            self.connection.close()
-            logger.exception("Error initializing Postgres cache:\n%s", e)
-            raise
-        self.connection.autocommit = True
-
-    def connected(self) -> bool:
-        """Check if connection to cache is alive."""
-        if self.connection is None:
-            logger.warning("Not connected, need to reconnect later")
-            return False
-        try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("SELECT 1")
-            logger.info("Connection to storage is ok")
-            return True
-        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
-            logger.error("Disconnected from storage: %s", e)
-            return False
 
     def initialize_cache(self) -> None:
         """Initialize cache - clean it up etc."""
-        # cursor as context manager is not used there on purpose
-        # any CREATE statement can raise it's own exception
-        # and it should not interfere with other statements
-        cursor = self.connection.cursor()
+        connection, _ = self.pool.get()
+        try:
+            # cursor as context manager is not used there on purpose
+            # any CREATE statement can raise it's own exception
+            # and it should not interfere with other statements
+            cursor = connection.cursor()
+
+            logger.info("Initializing tables for cache")
+            cursor.execute(PostgresCache.CREATE_CONVERSATIONS_TABLE)
+            cursor.execute(PostgresCache.CREATE_CONVERSATION_ENTRIES_TABLE)
 
-        logger.info("Initializing table for cache")
-        cursor.execute(PostgresCache.CREATE_CACHE_TABLE)
+            logger.info("Initializing index for cache")
+            cursor.execute(PostgresCache.CREATE_INDEX)
+
+            PostgresCache._migrate_legacy_cache(cursor)
+
+            cursor.close()
+            connection.commit()
+        except Exception:
+            self.pool.put(connection, discard=True)
+            raise
+        self.pool.put(connection)
 
-        logger.info("Initializing index for cache")
-        cursor.execute(PostgresCache.CREATE_INDEX)
+    def _execute(
+        self, operation: str, statements: Callable[[psycopg2.extensions.cursor], T]
+    ) -> T:
+        """Run statements in one transaction on a connection from the pool.
 
-        cursor.close()
-        self.connection.commit()
+        Connection is not checked before it is used. When a connection that
+        was idle in the pool turns out to be broken (eg. database has been
+        restarted), it is discarded and the statements are run again on
+        another connection - nothing has been executed on the broken one.
+        """
+        while True:
+            try:
+                connection, reused = self.pool.get()
+            except (PoolError, psycopg2.Error) as e:
+                logger.error("%s: %s", operation, e)
+                raise CacheError(operation, e) from e
+            try:
+                with connection, connection.cursor() as cursor:
+                    result = statements(cursor)
+            except psycopg2.Error as e:
+                broken = connection.closed != 0
+                self.pool.put(connection, discard=broken)
+                if broken and reused:
+                    logger.warning("%s: reconnecting to storage: %s", operation, e)
+                    continue
+                logger.error("%s: %s", operation, e)
+                raise CacheError(operation, e) from e
+            except BaseException:
+                self.pool.put(connection, discard=True)
+                raise
+            self.pool.put(connection)
+            return result
 
-    @connection
     def get(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
     ) -> list[CacheEntry]:
@@ -170,18 +309,47 @@ class PostgresCache(Cache):
         # just check if user_id and conversation_id are UUIDs
         super().construct_key(user_id, conversation_id, skip_user_id_check)
 
-        with self.connection.cursor() as cursor:
-            try:
-                value = PostgresCache._select(cursor, user_id, conversation_id)
-                if value is None:
-                    return []
-                history = [CacheEntry.from_dict(cache_entry) for cache_entry in value]
-                return history
-            except psycopg2.DatabaseError as e:
-                logger.error("PostgresCache.get %s", e)
-                raise CacheError("PostgresCache.get", e) from e
-
-    @connection
+        value = self._execute(
+            "PostgresCache.get",
+            lambda cursor: PostgresCache._select(cursor, user_id, conversation_id),
+        )
+        if value is None:
+            return []
+        return [CacheEntry.from_dict(cache_entry) for cache_entry in value]
+
+    def get_tail(
+        self,
+        user_id: str,
+        conversation_id: str,
+        max_entries: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        skip_user_id_check: bool = False,
+    ) -> list[CacheEntry]:
+        """Get the most recent entries of the conversation.
+
+        Only the entries in the tail are read from the database.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            max_entries: Maximal number of entries, unlimited when None.
+            max_tokens: Maximal tokens count of entries, unlimited when None.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            The most recent entries in chronological order.
+        """
+        # just check if user_id and conversation_id are UUIDs
+        super().construct_key(user_id, conversation_id, skip_user_id_check)
+
+        value = self._execute(
+            "PostgresCache.get_tail",
+            lambda cursor: PostgresCache._select_tail(
+                cursor, user_id, conversation_id, max_entries, max_tokens
+            ),
+        )
+        return [CacheEntry.from_dict(cache_entry) for cache_entry in value]
+
     def insert_or_append(
         self,
         user_id: str,
@@ -198,33 +366,35 @@ class PostgresCache(Cache):
             skip_user_id_check: Skip user_id suid check.
 
         """
-        value = cache_entry.to_dict()
+        self.append(user_id, conversation_id, cache_entry)
+
+    def append(
+        self, user_id: str, conversation_id: str, cache_entry: CacheEntry
+    ) -> int:
+        """Append entry to the conversation.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            cache_entry: The `CacheEntry` object to store.
+
+        Returns:
+            Sequence number of the entry, 1 for the first entry of new conversation.
+        """
+        value = json.dumps(cache_entry.to_dict(), cls=MessageEncoder).encode("utf-8")
+        tokens = cache_entry.tokens_count()
+
+        def append(cursor: psycopg2.extensions.cursor) -> int:
+            seq = PostgresCache._append(cursor, user_id, conversation_id, value, tokens)
+            # new conversation might exceed the cache capacity
+            if seq == 1:
+                PostgresCache._cleanup(cursor, self.capacity)
+            self._notify(cursor, user_id, conversation_id)
+            return seq
+
         # the whole operation is run in one transaction
-        with self.connection.cursor() as cursor:
-            try:
-                old_value = self._select(cursor, user_id, conversation_id)
-                if old_value:
-                    old_value.append(value)
-                    PostgresCache._update(
-                        cursor,
-                        user_id,
-                        conversation_id,
-                        json.dumps(old_value, cls=MessageEncoder).encode("utf-8"),
-                    )
-                else:
-                    PostgresCache._insert(
-                        cursor,
-                        user_id,
-                        conversation_id,
-                        json.dumps([value], cls=MessageEncoder).encode("utf-8"),
-                    )
-                    PostgresCache._cleanup(cursor, self.capacity)
-                # commit is implicit at this point
-            except psycopg2.DatabaseError as e:
-                logger.error("PostgresCache.insert_or_append: %s", e)
-                raise CacheError("PostgresCache.insert_or_append", e) from e
-
-    @connection
+        return self._execute("PostgresCache.insert_or_append", append)
+
     def delete(
         self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
     ) -> bool:
@@ -239,14 +409,15 @@ class PostgresCache(Cache):
             bool: True if the conversation was deleted, False if not found.
 
         """
-        with self.connection.cursor() as cursor:
-            try:
-                return PostgresCache._delete(cursor, user_id, conversation_id)
-            except psycopg2.DatabaseError as e:
-                logger.error("PostgresCache.delete: %s", e)
-                raise CacheError("PostgresCache.delete", e) from e
 
-    @connection
+        def delete(cursor: psycopg2.extensions.cursor) -> bool:
+            deleted = PostgresCache._delete(cursor, user_id, conversation_id)
+            if deleted:
+                self._notify(cursor, user_id, conversation_id)
+            return deleted
+
+        return self._execute("PostgresCache.delete", delete)
+
     def list(self, user_id: str, skip_user_id_check: bool = False) -> list[str]:
         """List all conversations for a given user_id.
 
@@ -258,33 +429,53 @@ class PostgresCache(Cache):
             A list of conversation ids from the cache
 
         """
-        with self.connection.cursor() as cursor:
-            try:
-                cursor.execute(PostgresCache.LIST_CONVERSATIONS_STATEMENT, (user_id,))
-                rows = cursor.fetchall()
-                return [row[0] for row in rows]
-            except psycopg2.DatabaseError as e:
-                logger.error("PostgresCache.list: %s", e)
-                raise CacheError("PostgresCache.list", e) from e
+
+        def list_conversations(cursor: psycopg2.extensions.cursor) -> list[str]:
+            cursor.execute(PostgresCache.LIST_CONVERSATIONS_STATEMENT, (user_id,))
+            return [row[0] for row in cursor.fetchall()]
+
+        return self._execute("PostgresCache.list", list_conversations)
 
     def ready(self) -> bool:
         """Check if the cache is ready.
 
-        Postgres cache checks if the connection is alive.
+        Postgres cache checks if a connection from the pool is alive, new
+        connection is opened when there is no idle one.
 
         Returns:
             True if the cache is ready, False otherwise.
         """
-        # TODO: when the connection is closed and the database is back online,
-        # we need to reestablish the connection => implement this
-        if not self.connection or self.connection.closed == 1:
+        try:
+            connection, _ = self.pool.get(timeout=0)
+        except PoolTimeoutError:
+            # all connections are in use, so the database is reachable
+            return True
+        except (PoolError, psycopg2.Error):
             return False
         try:
-            return self.connection.poll() == psycopg2.extensions.POLL_OK
+            alive = (
+                connection.closed == 0
+                and connection.poll() == psycopg2.extensions.POLL_OK
+            )
         except (psycopg2.OperationalError, psycopg2.InterfaceError):
             # OperationalError - the once alive connection is closed
             # InterfaceError - cannot reach the database server
-            return False
+            alive = False
+        self.pool.put(connection, discard=not alive)
+        return alive
+
+    @staticmethod
+    def _migrate_legacy_cache(cursor: psycopg2.extensions.cursor) -> None:
+        """Move conversations stored in the original cache table, if any."""
+        cursor.execute(PostgresCache.LOCK_MIGRATION_STATEMENT)
+        cursor.execute(PostgresCache.QUERY_LEGACY_CACHE_TABLE)
+        row = cursor.fetchone()
+        if row is None or row[0] is None:
+            return
+        logger.info("Migrating conversations from legacy cache table")
+        cursor.execute(PostgresCache.MIGRATE_LEGACY_CONVERSATIONS_STATEMENT)
+        cursor.execute(PostgresCache.MIGRATE_LEGACY_ENTRIES_STATEMENT)
+        cursor.execute(PostgresCache.RETIRE_LEGACY_CACHE_TABLE)
 
     @staticmethod
     def _select(
@@ -298,48 +489,63 @@ class PostgresCache(Cache):
             PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
             (user_id, conversation_id),
         )
-        value = cursor.fetchone()
+        rows = cursor.fetchall()
 
         # check if history exists at all
-        if value is None:
+        if not rows:
             return None
-
-        # check the retrieved value
-        if len(value) != 1:
-            raise ValueError("Invalid value read from cache:", value)
-
-        # convert from memoryview object to a string
-        text_value = str(value[0], "utf-8")
-        deserialized = json.loads(text_value, cls=MessageDecoder)
-
-        # try to deserialize the value
-        return deserialized
+        return PostgresCache._deserialize(rows)
 
     @staticmethod
-    def _update(
+    def _select_tail(
         cursor: psycopg2.extensions.cursor,
         user_id: str,
         conversation_id: str,
-        value: bytes,
-    ) -> None:
-        """Update conversation history for given user_id and conversation_id."""
+        max_entries: Optional[int],
+        max_tokens: Optional[int],
+    ) -> Any:
+        """Select the most recent entries of the conversation."""
         cursor.execute(
-            PostgresCache.UPDATE_CONVERSATION_HISTORY_STATEMENT,
-            (value, user_id, conversation_id),
+            PostgresCache.SELECT_CONVERSATION_TAIL_STATEMENT,
+            {
+                "user_id": user_id,
+                "conversation_id": conversation_id,
+                "max_entries": max_entries,
+                "max_tokens": max_tokens,
+            },
         )
+        return PostgresCache._deserialize(cursor.fetchall())
 
     @staticmethod
-    def _insert(
+    def _deserialize(rows: Sequence[Any]) -> Any:
+        """Deserialize conversation entries read from database."""
+        deserialized = []
+        for row in rows:
+            # check the retrieved value
+            if len(row) != 1:
+                raise ValueError("Invalid value read from cache:", row)
+            # convert from memoryview object to a string
+            text_value = str(row[0], "utf-8")
+            deserialized.append(json.loads(text_value, cls=MessageDecoder))
+        return deserialized
+
+    @staticmethod
+    def _append(
         cursor: psycopg2.extensions.cursor,
         user_id: str,
         conversation_id: str,
         value: bytes,
-    ) -> None:
-        """Insert new conversation history for given user_id and conversation_id."""
+        tokens: int,
+    ) -> int:
+        """Append cache entry to the conversation, return its sequence number."""
         cursor.execute(
-            PostgresCache.INSERT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id, value),
+            PostgresCache.APPEND_CONVERSATION_ENTRY_STATEMENT,
+            (user_id, conversation_id, value, tokens),
         )
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError("No sequence number returned for appended entry")
+        return row[0]
 
     @staticmethod
     def _cleanup(cursor: psycopg2.extensions.cursor, capacity: int) -> None:
@@ -354,6 +560,21 @@ class PostgresCache(Cache):
                     f"{PostgresCache.DELETE_CONVERSATION_HISTORY_STATEMENT} {count - capacity})"
                 )
 
+    def _notify(
+        self, cursor: psycopg2.extensions.cursor, user_id: str, conversation_id: str
+    ) -> None:
+        """Announce change of the conversation, if notifications are enabled."""
+        if self.notify_channel is None:
+            return
+        payload = json.dumps(
+            {
+                "sender": self.instance_id,
+                "user_id": user_id,
+                "conversation_id": conversation_id,
+            }
+        )
+        cursor.execute(PostgresCache.NOTIFY_STATEMENT, (self.notify_channel, payload))
+
     @staticmethod
     def _delete(
         cursor: psycopg2.extensions.cursor, user_id: str, conversation_id: str
@@ -363,4 +584,5 @@ class PostgresCache(Cache):
             PostgresCache.DELETE_SINGLE_CONVERSATION_STATEMENT,
             (user_id, conversation_id),
         )
-        return cursor.fetchone() is not None
+        # DELETE does not return rows, number of deleted rows tells the result
+        return cursor.rowcount > 0
@@ -0,0 +1,134 @@
+"""Sharded in-memory LRU cache implementation."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+from ols.src.cache.cache import Cache
+from ols.src.cache.in_memory_cache import LRUCache
+
+if TYPE_CHECKING:
+    from ols.app.models.config import ShardedInMemoryCacheConfig
+    from ols.app.models.models import CacheEntry
+
+
+class ShardedInMemoryCache(Cache):
+    """In-memory cache split into independent LRU shards.
+
+    Conversation is stored in the shard selected by hash of its compound
+    key, so requests working with different conversations mostly do not
+    wait for each other's lock. Every shard is an `LRUCache` evicting its
+    least recently used conversations independently of other shards.
+    """
+
+    def __init__(self, config: ShardedInMemoryCacheConfig) -> None:
+        """Create the shards."""
+        shard_config = config.shard_config()
+        self.shards = [LRUCache(shard_config) for _ in range(config.shards)]
+
+    def _shard(self, user_id: str, conversation_id: str) -> LRUCache:
+        """Select shard storing the conversation."""
+        return self.shards[hash((user_id, conversation_id)) % len(self.shards)]
+
+    def get(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> list[CacheEntry]:
+        """Get the value associated with the given key.
+
+        Args:
+          user_id: User identification.
+          conversation_id: Conversation ID unique for given user.
+          skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+          The value associated with the key, or `None` if the key is not present.
+        """
+        return self._shard(user_id, conversation_id).get(
+            user_id, conversation_id, skip_user_id_check
+        )
+
+    def get_tail(
+        self,
+        user_id: str,
+        conversation_id: str,
+        max_entries: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        skip_user_id_check: bool = False,
+    ) -> list[CacheEntry]:
+        """Get the most recent entries of the conversation.
+
+        Args:
+          user_id: User identification.
+          conversation_id: Conversation ID unique for given user.
+          max_entries: Maximal number of entries, unlimited when None.
+          max_tokens: Maximal tokens count of entries, unlimited when None.
+          skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+          The most recent entries in chronological order.
+        """
+        return self._shard(user_id, conversation_id).get_tail(
+            user_id, conversation_id, max_entries, max_tokens, skip_user_id_check
+        )
+
+    def insert_or_append(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Set the value if a key is not present or else simply appends.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            cache_entry: The `CacheEntry` object to store.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        self._shard(user_id, conversation_id).insert_or_append(
+            user_id, conversation_id, cache_entry, skip_user_id_check
+        )
+
+    def delete(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> bool:
+        """Delete all entries for a given conversation.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            bool: True if entries were deleted, False if key wasn't found.
+        """
+        return self._shard(user_id, conversation_id).delete(
+            user_id, conversation_id, skip_user_id_check
+        )
+
+    def list(self, user_id: str, skip_user_id_check: bool = False) -> list[str]:
+        """List all conversations for a given user_id.
+
+        Args:
+            user_id: User identification.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            A list of conversation ids from the cache
+        """
+        super()._check_user_id(user_id, skip_user_id_check)
+        conversation_ids = []
+        for shard in self.shards:
+            conversation_ids.extend(shard.list(user_id, skip_user_id_check=True))
+        return conversation_ids
+
+    def ready(self) -> bool:
+        """Check if the cache is ready.
+
+           In memory cache is always ready.
+
+        Returns:
+            True if the cache is ready, False otherwise.
+        """
+        return True
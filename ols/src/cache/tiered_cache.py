@@ -0,0 +1,360 @@
+"""In-memory LRU cache in front of Postgres cache."""
+
+from __future__ import annotations
+
+import json
+import logging
+import select
+import threading
+from typing import TYPE_CHECKING, Callable, Optional
+
+import psycopg2
+from psycopg2 import sql
+
+from ols import constants
+from ols.src.cache.cache import Cache
+from ols.src.cache.in_memory_cache import CachedConversation, CachedEntry, LRUCache
+from ols.src.cache.postgres_cache import PostgresCache
+
+if TYPE_CHECKING:
+    from ols.app.models.config import InMemoryCacheConfig, TieredCacheConfig
+    from ols.app.models.models import CacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationsTier(LRUCache):
+    """LRU cache holding copies of conversations stored in Postgres.
+
+    Copy of a conversation is complete unless its oldest entries have been
+    dropped to fit into `max_bytes`. Entry is appended to the copy only when
+    its sequence number follows the last entry of the copy, otherwise the
+    copy is dropped.
+
+    Every change of the cache increments `version`. Conversation read from
+    Postgres is stored only when the version has not changed since the read
+    started, so the copy can't miss an entry appended in the meantime.
+    """
+
+    def __init__(self, config: InMemoryCacheConfig) -> None:
+        """Create a new instance of the cache."""
+        super().__init__(config)
+        self.version = 0
+
+    def lookup(self, key: str) -> Optional[tuple[list[CachedEntry], bool]]:
+        """Find the conversation.
+
+        Returns:
+            Entries of the conversation and flag telling whether the copy is
+            complete, or `None` if the conversation is not cached.
+        """
+        with self._cache_lock:
+            conversation = self._lookup(key)
+            if conversation is None:
+                return None
+            return conversation.entries.copy(), conversation.dropped == 0
+
+    def fill(self, key: str, entries: list[CacheEntry], version: int) -> None:
+        """Store conversation read from Postgres when `version` is still current."""
+        cached_entries = [CachedEntry.from_cache_entry(entry) for entry in entries]
+        with self._cache_lock:
+            if self.version != version or key in self.cache:
+                return
+            conversation = self.cache[key] = CachedConversation()
+            for entry in cached_entries:
+                conversation.append(entry)
+            self.size += conversation.size
+            self._evict()
+
+    def append(self, key: str, cache_entry: CacheEntry, seq: int) -> None:
+        """Append entry stored in Postgres with the given sequence number."""
+        entry = CachedEntry.from_cache_entry(cache_entry)
+        with self._cache_lock:
+            self.version += 1
+            conversation = self.cache.get(key)
+            if conversation is not None and (
+                conversation.dropped + len(conversation.entries) != seq - 1
+            ):
+                # entries appended by other instance (or conversation recreated)
+                self._remove(key)
+                conversation = None
+            if conversation is None:
+                if seq != 1:
+                    return  # older entries are not cached
+                conversation = self.cache[key] = CachedConversation()
+            else:
+                self.cache.move_to_end(key)
+            conversation.append(entry)
+            self.size += entry.size
+            self._evict()
+
+    def invalidate(self, key: str) -> None:
+        """Drop the conversation."""
+        with self._cache_lock:
+            self.version += 1
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Drop all conversations."""
+        with self._cache_lock:
+            self.version += 1
+            self.cache.clear()
+            self.size = 0
+
+    def _remove(self, key: str) -> None:
+        """Remove the conversation, if cached."""
+        conversation = self.cache.pop(key, None)
+        if conversation is not None:
+            self.size -= conversation.size
+
+
+class InvalidationListener:
+    """Listens to notifications about conversations changed by other instances.
+
+    The listener uses its own connection in autocommit mode. Notifications
+    sent while the listener is disconnected are lost, so `on_listen` is
+    called every time the listener starts listening (again).
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], psycopg2.extensions.connection],
+        channel: str,
+        on_notification: Callable[[str], None],
+        on_listen: Callable[[], None],
+    ) -> None:
+        """Initialize the listener."""
+        self._connect = connect
+        self.channel = channel
+        self._on_notification = on_notification
+        self._on_listen = on_listen
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="conversation-cache-listener", daemon=True
+        )
+
+    def start(self) -> None:
+        """Start listening in a background thread."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop listening and wait for the background thread."""
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Listen to notifications, reconnect when connection is lost."""
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except (psycopg2.Error, OSError) as e:
+                logger.warning(
+                    "conversation cache invalidation listener disconnected: %s", e
+                )
+            self._stop.wait(constants.TIERED_CACHE_LISTENER_RECONNECT_INTERVAL)
+
+    def _listen(self) -> None:
+        """Listen to notifications until the listener is stopped."""
+        connection = self._connect()
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    sql.SQL("LISTEN {}").format(sql.Identifier(self.channel))
+                )
+            self._on_listen()
+            while not self._stop.is_set():
+                readable, _, _ = select.select(
+                    [connection], [], [], constants.TIERED_CACHE_LISTENER_POLL_INTERVAL
+                )
+                if not readable:
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    self._on_notification(connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+
+class TieredCache(Cache):
+    """In-memory LRU cache in front of Postgres cache.
+
+    Entries are written through to Postgres and appended to the conversation
+    kept in memory, so follow-up queries handled by the same instance read
+    the history without a database round-trip. Conversation not found in
+    memory is read from Postgres (as a whole) and kept in memory too.
+
+    With `invalidation` enabled, conversations changed by other service
+    instances are dropped from memory when the change is announced via
+    Postgres notifications. Without it, every instance might read its own
+    outdated copy, so it is suitable for a single instance only.
+    """
+
+    def __init__(self, config: TieredCacheConfig) -> None:
+        """Create a new instance of the cache."""
+        channel = constants.TIERED_CACHE_NOTIFY_CHANNEL if config.invalidation else None
+        self.memory = ConversationsTier(config.memory)
+        self.postgres = PostgresCache(config.postgres, notify_channel=channel)
+        self.listener: Optional[InvalidationListener] = None
+        if channel is not None:
+            self.listener = InvalidationListener(
+                self.postgres.connect,
+                channel,
+                self._on_notification,
+                self.memory.clear,
+            )
+            self.listener.start()
+
+    def _load(self, key: str, user_id: str, conversation_id: str) -> list[CacheEntry]:
+        """Read the conversation from Postgres and keep it in memory."""
+        version = self.memory.version
+        cache_entries = self.postgres.get(user_id, conversation_id, True)
+        if cache_entries:
+            self.memory.fill(key, cache_entries, version)
+        return cache_entries
+
+    def _on_notification(self, payload: str) -> None:
+        """Drop conversation changed by other instance."""
+        try:
+            notification = json.loads(payload)
+            if notification["sender"] == self.postgres.instance_id:
+                return
+            key = Cache.construct_key(
+                notification["user_id"], notification["conversation_id"], True
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(
+                "invalid conversation cache notification '%s': %s", payload, e
+            )
+            return
+        self.memory.invalidate(key)
+
+    def get(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> list[CacheEntry]:
+        """Get the value associated with the given key.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            The value associated with the key, empty list if not found.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+
+        found = self.memory.lookup(key)
+        if found is not None and found[1]:
+            return [entry.to_cache_entry() for entry in found[0]]
+        return self._load(key, user_id, conversation_id)
+
+    def get_tail(
+        self,
+        user_id: str,
+        conversation_id: str,
+        max_entries: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        skip_user_id_check: bool = False,
+    ) -> list[CacheEntry]:
+        """Get the most recent entries of the conversation.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            max_entries: Maximal number of entries, unlimited when None.
+            max_tokens: Maximal tokens count of entries, unlimited when None.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            The most recent entries in chronological order.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+
+        found = self.memory.lookup(key)
+        if found is None:
+            cache_entries = self._load(key, user_id, conversation_id)
+            length = Cache.tail_length(
+                (entry.tokens_count() for entry in reversed(cache_entries)),
+                max_entries,
+                max_tokens,
+            )
+            return cache_entries[len(cache_entries) - length :]
+
+        entries, complete = found
+        length = Cache.tail_length(
+            (entry.tokens_count for entry in reversed(entries)),
+            max_entries,
+            max_tokens,
+        )
+        if not complete and length == len(entries) != max_entries:
+            # the tail might continue with entries dropped from memory
+            return self.postgres.get_tail(
+                user_id, conversation_id, max_entries, max_tokens, True
+            )
+        return [entry.to_cache_entry() for entry in entries[len(entries) - length :]]
+
+    def insert_or_append(
+        self,
+        user_id: str,
+        conversation_id: str,
+        cache_entry: CacheEntry,
+        skip_user_id_check: bool = False,
+    ) -> None:
+        """Store the entry in Postgres and append it to the conversation in memory.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            cache_entry: The `CacheEntry` object to store.
+            skip_user_id_check: Skip user_id suid check.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+
+        try:
+            seq = self.postgres.append(user_id, conversation_id, cache_entry)
+        except Exception:
+            # the entry might have been stored before the failure
+            self.memory.invalidate(key)
+            raise
+        self.memory.append(key, cache_entry, seq)
+
+    def delete(
+        self, user_id: str, conversation_id: str, skip_user_id_check: bool = False
+    ) -> bool:
+        """Delete conversation history for a given user_id and conversation_id.
+
+        Args:
+            user_id: User identification.
+            conversation_id: Conversation ID unique for given user.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            bool: True if the conversation was deleted, False if not found.
+        """
+        key = super().construct_key(user_id, conversation_id, skip_user_id_check)
+
+        try:
+            return self.postgres.delete(user_id, conversation_id, True)
+        finally:
+            self.memory.invalidate(key)
+
+    def list(self, user_id: str, skip_user_id_check: bool = False) -> list[str]:
+        """List all conversations for a given user_id.
+
+        Args:
+            user_id: User identification.
+            skip_user_id_check: Skip user_id suid check.
+
+        Returns:
+            A list of conversation ids from the cache
+        """
+        return self.postgres.list(user_id, skip_user_id_check)
+
+    def ready(self) -> bool:
+        """Check if the cache is ready.
+
+        Returns:
+            True if the Postgres cache is ready, False otherwise.
+        """
+        return self.postgres.ready()
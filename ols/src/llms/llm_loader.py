@@ -1,16 +1,28 @@
 """LLM backend libraries loader."""
 
 import logging
+import threading
 from typing import Any, Optional
 
 from langchain.llms.base import LLM
+from prometheus_client import Counter, Gauge
 
 from ols import config, constants
 from ols.app.models.config import LLMProviders, ProviderConfig
+from ols.src.llms.providers.provider import LLMProvider
 from ols.src.llms.providers.registry import LLMProvidersRegistry
 
 logger = logging.getLogger(__name__)
 
+# metrics are defined there as ols.app.metrics imports modules loading LLMs
+llm_pool_hits_total = Counter(
+    "ols_llm_pool_hits_total", "Loaded LLMs reused from pool", ["provider", "model"]
+)
+llm_pool_misses_total = Counter(
+    "ols_llm_pool_misses_total", "LLMs loaded into pool", ["provider", "model"]
+)
+llm_pool_size = Gauge("ols_llm_pool_size", "Number of loaded LLMs in pool")
+
 
 class LLMConfigurationError(Exception):
     """LLM configuration is wrong."""
@@ -52,6 +64,78 @@ def resolve_provider_config(
     return provider_config
 
 
+class LLMPool:
+    """Process-wide pool of loaded LLMs.
+
+    Loading LLM creates provider client including its HTTP clients, so the
+    connections (and TLS sessions) are kept alive between requests when the
+    loaded LLM is reused. LLMs are pooled by provider, model and generic
+    parameters, the pool is invalidated when configuration is reloaded.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty pool."""
+        self._lock = threading.Lock()
+        self._llms: dict[tuple, tuple[LLMProvider, LLM]] = {}
+        # configuration the pooled LLMs were loaded with
+        self._config: Optional[tuple[Any, Any]] = None
+
+    @staticmethod
+    def construct_key(provider: str, model: str, generic_llm_params: dict) -> tuple:
+        """Construct key for LLM loaded with given parameters."""
+        return provider, model, tuple(sorted(generic_llm_params.items()))
+
+    def _check_config(self) -> None:
+        """Drop pooled LLMs when configuration was reloaded (lock must be held)."""
+        current_config = (config.config, config.config.llm_providers)
+        if self._config is None or any(
+            current is not pooled
+            for current, pooled in zip(current_config, self._config)
+        ):
+            self._llms.clear()
+            self._config = current_config
+            llm_pool_size.set(0)
+
+    def get(self, key: tuple) -> Optional[LLM]:
+        """Get loaded LLM from pool if it is still valid."""
+        provider, model, _ = key
+        with self._lock:
+            self._check_config()
+            entry = self._llms.get(key)
+            if entry is not None and entry[0].is_expired():
+                logger.debug("pooled LLM '%s' from '%s' expired", model, provider)
+                del self._llms[key]
+                llm_pool_size.set(len(self._llms))
+                entry = None
+        if entry is None:
+            llm_pool_misses_total.labels(provider=provider, model=model).inc()
+            return None
+        llm_pool_hits_total.labels(provider=provider, model=model).inc()
+        return entry[1]
+
+    def put(self, key: tuple, llm_provider: LLMProvider, llm: LLM) -> None:
+        """Store loaded LLM into pool."""
+        with self._lock:
+            self._check_config()
+            self._llms[key] = (llm_provider, llm)
+            llm_pool_size.set(len(self._llms))
+
+    def clear(self) -> None:
+        """Drop all pooled LLMs."""
+        with self._lock:
+            self._llms.clear()
+            self._config = None
+            llm_pool_size.set(0)
+
+    def __len__(self) -> int:
+        """Return number of pooled LLMs."""
+        with self._lock:
+            return len(self._llms)
+
+
+llm_pool = LLMPool()
+
+
 def load_llm(
     provider: str,
     model: str,
@@ -59,6 +143,9 @@ def load_llm(
 ) -> LLM | Any:  # Temporarily using Any, as mypy gives error for missing bind_tools
     """Load LLM according to input provider and model.
 
+    LLM loaded with the same provider, model and parameters is reused from
+    process-wide pool.
+
     Args:
         provider: The provider name.
         model: The model name.
@@ -85,6 +172,12 @@ def load_llm(
         raise LLMConfigurationError(
             f"Providers configuration missing in {constants.DEFAULT_CONFIGURATION_FILE}"
         )
+    generic_llm_params = generic_llm_params or {}
+    pool_key = LLMPool.construct_key(provider, model, generic_llm_params)
+    llm = llm_pool.get(pool_key)
+    if llm is not None:
+        return llm
+
     llm_providers_reg = LLMProvidersRegistry
 
     provider_config = resolve_provider_config(provider, model, providers_config)
@@ -95,5 +188,9 @@ def load_llm(
 
     logger.debug("loading LLM model '%s' from provider '%s'", model, provider)
 
-    llm_provider = llm_providers_reg.llm_providers[provider_config.type]
-    return llm_provider(model, provider_config, generic_llm_params or {}).load()
+    llm_provider = llm_providers_reg.llm_providers[provider_config.type](
+        model, provider_config, generic_llm_params
+    )
+    llm = llm_provider.load()
+    llm_pool.put(pool_key, llm_provider, llm)
+    return llm
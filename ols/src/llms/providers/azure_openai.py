@@ -99,6 +99,10 @@ class AzureOpenAI(LLMProvider):
         """Load LLM."""
         return AzureChatOpenAI(**self.params)
 
+    def is_expired(self) -> bool:
+        """Check if LLM was loaded with Azure AD token which has expired."""
+        return self.credentials is None and TOKEN_CACHE.is_expired()
+
     def resolve_access_token(self, azure_config: AzureOpenAIConfig) -> Optional[str]:
         """Retrieve and cache Azure OpenAI access token."""
         if TOKEN_CACHE.is_expired():
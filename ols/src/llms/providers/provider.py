@@ -2,9 +2,8 @@
 
 import abc
 import logging
-import ssl
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 import httpx
 from ibm_watsonx_ai.metanames import GenTextParamsMetaNames as GenParams
@@ -25,6 +24,9 @@ from ols.constants import (
 )
 from ols.utils import tls
 
+if TYPE_CHECKING:
+    import ssl
+
 logger = logging.getLogger(__name__)
 
 
@@ -232,6 +234,14 @@ class LLMProvider(AbstractLLMProvider):
         params = self._remap_to_llm_params(params)
         self.params = self._validate_parameters(params)
 
+    def is_expired(self) -> bool:
+        """Check if LLM loaded by this provider must not be used anymore.
+
+        Loaded LLMs are reused for subsequent requests, providers with
+        short-lived credentials need to be loaded again when they expire.
+        """
+        return False
+
     def _remap_to_llm_params(
         self, generic_llm_params: dict[str, Any]
     ) -> dict[str, Any]:
@@ -333,7 +343,7 @@ class LLMProvider(AbstractLLMProvider):
 
         return updated_params
 
-    def _construct_httpx_client(  # noqa: C901
+    def _construct_httpx_client(
         self, use_custom_certificate_store: bool, use_async: bool
     ) -> httpx.Client | httpx.AsyncClient:
         """Construct HTTPX client instance to be used to communicate with LLM."""
@@ -348,8 +358,9 @@ class LLMProvider(AbstractLLMProvider):
             )
             proxy_context = None
             if config.ols_config.proxy_config.is_https():
-                proxy_context = ssl.create_default_context(
-                    cafile=config.ols_config.proxy_config.proxy_ca_cert_path
+                proxy_context = tls.ssl_context(
+                    cafile=config.ols_config.proxy_config.proxy_ca_cert_path,
+                    load_default_certs=False,
                 )
             proxy = httpx.Proxy(
                 url=config.ols_config.proxy_config.proxy_url, ssl_context=proxy_context
@@ -380,12 +391,10 @@ class LLMProvider(AbstractLLMProvider):
                     "Custom Certificate store location: %s",
                     self.provider_config.certificates_store,
                 )
-                custom_context = ssl.create_default_context()
-                custom_context.check_hostname = False
-                custom_context.load_verify_locations(
-                    cafile=self.provider_config.certificates_store
+                verify = tls.ssl_context(
+                    cafile=self.provider_config.certificates_store,
+                    check_hostname=False,
                 )
-                verify = custom_context
             logger.info(
                 "No security profiles. creating httpx.Client with verify %s", verify
             )
@@ -405,16 +414,15 @@ class LLMProvider(AbstractLLMProvider):
         ssl_version = tls.ssl_tls_version(min_tls_version)
         logger.info("SSL version: %d", ssl_version)
 
-        context = ssl.create_default_context()
-
-        if ssl_version is not None:
-            context.minimum_version = ssl_version
-
-        if ciphers is not None:
-            context.set_ciphers(ciphers)
-
-        if use_custom_certificate_store:
-            context.load_verify_locations(self.provider_config.certificates_store)
+        context = tls.ssl_context(
+            cafile=(
+                self.provider_config.certificates_store
+                if use_custom_certificate_store
+                else None
+            ),
+            minimum_version=ssl_version,
+            ciphers=ciphers,
+        )
         logger.info(
             "With security profile, creating httpx.Client with verify %s", context
         )
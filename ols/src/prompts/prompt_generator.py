@@ -1,5 +1,7 @@
 """Prompt generator based on model / context."""
 
+from functools import lru_cache
+
 from langchain_core.messages import BaseMessage
 from langchain_core.prompts import (
     ChatPromptTemplate,
@@ -8,7 +10,7 @@ from langchain_core.prompts import (
     SystemMessagePromptTemplate,
 )
 
-from ols.constants import ModelFamily
+from ols.constants import PROMPT_TEMPLATE_CACHE_SIZE, ModelFamily
 from ols.customize import prompts
 
 
@@ -17,6 +19,49 @@ def format_retrieved_chunk(rag_content: str) -> str:
     return f"Document:\n{rag_content}"
 
 
+@lru_cache(maxsize=PROMPT_TEMPLATE_CACHE_SIZE)
+def _prompt_template(
+    system_instruction: str,
+    model_family: ModelFamily,
+    tool_call: bool,
+    has_context: bool,
+    has_history: bool,
+) -> ChatPromptTemplate:
+    """Build prompt template.
+
+    Template depends on the prompt shape only, not on query, context or
+    history content, so it is built once for each shape and cached.
+    """
+    prompt_message = []
+    sys_intruction = system_instruction.strip()
+
+    if tool_call:
+        agent_instructions = prompts.AGENT_INSTRUCTION_GENERIC.strip()
+        if model_family == ModelFamily.GRANITE:
+            agent_instructions = prompts.AGENT_INSTRUCTION_GRANITE.strip()
+        agent_instructions = (
+            agent_instructions + "\n" + prompts.AGENT_SYSTEM_INSTRUCTION.strip()
+        )
+        sys_intruction = sys_intruction + "\n" + agent_instructions
+
+    if has_context:
+        sys_intruction = sys_intruction + "\n" + prompts.USE_CONTEXT_INSTRUCTION.strip()
+
+    if has_history:
+        sys_intruction = sys_intruction + "\n" + prompts.USE_HISTORY_INSTRUCTION.strip()
+
+    if has_context:
+        sys_intruction = sys_intruction + "\n{context}"
+
+    prompt_message.append(SystemMessagePromptTemplate.from_template(sys_intruction))
+
+    if has_history:
+        prompt_message.append(MessagesPlaceholder("chat_history"))
+
+    prompt_message.append(HumanMessagePromptTemplate.from_template("{query}"))
+    return ChatPromptTemplate.from_messages(prompt_message)
+
+
 class GeneratePrompt:
     """Generate prompt dynamically."""
 
@@ -37,39 +82,28 @@ class GeneratePrompt:
 
     def generate_prompt(self, model: str) -> tuple[ChatPromptTemplate, dict]:
         """Generate prompt."""
-        prompt_message = []
-        sys_intruction = self._sys_instruction.strip()
         llm_input_values: dict = {"query": self._query}
 
-        if self._tool_call:
-            agent_instructions = prompts.AGENT_INSTRUCTION_GENERIC.strip()
-            if ModelFamily.GRANITE in model:
-                agent_instructions = prompts.AGENT_INSTRUCTION_GRANITE.strip()
-            agent_instructions = (
-                agent_instructions + "\n" + prompts.AGENT_SYSTEM_INSTRUCTION.strip()
-            )
-            sys_intruction = sys_intruction + "\n" + agent_instructions
-
         if len(self._rag_context) > 0:
             llm_input_values["context"] = "\n".join(self._rag_context)
-            sys_intruction = (
-                sys_intruction + "\n" + prompts.USE_CONTEXT_INSTRUCTION.strip()
-            )
 
         if len(self._history) > 0:
             llm_input_values["chat_history"] = self._history
 
-            sys_intruction = (
-                sys_intruction + "\n" + prompts.USE_HISTORY_INSTRUCTION.strip()
-            )
-
-        if "context" in llm_input_values:
-            sys_intruction = sys_intruction + "\n{context}"
-
-        prompt_message.append(SystemMessagePromptTemplate.from_template(sys_intruction))
-
-        if "chat_history" in llm_input_values:
-            prompt_message.append(MessagesPlaceholder("chat_history"))
-
-        prompt_message.append(HumanMessagePromptTemplate.from_template("{query}"))
-        return ChatPromptTemplate.from_messages(prompt_message), llm_input_values
+        # only granite models get specific instructions, others use generic ones
+        model_family = (
+            ModelFamily.GRANITE if ModelFamily.GRANITE in model else ModelFamily.GPT
+        )
+        prompt = _prompt_template(
+            self._sys_instruction,
+            model_family,
+            self._tool_call,
+            "context" in llm_input_values,
+            "chat_history" in llm_input_values,
+        )
+        # cached template is shared, messages (tool calls etc.) can be added
+        # to the returned prompt, so it needs its own list of messages
+        return (
+            prompt.model_copy(update={"messages": list(prompt.messages)}),
+            llm_input_values,
+        )
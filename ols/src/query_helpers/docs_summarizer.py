@@ -4,25 +4,32 @@
 import asyncio
 import json
 import logging
+from contextlib import aclosing
 from typing import Any, AsyncGenerator, Callable, Optional
 
 from langchain.globals import set_debug
 from langchain_core.messages import AIMessage, BaseMessage
 from langchain_core.messages.ai import AIMessageChunk
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_mcp_adapters.client import MultiServerMCPClient
 from llama_index.core.retrievers import BaseRetriever
 
 from ols import config, constants
 from ols.app.metrics import TokenMetricUpdater
 from ols.app.metrics.token_counter import GenericTokenCounter
-from ols.app.models.models import RagChunk, StreamedChunk, SummarizerResponse
+from ols.app.models.models import (
+    PromptTokenBudget,
+    RagChunk,
+    StreamedChunk,
+    SummarizerResponse,
+)
 from ols.constants import MAX_ITERATIONS, GenericLLMParameters
 from ols.customize import reranker
 from ols.src.prompts.prompt_generator import GeneratePrompt
 from ols.src.query_helpers.query_helper import QueryHelper
 from ols.src.tools.mcp_config_builder import MCPConfigBuilder
-from ols.src.tools.tools import execute_tool_calls
+from ols.src.tools.mcp_session_manager import mcp_session_manager
+from ols.src.tools.tool_results_cache import UserToolResults
+from ols.src.tools.tools import ToolsIndex, iter_tool_calls
 from ols.utils.token_handler import TokenHandler
 
 logger = logging.getLogger(__name__)
@@ -138,7 +145,9 @@ class DocsSummarizer(QueryHelper):
         query: str,
         rag_retriever: Optional[BaseRetriever] = None,
         history: Optional[list[BaseMessage]] = None,
-    ) -> tuple[ChatPromptTemplate, dict[str, str], list[RagChunk], bool]:
+    ) -> tuple[
+        ChatPromptTemplate, dict[str, str], list[RagChunk], bool, PromptTokenBudget
+    ]:
         """Summarize the given query based on the provided conversation context.
 
         Args:
@@ -148,7 +157,7 @@ class DocsSummarizer(QueryHelper):
 
         Returns:
             A tuple containing the final prompt, input values, RAG chunks,
-            and a flag for truncated history.
+            a flag for truncated history and token counts of the prompt parts.
         """
         # if history is not provided, initialize to empty history
         if history is None:
@@ -200,16 +209,21 @@ class DocsSummarizer(QueryHelper):
             self._tool_calling_enabled,
         ).generate_prompt(self.model)
 
-        # Tokens-check: We trigger the computation of the token count
-        # without care about the return value. This is to ensure that
-        # the query is within the token limit.
-        token_handler.calculate_and_check_available_tokens(
-            final_prompt.format(**llm_input_values),
+        # Tokens-check: Every part of the final prompt was already encoded
+        # above, so the counts are just added up to ensure that the query
+        # is within the token limit.
+        token_handler.check_prompt_budget(
             self.model_config.context_window_size,
             self.model_config.parameters.max_tokens_for_response,
         )
 
-        return final_prompt, llm_input_values, rag_chunks, truncated
+        return (
+            final_prompt,
+            llm_input_values,
+            rag_chunks,
+            truncated,
+            token_handler.prompt_budget,
+        )
 
     async def _invoke_llm(
         self,
@@ -266,13 +280,17 @@ class DocsSummarizer(QueryHelper):
         Yields:
             StreamedChunk objects representing parts of the response
         """
-        async with asyncio.timeout(constants.TOOL_CALL_ROUND_TIMEOUT * max_rounds):
-            try:
-                mcp_client = MultiServerMCPClient(self.mcp_servers)
-                all_mcp_tools = await mcp_client.get_tools()
-            except Exception as e:
-                logger.error("Failed to get MCP tools: %s", e)
-                all_mcp_tools = {}
+        async with (
+            asyncio.timeout(constants.TOOL_CALL_ROUND_TIMEOUT * max_rounds),
+            # sessions (and tools) are kept open across requests
+            mcp_session_manager.tools(self.mcp_servers) as all_mcp_tools,
+        ):
+            # index is built once, tools are looked up by name in every round
+            tools_index = ToolsIndex(all_mcp_tools, config.mcp_servers.servers)
+            tool_results = UserToolResults(
+                self.user_token or constants.NO_USER_TOKEN,
+                config.mcp_servers.servers,
+            )
 
             # Tool calling in a loop
             for i in range(1, max_rounds + 1):
@@ -286,7 +304,7 @@ class DocsSummarizer(QueryHelper):
                 async for chunk in self._invoke_llm(
                     messages,
                     llm_input_values,
-                    tools_map=all_mcp_tools,
+                    tools_map=tools_index.tools,
                     is_final_round=is_final_round,
                     token_counter=token_counter,
                 ):
@@ -346,38 +364,51 @@ class DocsSummarizer(QueryHelper):
 
                         yield StreamedChunk(type="tool_call", data=tool_call)
 
-                    # execute tools and add to messages
-                    tool_calls_messages = await execute_tool_calls(
-                        tool_calls, all_mcp_tools
-                    )
-                    messages.extend(tool_calls_messages)
-                    for tool_call_message in tool_calls_messages:
-                        # Log tool result in JSON format
-                        logger.info(
-                            json.dumps(
-                                {
-                                    "event": "tool_result",
-                                    "tool_id": tool_call_message.tool_call_id,
+                    # execute tools, each result is streamed as soon as its
+                    # tool call completes, unfinished calls are cancelled when
+                    # the stream is closed
+                    tool_calls_messages = []
+                    async with aclosing(
+                        iter_tool_calls(tool_calls, tools_index, tool_results)
+                    ) as tool_calls_stream:
+                        async for tool_call_message in tool_calls_stream:
+                            tool_calls_messages.append(tool_call_message)
+                            # Truncate to first 1000 chars
+                            output_snippet = str(tool_call_message.content)[:1000]
+                            # Log tool result in JSON format
+                            logger.info(
+                                json.dumps(
+                                    {
+                                        "event": "tool_result",
+                                        "tool_id": tool_call_message.tool_call_id,
+                                        "status": tool_call_message.status,
+                                        "output_snippet": output_snippet,
+                                    },
+                                    ensure_ascii=False,
+                                    indent=2,
+                                )
+                            )
+
+                            yield StreamedChunk(
+                                type="tool_result",
+                                data={
+                                    "id": tool_call_message.tool_call_id,
                                     "status": tool_call_message.status,
-                                    "output_snippet": str(tool_call_message.content)[
-                                        :1000
-                                    ],  # Truncate to first 1000 chars
+                                    "content": tool_call_message.content,
+                                    "type": "tool_result",
+                                    "round": i,
                                 },
-                                ensure_ascii=False,
-                                indent=2,
                             )
-                        )
 
-                        yield StreamedChunk(
-                            type="tool_result",
-                            data={
-                                "id": tool_call_message.tool_call_id,
-                                "status": tool_call_message.status,
-                                "content": tool_call_message.content,
-                                "type": "tool_result",
-                                "round": i,
-                            },
-                        )
+                    # results are passed to the LLM in order of the tool calls
+                    positions = {
+                        tool_call.get("id"): position
+                        for position, tool_call in enumerate(tool_calls)
+                    }
+                    tool_calls_messages.sort(
+                        key=lambda message: positions.get(message.tool_call_id, 0)
+                    )
+                    messages.extend(tool_calls_messages)
 
     async def generate_response(
         self,
@@ -395,8 +426,8 @@ class DocsSummarizer(QueryHelper):
         Yields:
             StreamedChunk objects representing parts of the response
         """
-        final_prompt, llm_input_values, rag_chunks, truncated = self._prepare_prompt(
-            query, rag_retriever, history
+        final_prompt, llm_input_values, rag_chunks, truncated, prompt_budget = (
+            self._prepare_prompt(query, rag_retriever, history)
         )
         messages = final_prompt.model_copy()
 
@@ -404,6 +435,7 @@ class DocsSummarizer(QueryHelper):
             llm=self.bare_llm,
             provider=self.provider_config.type,
             model=self.model,
+            prompt_tokens=prompt_budget.total,
         ) as token_counter:
             async for response in self.iterate_with_tools(
                 messages=messages,
@@ -422,6 +454,52 @@ class DocsSummarizer(QueryHelper):
             },
         )
 
+    async def acreate_response(
+        self,
+        query: str,
+        rag_retriever: Optional[BaseRetriever] = None,
+        history: Optional[list[BaseMessage]] = None,
+    ) -> SummarizerResponse:
+        """Create a complete (non-streamed) response for the given query.
+
+        Args:
+            query: The query to be answered
+            rag_retriever: Retriever for RAG context
+            history: Optional conversation history
+
+        Returns:
+            A SummarizerResponse object containing the complete response
+        """
+        chunks = []
+        response_end: dict[str, Any] = {}
+        tool_calls = []
+        tool_results = []
+        async for chunk in self.generate_response(query, rag_retriever, history):
+            if chunk.type == "end":
+                response_end = chunk.data
+                break
+            if chunk.type == "tool_call":
+                tool_calls.append(chunk.data)
+            elif chunk.type == "tool_result":
+                tool_results.append(chunk.data)
+            elif chunk.type == "text":
+                chunks.append(chunk.text)
+            else:
+                # this "can't" happen as we control what chunk types
+                # are yielded in the generator directly
+                msg = f"Unknown chunk type: {chunk.type}"
+                logger.warning(msg)
+                raise ValueError(msg)
+
+        return SummarizerResponse(
+            response="".join(chunks),
+            rag_chunks=response_end.get("rag_chunks", []),
+            history_truncated=response_end.get("truncated", False),
+            token_counter=response_end.get("token_counter", None),
+            tool_calls=tool_calls,
+            tool_results=tool_results,
+        )
+
     def create_response(
         self,
         query: str,
@@ -430,7 +508,7 @@ class DocsSummarizer(QueryHelper):
     ) -> SummarizerResponse:
         """Create a synchronous response for the given query.
 
-        This method wraps the asynchronous generate_response method to provide
+        This method wraps the asynchronous acreate_response method to provide
         a synchronous interface.
 
         Args:
@@ -441,39 +519,4 @@ class DocsSummarizer(QueryHelper):
         Returns:
             A SummarizerResponse object containing the complete response
         """
-
-        async def drain_generate_response() -> SummarizerResponse:
-            """Inner async function to collect all response chunks."""
-            chunks = []
-            response_end: dict[str, Any] = {}
-            tool_calls = []
-            tool_results = []
-            async for chunk in self.generate_response(query, rag_retriever, history):
-                if chunk.type == "end":
-                    response_end = chunk.data
-                    break
-                if chunk.type == "tool_call":
-                    tool_calls.append(chunk.data)
-                elif chunk.type == "tool_result":
-                    tool_results.append(chunk.data)
-                elif chunk.type == "text":
-                    chunks.append(chunk.text)
-                else:
-                    # this "can't" happen as we control what chunk types
-                    # are yielded in the generator directly
-                    msg = f"Unknown chunk type: {chunk.type}"
-                    logger.warning(msg)
-                    raise ValueError(msg)
-
-            return SummarizerResponse(
-                response="".join(chunks),
-                rag_chunks=response_end.get("rag_chunks", []),
-                history_truncated=response_end.get("truncated", False),
-                token_counter=response_end.get("token_counter", None),
-                tool_calls=tool_calls,
-                tool_results=tool_results,
-            )
-
-        # TODO: if we define the non-streaming endpoint as async, we don't
-        # need to handle any of this, we would just await it
-        return run_async_safely(drain_generate_response())
+        return run_async_safely(self.acreate_response(query, rag_retriever, history))
@@ -0,0 +1,269 @@
+"""Persistent MCP client sessions shared across requests."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, Optional
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.sessions import create_session
+from langchain_mcp_adapters.tools import load_mcp_tools
+
+from ols import constants
+
+if TYPE_CHECKING:
+    from mcp import ClientSession
+
+logger = logging.getLogger(__name__)
+
+# tool metadata key holding name of the MCP server providing the tool
+SERVER_NAME_METADATA_KEY = "mcp_server"
+
+
+def connection_fingerprint(connection: dict[str, Any]) -> str:
+    """Compute fingerprint of resolved MCP server connection.
+
+    The resolved connection contains the user token when it is injected
+    (stdio env or headers), so such sessions are kept per user, while
+    sessions to other servers are shared by all requests.
+    """
+    serialized = json.dumps(connection, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class MCPSession:
+    """MCP client session kept open by its own task.
+
+    Transports (stdio process, HTTP streams) are bound to the task that
+    opened them, so the session is opened and closed by a dedicated task
+    living on the event loop that created it.
+    """
+
+    def __init__(self, key: tuple[str, str], connection: dict[str, Any]) -> None:
+        """Initialize MCP session."""
+        self.key = key
+        self.name = key[0]
+        self.connection = connection
+        self.session: Optional[ClientSession] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.last_used = time.monotonic()
+        self.leases = 0
+        self._tools: Optional[list[BaseTool]] = None
+        self._tools_expire_at = 0.0
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the task opening the session."""
+        self.loop = asyncio.get_running_loop()
+        self._task = self.loop.create_task(self._run(), name=f"mcp-session-{self.name}")
+
+    async def _run(self) -> None:
+        """Open the session and keep it open until it is closed."""
+        try:
+            async with create_session(self.connection) as session:  # type: ignore [arg-type]
+                await session.initialize()
+                self.session = session
+                self._ready.set()
+                logger.debug("MCP session for server '%s' opened", self.name)
+                await self._closing.wait()
+        except Exception as e:
+            logger.error("MCP session for server '%s' failed: %s", self.name, e)
+        finally:
+            self.session = None
+            self._ready.set()
+            logger.debug("MCP session for server '%s' closed", self.name)
+
+    @property
+    def closed(self) -> bool:
+        """Check if session task has finished or is being closed."""
+        return self._task is None or self._task.done() or self._closing.is_set()
+
+    def is_usable(self, loop: asyncio.AbstractEventLoop) -> bool:
+        """Check if session can be used from the given event loop."""
+        return self.loop is loop and not self.closed
+
+    async def get_tools(
+        self, tools_ttl: float, startup_timeout: float
+    ) -> list[BaseTool]:
+        """Get tools provided by the server, cached for `tools_ttl` seconds."""
+        if self._tools is not None and time.monotonic() < self._tools_expire_at:
+            return self._tools
+        async with asyncio.timeout(startup_timeout):
+            await self._ready.wait()
+        if self.session is None:
+            raise RuntimeError(f"MCP session for server '{self.name}' is not open")
+        tools = await load_mcp_tools(self.session)
+        for tool in tools:
+            tool.metadata = {
+                **(tool.metadata or {}),
+                SERVER_NAME_METADATA_KEY: self.name,
+            }
+        self._tools = tools
+        self._tools_expire_at = time.monotonic() + tools_ttl
+        return self._tools
+
+    def close(self) -> None:
+        """Close the session, can be called from any thread."""
+        if self.loop is None or self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self._stop)
+
+    def _stop(self) -> None:
+        """Stop the session task."""
+        self._closing.set()
+        if self._task is not None and not self._ready.is_set():
+            # session is still being opened
+            self._task.cancel()
+
+
+class MCPSessionManager:
+    """Keeps MCP client sessions open across requests.
+
+    Sessions are keyed by server name and resolved connection, tools
+    provided by each server are cached and sessions not used for
+    `idle_timeout` seconds are closed.
+    """
+
+    def __init__(
+        self,
+        tools_ttl: float = constants.MCP_TOOLS_CACHE_TTL,
+        idle_timeout: float = constants.MCP_SESSION_IDLE_TIMEOUT,
+        max_sessions: int = constants.MCP_MAX_SESSIONS,
+        startup_timeout: float = constants.MCP_SESSION_STARTUP_TIMEOUT,
+    ) -> None:
+        """Initialize MCP session manager."""
+        self.tools_ttl = tools_ttl
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.startup_timeout = startup_timeout
+        self._lock = threading.Lock()
+        self._sessions: OrderedDict[tuple[str, str], MCPSession] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return number of open sessions."""
+        return len(self._sessions)
+
+    @asynccontextmanager
+    async def tools(self, connections: dict[str, Any]) -> AsyncIterator[list[BaseTool]]:
+        """Provide tools of all MCP servers, bound to persistent sessions.
+
+        Sessions are leased for the duration of the context, so they are
+        not reaped while tools are being called. Servers which can't be
+        reached are skipped.
+        """
+        sessions = self._acquire(connections)
+        try:
+            results = await asyncio.gather(
+                *(
+                    session.get_tools(self.tools_ttl, self.startup_timeout)
+                    for session in sessions
+                ),
+                return_exceptions=True,
+            )
+            all_tools: list[BaseTool] = []
+            for session, result in zip(sessions, results):
+                if isinstance(result, Exception):
+                    logger.error(
+                        "Failed to get tools from MCP server '%s': %s",
+                        session.name,
+                        result,
+                    )
+                    self._discard(session)
+                    continue
+                if isinstance(result, BaseException):
+                    raise result
+                all_tools.extend(result)
+            yield all_tools
+        finally:
+            self._release(sessions)
+
+    def _acquire(self, connections: dict[str, Any]) -> list[MCPSession]:
+        """Get (or open) and lease sessions for all connections."""
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        sessions = []
+        with self._lock:
+            stale = self._reap(loop, now)
+            for name, connection in connections.items():
+                key = (name, connection_fingerprint(connection))
+                session = self._sessions.get(key)
+                if session is None or not session.is_usable(loop):
+                    # session still leased by other loop is closed on release
+                    session = MCPSession(key, connection)
+                    session.start()
+                    self._sessions[key] = session
+                self._sessions.move_to_end(key)
+                session.last_used = now
+                session.leases += 1
+                sessions.append(session)
+            stale.extend(self._evict())
+        for session in stale:
+            session.close()
+        return sessions
+
+    def _release(self, sessions: list[MCPSession]) -> None:
+        """Return leased sessions."""
+        now = time.monotonic()
+        with self._lock:
+            stale = []
+            for session in sessions:
+                session.leases -= 1
+                session.last_used = now
+                if (
+                    session.leases == 0
+                    and self._sessions.get(session.key) is not session
+                ):
+                    stale.append(session)
+        for session in stale:
+            session.close()
+
+    def _discard(self, session: MCPSession) -> None:
+        """Forget the session, so it is opened again on next use."""
+        with self._lock:
+            if self._sessions.get(session.key) is session:
+                del self._sessions[session.key]
+        session.close()
+
+    def _reap(self, loop: asyncio.AbstractEventLoop, now: float) -> list[MCPSession]:
+        """Remove idle sessions and sessions which can't be used anymore."""
+        stale = []
+        for key, session in list(self._sessions.items()):
+            idle = now - session.last_used > self.idle_timeout
+            # session is bound to the loop that opened it, sessions opened
+            # by other (eg. already finished) loops are not reused
+            unusable = not session.is_usable(loop)
+            if session.closed or (session.leases == 0 and (idle or unusable)):
+                del self._sessions[key]
+                stale.append(session)
+        return stale
+
+    def _evict(self) -> list[MCPSession]:
+        """Remove least recently used idle sessions over the limit."""
+        evicted = []
+        for key, session in list(self._sessions.items()):
+            if len(self._sessions) <= self.max_sessions:
+                break
+            if session.leases == 0:
+                del self._sessions[key]
+                evicted.append(session)
+        return evicted
+
+    def close_all(self) -> None:
+        """Close all sessions."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+# sessions are kept per worker process
+mcp_session_manager = MCPSessionManager()
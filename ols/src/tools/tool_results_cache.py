@@ -0,0 +1,113 @@
+"""Cache of results of read-only MCP tool calls."""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from langchain_core.tools import BaseTool
+
+from ols import constants
+from ols.app.models.config import MCPServerConfig
+from ols.src.tools.mcp_session_manager import SERVER_NAME_METADATA_KEY
+
+logger = logging.getLogger(__name__)
+
+CacheKey = tuple[str, str, str, str]
+
+
+class ToolResultsCache:
+    """Tool results with expiration, least recently used are dropped first."""
+
+    def __init__(
+        self, max_entries: int = constants.MCP_TOOL_RESULTS_CACHE_MAX_ENTRIES
+    ) -> None:
+        """Initialize tool results cache."""
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._results: OrderedDict[CacheKey, tuple[float, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return number of cached results."""
+        return len(self._results)
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        """Get cached result, None when result is not cached or expired."""
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is None:
+                return None
+            expire_at, output = cached
+            if time.monotonic() >= expire_at:
+                del self._results[key]
+                return None
+            self._results.move_to_end(key)
+            return output
+
+    def put(self, key: CacheKey, output: str, ttl: float) -> None:
+        """Store result for `ttl` seconds."""
+        with self._lock:
+            self._results[key] = (time.monotonic() + ttl, output)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._results.clear()
+
+
+# results are kept per worker process
+tool_results_cache = ToolResultsCache()
+
+
+class UserToolResults:
+    """Cached tool results of one user.
+
+    Only results of tools listed as cacheable in the MCP server
+    configuration are cached. Results are never shared between users,
+    because tools (eg. `oc`) run with the user's token.
+    """
+
+    def __init__(
+        self,
+        user_token: str,
+        server_configs: list[MCPServerConfig],
+        cache: ToolResultsCache = tool_results_cache,
+    ) -> None:
+        """Initialize user's view of the tool results cache."""
+        self._user = hashlib.sha256(user_token.encode("utf-8")).hexdigest()
+        self._cache = cache
+        self._ttls = {
+            (server.name, tool_name): server.tool_results_cache_ttl
+            for server in server_configs
+            for tool_name in server.cacheable_tools
+        }
+
+    def _key(self, tool: BaseTool, tool_args: dict) -> Optional[tuple[CacheKey, int]]:
+        """Construct cache key and TTL, None when the tool is not cacheable."""
+        if not self._ttls:
+            return None
+        server = (tool.metadata or {}).get(SERVER_NAME_METADATA_KEY)
+        ttl = self._ttls.get((server, tool.name))
+        if ttl is None:
+            return None
+        args = json.dumps(tool_args, sort_keys=True, default=str)
+        return (self._user, server, tool.name, args), ttl
+
+    def get(self, tool: BaseTool, tool_args: dict) -> Optional[str]:
+        """Get cached result of the tool call."""
+        key = self._key(tool, tool_args)
+        if key is None:
+            return None
+        return self._cache.get(key[0])
+
+    def put(self, tool: BaseTool, tool_args: dict, output: str) -> None:
+        """Store result of the tool call when the tool is cacheable."""
+        key = self._key(tool, tool_args)
+        if key is not None:
+            self._cache.put(key[0], output, key[1])
@@ -3,10 +3,17 @@
 import asyncio
 import json
 import logging
+from collections.abc import AsyncGenerator
+from typing import Optional
 
 from langchain_core.messages import ToolMessage
 from langchain_core.tools.structured import StructuredTool
 
+from ols import constants
+from ols.app.models.config import MCPServerConfig
+from ols.src.tools.mcp_session_manager import SERVER_NAME_METADATA_KEY
+from ols.src.tools.tool_results_cache import UserToolResults
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,30 +29,106 @@ def raise_for_sensitive_tool_args(tool_args: dict) -> None:
             )
 
 
-def get_tool_by_name(
-    tool_name: str, all_mcp_tools: list[StructuredTool]
-) -> StructuredTool:
-    """Get a tool by its name from the MCP client."""
-    tool = [tool for tool in all_mcp_tools if tool.name == tool_name]
-    if len(tool) == 0:
-        raise ValueError(f"Tool '{tool_name}' not found.")
-    if len(tool) > 1:
-        # TODO: LCORE-94
-        raise ValueError(f"Multiple tools found with name '{tool_name}'.")
-    return tool[0]
+class ToolsIndex:
+    """MCP tools indexed by name.
+
+    Index is built once for each fetched list of tools, so tools are looked
+    up in constant time for every tool call.
+    """
+
+    def __init__(
+        self,
+        all_mcp_tools: list[StructuredTool],
+        server_configs: Optional[list[MCPServerConfig]] = None,
+    ) -> None:
+        """Index tools by name, tools with duplicate names are left out."""
+        by_name: dict[str, StructuredTool] = {}
+        self.duplicates: set[str] = set()
+        for tool in all_mcp_tools:
+            if tool.name in by_name:
+                self.duplicates.add(tool.name)
+            by_name[tool.name] = tool
+        if self.duplicates:
+            # TODO: LCORE-94
+            logger.error(
+                "Multiple tools found with names %s, these tools are disabled.",
+                sorted(self.duplicates),
+            )
+        self._by_name = {
+            name: tool for name, tool in by_name.items() if name not in self.duplicates
+        }
+        # tools provided to the LLM
+        self.tools = list(self._by_name.values())
+
+        servers = {server.name: server for server in server_configs or []}
+        self._timeouts: dict[str, int] = {}
+        for name, tool in self._by_name.items():
+            server = servers.get((tool.metadata or {}).get(SERVER_NAME_METADATA_KEY))
+            if server is not None:
+                self._timeouts[name] = server.tool_timeouts.get(
+                    name, server.tool_timeout
+                )
+
+    def __len__(self) -> int:
+        """Return number of indexed tools."""
+        return len(self._by_name)
+
+    def __contains__(self, tool_name: object) -> bool:
+        """Check if tool with given name is indexed."""
+        return tool_name in self._by_name
+
+    def get(self, tool_name: str) -> StructuredTool:
+        """Get a tool by its name."""
+        tool = self._by_name.get(tool_name)
+        if tool is None:
+            if tool_name in self.duplicates:
+                raise ValueError(f"Multiple tools found with name '{tool_name}'.")
+            raise ValueError(f"Tool '{tool_name}' not found.")
+        return tool
+
+    def timeout(self, tool_name: str) -> int:
+        """Get timeout of the tool call in seconds."""
+        return self._timeouts.get(tool_name, constants.MCP_TOOL_CALL_TIMEOUT)
+
+
+def get_tool_by_name(tool_name: str, tools_index: ToolsIndex) -> StructuredTool:
+    """Get a tool by its name from the MCP tools index."""
+    return tools_index.get(tool_name)
 
 
 async def execute_tool_call(
-    tool_name: str, tool_args: dict, all_mcp_tools: list[StructuredTool]
+    tool_name: str,
+    tool_args: dict,
+    tools_index: ToolsIndex,
+    tool_results: Optional[UserToolResults] = None,
 ) -> tuple[str, str]:
-    """Execute a tool call and return the output and status."""
+    """Execute a tool call and return the output and status.
+
+    Results of cacheable tools are reused when the same call was already
+    done recently for the same user.
+    """
     try:
-        tool = get_tool_by_name(tool_name, all_mcp_tools)
-        tool_output = await tool.arun(_jsonify(tool_args))  # type: ignore [attr-defined]
+        tool = get_tool_by_name(tool_name, tools_index)
+        args = _jsonify(tool_args)
+        tool_output = tool_results.get(tool, args) if tool_results else None
+        if tool_output is None:
+            async with asyncio.timeout(tools_index.timeout(tool_name)):
+                tool_output = await tool.arun(args)  # type: ignore [attr-defined]
+            if tool_results:
+                tool_results.put(tool, args, tool_output)
+        else:
+            logger.debug("Tool: %s | Args: %s | Cached output", tool_name, tool_args)
         status = "success"
         logger.debug(
             "Tool: %s | Args: %s | Output: %s", tool_name, tool_args, tool_output
         )
+    except TimeoutError:
+        tool_output = (
+            f"Error executing tool '{tool_name}': timed out after "
+            f"{tools_index.timeout(tool_name)} seconds"
+        )
+        status = "error"
+        logger.error(tool_output)
     except Exception as e:
         # catching generic exception here - if it contains something it
         # shouldn't (eg. token in openshift tools), it is responsibility
@@ -57,7 +140,9 @@ async def execute_tool_call(
 
 
 async def _execute_single_tool_call(
-    tool_call: dict, all_mcp_tools: list[StructuredTool]
+    tool_call: dict,
+    tools_index: ToolsIndex,
+    tool_results: Optional[UserToolResults] = None,
 ) -> ToolMessage:
     """Execute a single tool call and return a ToolMessage."""
     tool_name = tool_call.get("name")
@@ -72,7 +157,7 @@ async def _execute_single_tool_call(
         try:
             raise_for_sensitive_tool_args(tool_args)
             status, tool_output = await execute_tool_call(
-                tool_name, tool_args, all_mcp_tools
+                tool_name, tool_args, tools_index, tool_results
             )
         except Exception as e:
             tool_output = (
@@ -86,7 +171,8 @@ async def _execute_single_tool_call(
 
 async def execute_tool_calls(
     tool_calls: list[dict],
-    all_mcp_tools: list[StructuredTool],
+    tools_index: ToolsIndex,
+    tool_results: Optional[UserToolResults] = None,
 ) -> list[ToolMessage]:
     """Execute tool calls in parallel and return ToolMessages."""
     if not tool_calls:
@@ -94,7 +180,8 @@ async def execute_tool_calls(
 
     # Create tasks for parallel execution
     tasks = [
-        _execute_single_tool_call(tool_call, all_mcp_tools) for tool_call in tool_calls
+        _execute_single_tool_call(tool_call, tools_index, tool_results)
+        for tool_call in tool_calls
     ]
 
     # Execute all tool calls in parallel
@@ -103,6 +190,30 @@ async def execute_tool_calls(
     return tool_messages
 
 
+async def iter_tool_calls(
+    tool_calls: list[dict],
+    tools_index: ToolsIndex,
+    tool_results: Optional[UserToolResults] = None,
+) -> AsyncGenerator[ToolMessage, None]:
+    """Execute tool calls in parallel and yield ToolMessages as they complete.
+
+    Tool calls still running when the consumer stops iterating (eg. client
+    disconnected from the stream) are cancelled.
+    """
+    tasks = [
+        asyncio.create_task(
+            _execute_single_tool_call(tool_call, tools_index, tool_results)
+        )
+        for tool_call in tool_calls
+    ]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
 def _jsonify(args: dict) -> dict:
     """Convert to JSON."""
     res = {}
@@ -8,16 +8,17 @@ it is used for ingress authentication instead of cluster pull-secret.
 """
 
 import base64
-import io
 import json
 import logging
 import os
 import pathlib
 import sys
 import tarfile
+import tempfile
 import time
-from collections.abc import Callable
-from typing import Any
+import uuid
+from collections.abc import Callable, Iterator
+from typing import IO, Any, Optional
 
 import kubernetes
 import requests
@@ -30,9 +31,17 @@ from ols import config  # pylint: disable=C0413
 from ols.constants import (  # pylint: disable=C0413
     CONFIGURATION_FILE_NAME_ENV_VARIABLE,
     DEFAULT_CONFIGURATION_FILE,
+    TRANSCRIPTS_SEGMENT_PART_SUFFIX,
+    TRANSCRIPTS_SEGMENTS_DIR,
 )
 
 OLS_USER_DATA_MAX_SIZE = 100 * 1024 * 1024  # 100 MiB
+# bigger tarballs are written to temporary file instead of memory
+OLS_TARBALL_SPOOL_SIZE = 8 * 1024 * 1024  # 8 MiB
+# tarball is read and sent in blocks of this size
+OLS_UPLOAD_BLOCK_SIZE = 64 * 1024  # 64 KiB
+# index of collected files, stored in the data directory
+OLS_USER_DATA_INDEX_FILE = ".collector_index.json"
 
 cfg_file = os.environ.get(
     CONFIGURATION_FILE_NAME_ENV_VARIABLE, DEFAULT_CONFIGURATION_FILE
@@ -137,40 +146,208 @@ def get_cloud_openshift_pull_secret() -> str:
     raise ClusterPullSecretNotFoundError
 
 
-def collect_ols_data_from(location: str) -> list[pathlib.Path]:
+def is_json(name: str) -> bool:
+    """Check if the file is JSON file (feedback or transcript)."""
+    return name.endswith(".json")
+
+
+def is_closed_segment(name: str) -> bool:
+    """Check if the file is closed transcripts segment."""
+    # segments still being written are collected next time
+    return ".jsonl" in name and not name.endswith(TRANSCRIPTS_SEGMENT_PART_SUFFIX)
+
+
+class DataIndex:
+    """Index of collectable files (size and mtime), updated incrementally.
+
+    Directory is listed (using a single `os.scandir`) only when its mtime
+    has changed since the previous scan, and only files not seen before
+    are stat()-ed. The index can be stored in the data directory, so it
+    is reused after the collector restarts.
+
+    Collectable files are JSON files from the 'feedback' directory,
+    JSON files from 'transcripts/<user>/<conversation>' directories and
+    closed transcript segments.
+    """
+
+    # directories modified this short time before the scan can still get
+    # new files with the same mtime, those are listed again next time
+    RACY_INTERVAL_NS = 2 * 10**9
+
+    def __init__(
+        self, location: str, index_path: Optional[pathlib.Path] = None
+    ) -> None:
+        """Initialize index, load the stored one when available."""
+        self.location = pathlib.Path(location)
+        self.index_path = index_path
+        # relative path of directory -> (mtime, names of entries)
+        self._dirs: dict[str, tuple[int, list[str]]] = {}
+        # relative path of file -> (size, mtime)
+        self._files: dict[str, tuple[int, int]] = {}
+        self.total_size = 0
+        if index_path is not None:
+            self._load(index_path)
+
+    def _load(self, index_path: pathlib.Path) -> None:
+        """Load stored index, start with empty one when it can't be read."""
+        try:
+            with open(index_path, encoding="utf-8") as index_file:
+                stored = json.load(index_file)
+            self._dirs = {
+                path: (mtime, names) for path, (mtime, names) in stored["dirs"].items()
+            }
+            self._files = {
+                path: (size, mtime) for path, (size, mtime) in stored["files"].items()
+            }
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("failed to load data index, starting from scratch: %s", e)
+            self._dirs, self._files = {}, {}
+        self.total_size = sum(size for size, _ in self._files.values())
+
+    def save(self) -> None:
+        """Store the index (atomically), when index path is set."""
+        if self.index_path is None:
+            return
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as index_file:
+            json.dump({"dirs": self._dirs, "files": self._files}, index_file)
+        tmp_path.replace(self.index_path)
+
+    def scan(self) -> list[pathlib.Path]:
+        """Update the index, return paths of all collectable files."""
+        self._scan_started = time.time_ns()
+        self._seen_dirs: set[str] = set()
+        files: list[str] = []
+
+        files += self._list_files("feedback", is_json)
+        for user in self._list_dirs("transcripts"):
+            for conversation in self._list_dirs(f"transcripts/{user}"):
+                files += self._list_files(f"transcripts/{user}/{conversation}", is_json)
+        files += self._list_files(
+            f"transcripts/{TRANSCRIPTS_SEGMENTS_DIR}", is_closed_segment
+        )
+
+        # forget what no longer exists
+        self._dirs = {
+            path: entry for path, entry in self._dirs.items() if path in self._seen_dirs
+        }
+        found = set(files)
+        self._files = {
+            path: entry for path, entry in self._files.items() if path in found
+        }
+        self.total_size = sum(size for size, _ in self._files.values())
+        return [self.location / path for path in files]
+
+    def _list(
+        self, directory: str, want_dirs: bool, accept: Callable[[str], bool]
+    ) -> list[str]:
+        """List entries of the directory, reuse the previous listing if unchanged."""
+        try:
+            mtime = os.stat(self.location / directory).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+        self._seen_dirs.add(directory)
+        indexed = self._dirs.get(directory)
+        if indexed is not None and indexed[0] == mtime:
+            names = indexed[1]
+            # files of unchanged directory are already indexed
+            if want_dirs or all(f"{directory}/{n}" in self._files for n in names):
+                return names
+
+        names = []
+        with os.scandir(self.location / directory) as entries:
+            for entry in entries:
+                if want_dirs:
+                    if entry.is_dir(follow_symlinks=False):
+                        names.append(entry.name)
+                elif accept(entry.name) and entry.is_file():
+                    names.append(entry.name)
+                    path = f"{directory}/{entry.name}"
+                    if path not in self._files:
+                        stat = entry.stat()
+                        self._files[path] = (stat.st_size, stat.st_mtime_ns)
+        names.sort()
+        if mtime > self._scan_started - self.RACY_INTERVAL_NS:
+            mtime = -1  # list again next time
+        self._dirs[directory] = (mtime, names)
+        return names
+
+    def _list_dirs(self, directory: str) -> list[str]:
+        """List subdirectories of the directory."""
+        return self._list(directory, want_dirs=True, accept=lambda _: True)
+
+    def _list_files(self, directory: str, accept: Callable[[str], bool]) -> list[str]:
+        """List accepted files of the directory as relative paths."""
+        return [
+            f"{directory}/{name}"
+            for name in self._list(directory, want_dirs=False, accept=accept)
+        ]
+
+    def _relative(self, path: pathlib.Path) -> str:
+        """Get relative path of the file in the index."""
+        return path.relative_to(self.location).as_posix()
+
+    def size(self, path: pathlib.Path) -> int:
+        """Get size of the indexed file."""
+        return self._files[self._relative(path)][0]
+
+    def forget(self, paths: list[pathlib.Path]) -> None:
+        """Remove (deleted) files from the index."""
+        for path in paths:
+            entry = self._files.pop(self._relative(path), None)
+            if entry is not None:
+                self.total_size -= entry[0]
+
+    def oldest_first(self) -> list[pathlib.Path]:
+        """Get indexed files, the least recently modified first."""
+        paths = sorted(self._files, key=lambda path: self._files[path][1])
+        return [self.location / path for path in paths]
+
+
+def collect_ols_data_from(
+    location: str, index: Optional[DataIndex] = None
+) -> list[pathlib.Path]:
     """Collect files from a given location.
 
     Args:
         location: Path to the directory to be searched for files.
+        index: Index of the location updated by the scan, new (empty)
+            index is used when not provided.
 
     Returns:
         List of paths to the collected files.
 
-    Only JSON files from the 'feedback' and 'transcripts' directories are collected.
+    Only JSON files from the 'feedback' and 'transcripts' directories and
+    closed transcript segments are collected.
     """
-    files = []
-
-    files += list(pathlib.Path(location).glob("feedback/*.json"))
-    files += list(pathlib.Path(location).glob("transcripts/*/*/*.json"))
-
-    return files
+    if index is None:
+        index = DataIndex(location)
+    return index.scan()
 
 
 def package_files_into_tarball(
     file_paths: list[pathlib.Path], path_to_strip: str
-) -> io.BytesIO:
+) -> IO[bytes]:
     """Package specified directory into a tarball.
 
+    Small tarball is kept in memory, bigger one is rolled over to
+    a temporary file, so memory used does not depend on the chunk size.
+    Temporary file is removed when the tarball is closed.
+
     Args:
         file_paths: List of paths to the files to be packaged.
         path_to_strip: Path to be stripped from the file paths (not
             included in the archive).
 
     Returns:
-        BytesIO object representing the tarball.
+        File object representing the tarball.
     """
-    tarball_io = io.BytesIO()
-    with tarfile.open(fileobj=tarball_io, mode="w:gz") as tar:
+    tarball = tempfile.SpooledTemporaryFile(
+        max_size=OLS_TARBALL_SPOOL_SIZE, suffix=".tgz"
+    )
+    with tarfile.open(fileobj=tarball, mode="w:gz") as tar:
         # arcname parameter is set to a stripped path to avoid including
         # the full path of the root dir
         for file_path in file_paths:
@@ -180,9 +357,46 @@ def package_files_into_tarball(
                     file_path, arcname=file_path.as_posix().replace(path_to_strip, "")
                 )
 
-    tarball_io.seek(0)
+    tarball.seek(0)
+
+    return tarball
 
-    return tarball_io
+
+class MultipartFileBody:
+    """Multipart form data request body with one file, streamed from the file.
+
+    The body has known length, so it is sent with Content-Length header
+    in blocks read from the file. The file is read from the beginning
+    every time the body is iterated, so the request can be retried.
+    """
+
+    def __init__(
+        self, field_name: str, file_name: str, content_type: str, file: IO[bytes]
+    ) -> None:
+        """Initialize multipart body."""
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self._head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; '
+            f'filename="{file_name}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        self._tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+        self._file = file
+        self._file_size = file.seek(0, os.SEEK_END)
+
+    def __len__(self) -> int:
+        """Return length of the body."""
+        return len(self._head) + self._file_size + len(self._tail)
+
+    def __iter__(self) -> Iterator[bytes]:
+        """Generate the body in blocks."""
+        self._file.seek(0)
+        yield self._head
+        while block := self._file.read(OLS_UPLOAD_BLOCK_SIZE):
+            yield block
+        yield self._tail
 
 
 def exponential_backoff_decorator(max_retries: int, base_delay: int) -> Callable:
@@ -213,24 +427,20 @@ def exponential_backoff_decorator(max_retries: int, base_delay: int) -> Callable
 @exponential_backoff_decorator(
     max_retries=udc_config.ingress_max_retries, base_delay=udc_config.ingress_base_delay
 )
-def upload_data_to_ingress(tarball: io.BytesIO) -> requests.Response:
+def upload_data_to_ingress(tarball: IO[bytes]) -> requests.Response:
     """Upload the tarball to a Ingress.
 
     Args:
-        tarball: BytesIO object representing the tarball to be uploaded.
+        tarball: File object representing the tarball to be uploaded.
 
     Returns:
         Response object from the Ingress.
     """
     logger.info("sending collected data")
     url = get_ingress_upload_url()
-    payload = {
-        "file": (
-            "ols.tgz",
-            tarball.read(),
-            "application/vnd.redhat.ols.periodic+tar",
-        ),
-    }
+    payload = MultipartFileBody(
+        "file", "ols.tgz", "application/vnd.redhat.ols.periodic+tar", tarball
+    )
 
     headers: dict[str, str | bytes]
 
@@ -262,7 +472,8 @@ def upload_data_to_ingress(tarball: io.BytesIO) -> requests.Response:
         logger.debug("posting payload to %s", url)
         response = s.post(
             url=url,
-            files=payload,
+            data=payload,
+            headers={"Content-Type": payload.content_type},
             timeout=udc_config.ingress_timeout,
         )
 
@@ -296,13 +507,17 @@ def delete_data(file_paths: list[pathlib.Path]) -> None:
 
 
 def chunk_data(
-    data: list[pathlib.Path], chunk_max_size: int = OLS_USER_DATA_MAX_SIZE
+    data: list[pathlib.Path],
+    chunk_max_size: int = OLS_USER_DATA_MAX_SIZE,
+    file_size_of: Optional[Callable[[pathlib.Path], int]] = None,
 ) -> list[list[pathlib.Path]]:
     """Chunk the data into smaller parts.
 
     Args:
         data: List of paths to the files to be chunked.
         chunk_max_size: Maximum size of a chunk.
+        file_size_of: Function providing file size (eg. from index),
+            file is stat()-ed when not provided.
 
     Returns:
         List of lists of paths to the chunked files.
@@ -313,7 +528,9 @@ def chunk_data(
     chunks: list = []
     chunk: list = []
     for file in data:
-        file_size = file.stat().st_size
+        file_size = (
+            file_size_of(file) if file_size_of is not None else file.stat().st_size
+        )
         if chunk_max_size < chunk_size + file_size or file_size > chunk_max_size:
             if chunk:
                 chunks.append(chunk)
@@ -326,10 +543,17 @@ def chunk_data(
     return chunks
 
 
-def gather_ols_user_data(data_path: str) -> None:
-    """Gather OLS user data and upload it to the Ingress service."""
-    collected_files = collect_ols_data_from(data_path)
-    data_chunks = chunk_data(collected_files)
+def gather_ols_user_data(data_path: str, index: Optional[DataIndex] = None) -> None:
+    """Gather OLS user data and upload it to the Ingress service.
+
+    Args:
+        data_path: Path to the directory with the data.
+        index: Index of the data directory, updated by the collection.
+    """
+    if index is None:
+        index = DataIndex(data_path)
+    collected_files = collect_ols_data_from(data_path, index)
+    data_chunks = chunk_data(collected_files, file_size_of=index.size)
     if any(data_chunks):
         logger.info(
             "collected %d files (splitted to %d chunks) from '%s'",
@@ -344,13 +568,14 @@ def gather_ols_user_data(data_path: str) -> None:
             try:
                 upload_data_to_ingress(tarball)
                 delete_data(data_chunk)
+                index.forget(data_chunk)
                 logger.info("uploaded data removed")
             except (ClusterPullSecretNotFoundError, ClusterIDNotFoundError) as e:
                 logger.error(
                     "%s - upload and data removal canceled", e.__class__.__name__
                 )
 
-            # close the tarball to release mem
+            # close the tarball to release mem (or remove the temporary file)
             tarball.close()
     else:
         logger.info("'%s' contains no data, nothing to do...", data_path)
@@ -359,27 +584,32 @@ def gather_ols_user_data(data_path: str) -> None:
 def ensure_data_dir_is_not_bigger_than_defined(
     data_dir: str = udc_config.data_storage.as_posix(),
     max_size: int = OLS_USER_DATA_MAX_SIZE,
+    index: Optional[DataIndex] = None,
 ) -> None:
     """Ensure that the data dir is not bigger than it should be.
 
+    The oldest files are removed first.
+
     Args:
         data_dir: Path to the directory to be checked.
         max_size: Maximum size of the directory.
+        index: Index of the data directory, already updated in this
+            collection cycle; the directory is scanned when not provided.
     """
-    collected_files = collect_ols_data_from(data_dir)
-    data_size = sum(file.stat().st_size for file in collected_files)
-    if data_size > max_size:
+    if index is None:
+        index = DataIndex(data_dir)
+        index.scan()
+    if index.total_size > max_size:
         logger.error(
             "data folder size is bigger than the maximum allowed size: %d > %d",
-            data_size,
+            index.total_size,
             max_size,
         )
         logger.info("removing files to fit the data into the limit...")
-        extra_size = data_size - max_size
-        for file in collected_files:
-            extra_size -= file.stat().st_size
+        for file in index.oldest_first():
             delete_data([file])
-            if extra_size < 0:
+            index.forget([file])
+            if index.total_size <= max_size:
                 break
 
 
@@ -407,10 +637,15 @@ if __name__ == "__main__":
             udc_config.initial_wait,
         )
         time.sleep(udc_config.initial_wait)
+    data_path = udc_config.data_storage.as_posix()
+    data_index = DataIndex(
+        data_path, index_path=pathlib.Path(data_path, OLS_USER_DATA_INDEX_FILE)
+    )
     while True:
         if not disabled_by_file():
-            gather_ols_user_data(udc_config.data_storage.as_posix())
-            ensure_data_dir_is_not_bigger_than_defined()
+            gather_ols_user_data(data_path, data_index)
+            ensure_data_dir_is_not_bigger_than_defined(index=data_index)
+            data_index.save()
         else:
             logger.info("disabled by control file, skipping data collection")
         time.sleep(udc_config.collection_interval)
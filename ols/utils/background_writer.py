@@ -0,0 +1,87 @@
+"""Bounded writer performing blocking writes in background threads."""
+
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import threading
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter:
+    """Performs blocking writes (files, database) in background threads.
+
+    Writes are submitted from async code and not waited for. The number
+    of pending writes is bounded; when the limit is reached, submitting
+    waits (without blocking the event loop) until some write finishes,
+    so slow storage slows down the submitter instead of consuming memory.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int) -> None:
+        """Initialize background writer."""
+        self.name = name
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending: set[concurrent.futures.Future] = set()
+
+    def __len__(self) -> int:
+        """Return number of pending writes."""
+        return len(self._pending)
+
+    async def submit(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """Schedule the write, wait only when too many writes are pending."""
+        if not self._slots.acquire(blocking=False):
+            logger.warning("Too many pending writes in %s, waiting", self.name)
+            loop = asyncio.get_running_loop()
+            acquire = loop.run_in_executor(None, self._slots.acquire)
+            try:
+                await asyncio.shield(acquire)
+            except asyncio.CancelledError:
+                # the slot is acquired eventually, it has to be returned
+                acquire.add_done_callback(lambda _: self._slots.release())
+                raise
+        try:
+            future = self._executor.submit(
+                self._write, functools.partial(func, *args, **kwargs)
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+
+    def _write(self, write: Callable[[], Any]) -> None:
+        """Perform the write, nobody waits for the result so errors are logged."""
+        try:
+            write()
+        except Exception:
+            logger.exception("Background write in %s failed", self.name)
+
+    def _done(self, future: concurrent.futures.Future) -> None:
+        """Forget finished write and free its slot."""
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    def flush(self, timeout: float) -> bool:
+        """Wait for pending writes, return False when some did not finish in time."""
+        with self._lock:
+            pending = list(self._pending)
+        if not pending:
+            return True
+        logger.info("Waiting for %d pending writes in %s", len(pending), self.name)
+        _, not_done = concurrent.futures.wait(pending, timeout=timeout)
+        if not_done:
+            logger.error(
+                "%d pending writes in %s did not finish in %s seconds",
+                len(not_done),
+                self.name,
+                timeout,
+            )
+        return not not_done
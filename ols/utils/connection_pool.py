@@ -0,0 +1,112 @@
+"""Thread-safe pool of database connections."""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from psycopg2.pool import PoolError
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(PoolError):
+    """No connection became available in time, all are in use."""
+
+
+class ConnectionPool:
+    """Bounded pool of connections shared by threads.
+
+    At most `max_size` connections are open, threads wait for a free
+    connection when all of them are in use. Idle connections are handed
+    out without checking them first - connection found broken when used
+    is returned with `discard=True` and a new one is opened when needed.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int,
+        max_size: int,
+        timeout: float,
+    ) -> None:
+        """Initialize the pool and open `min_size` connections."""
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.closed = False
+        self._cond = threading.Condition()
+        self._idle: list[Any] = []
+        self._size = 0  # idle and used connections
+        try:
+            for _ in range(min_size):
+                self._idle.append(self._connect())
+                self._size += 1
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        """Return number of open connections."""
+        return self._size
+
+    def get(self, timeout: Optional[float] = None) -> tuple[Any, bool]:
+        """Check out a connection, waiting for a free one when needed.
+
+        Returns:
+            Connection and flag telling whether the connection was idle in
+            the pool (so it might have been broken in the meantime).
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._cond:
+            while True:
+                if self.closed:
+                    raise PoolError("connection pool is closed")
+                if self._idle:
+                    return self._idle.pop(), True
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    raise PoolTimeoutError(
+                        f"no database connection available, all {self.max_size} "
+                        "connections are in use"
+                    )
+        try:
+            return self._connect(), False
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def put(self, conn: Any, discard: bool = False) -> None:
+        """Return the connection, broken connection should be discarded."""
+        with self._cond:
+            keep = not (discard or self.closed or conn.closed)
+            if keep:
+                self._idle.append(conn)
+            else:
+                self._size -= 1
+            self._cond.notify()
+        if not keep:
+            self._close_quietly(conn)
+
+    def close(self) -> None:
+        """Close idle connections, used connections are closed when returned."""
+        with self._cond:
+            self.closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._close_quietly(conn)
+
+    @staticmethod
+    def _close_quietly(conn: Any) -> None:
+        """Close the connection, it might be broken already."""
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug("failed to close connection: %s", e)
@@ -5,8 +5,10 @@
 # https://github.com/openshift/api/blob/master/config/v1/types_tlssecurityprofile.go
 
 import logging
+import os
 import ssl
 from enum import StrEnum
+from functools import lru_cache
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -140,3 +142,71 @@ def ciphers_as_string(
     if ciphers_as_str is None:
         return ciphers_for_tls_profile(tls_profile)
     return ciphers_as_str
+
+
+# Maximum number of SSL contexts shared by HTTP clients
+SSL_CONTEXT_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=SSL_CONTEXT_CACHE_SIZE)
+def _cached_ssl_context(  # pylint: disable=too-many-arguments
+    cafile: Optional[str],
+    cafile_mtime: Optional[int],
+    load_default_certs: bool,
+    check_hostname: bool,
+    minimum_version: Optional[ssl.TLSVersion],
+    ciphers: Optional[str],
+) -> ssl.SSLContext:
+    """Create SSL context, file modification time is used just as a cache key."""
+    logger.debug("Creating SSL context with CA file %s", cafile)
+    if load_default_certs:
+        context = ssl.create_default_context()
+        context.check_hostname = check_hostname
+        if cafile is not None:
+            context.load_verify_locations(cafile=cafile)
+    else:
+        context = ssl.create_default_context(cafile=cafile)
+        context.check_hostname = check_hostname
+
+    if minimum_version is not None:
+        context.minimum_version = minimum_version
+
+    if ciphers is not None:
+        context.set_ciphers(ciphers)
+
+    return context
+
+
+def ssl_context(
+    cafile: Optional[str] = None,
+    load_default_certs: bool = True,
+    check_hostname: bool = True,
+    minimum_version: Optional[ssl.TLSVersion] = None,
+    ciphers: Optional[str] = None,
+) -> ssl.SSLContext:
+    """Get SSL context shared by all HTTP clients with the same settings.
+
+    Loading CA certificates is expensive, so contexts are created once and
+    cached. Modification time of the CA file is part of the cache key, so a
+    regenerated certificate store is loaded again. Returned context must not
+    be modified.
+
+    Args:
+        cafile: CA certificates file to be loaded into the context.
+        load_default_certs: load system default CA certificates as well.
+        check_hostname: whether to match the peer cert's hostname.
+        minimum_version: minimal TLS version, default one is used if not set.
+        ciphers: available ciphers, default ones are used if not set.
+
+    Returns:
+        SSL context with given settings.
+    """
+    cafile_mtime = os.stat(cafile).st_mtime_ns if cafile is not None else None
+    return _cached_ssl_context(
+        cafile,
+        cafile_mtime,
+        load_default_certs,
+        check_hostname,
+        minimum_version,
+        ciphers,
+    )
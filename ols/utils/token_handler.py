@@ -7,9 +7,10 @@ from langchain_core.messages import BaseMessage
 from llama_index.core.schema import NodeWithScore
 from tiktoken import get_encoding
 
-from ols.app.models.models import RagChunk
+from ols.app.models.models import PromptTokenBudget, RagChunk
 from ols.constants import (
     DEFAULT_TOKENIZER_MODEL,
+    HISTORY_MESSAGE_TOKENS_COUNT_KEY,
     MINIMUM_CONTEXT_TOKEN_LIMIT,
     RAG_SIMILARITY_CUTOFF,
     TOKEN_BUFFER_WEIGHT,
@@ -29,6 +30,10 @@ class TokenHandler:
     Convert text to tokens.
     Get rough estimation of token count.
     Truncate text based on token limit.
+
+    Token counts of the prompt parts processed by one instance are recorded
+    in `prompt_budget`, so the complete prompt does not need to be encoded
+    again once it is assembled.
     """
 
     def __init__(self, encoding_name: str = DEFAULT_TOKENIZER_MODEL) -> None:
@@ -37,6 +42,7 @@ class TokenHandler:
         # For different models, exact tokens may vary due to different tokenizer.
         # Also the provider may add model specific tags.
         self._encoder = get_encoding(encoding_name)
+        self.prompt_budget = PromptTokenBudget()
 
     def text_to_tokens(self, text: str) -> list[int]:
         """Convert text to tokens.
@@ -87,7 +93,37 @@ class TokenHandler:
             max_tokens_for_response,
         )
 
-        prompt_token_count = TokenHandler._get_token_count(self.text_to_tokens(prompt))
+        tokens = self.text_to_tokens(prompt)
+        self.prompt_budget.instructions = len(tokens)
+        return self._check_available_tokens(
+            TokenHandler._get_token_count(tokens),
+            context_window_size,
+            max_tokens_for_response,
+        )
+
+    def check_prompt_budget(
+        self, context_window_size: int, max_tokens_for_response: int
+    ) -> int:
+        """Check that the prompt assembled from counted parts fits the model.
+
+        Args:
+            context_window_size: context window size of LLM
+            max_tokens_for_response: max tokens allowed for response (estimation)
+
+        Returns:
+            available_tokens: int, tokens left after the whole prompt.
+        """
+        return self._check_available_tokens(
+            ceil(self.prompt_budget.total * TOKEN_BUFFER_WEIGHT),
+            context_window_size,
+            max_tokens_for_response,
+        )
+
+    @staticmethod
+    def _check_available_tokens(
+        prompt_token_count: int, context_window_size: int, max_tokens_for_response: int
+    ) -> int:
+        """Get available tokens for already counted prompt or raise an error."""
         logger.debug("Prompt tokens: %d", prompt_token_count)
 
         # The context_window_size is the maximum number of tokens that
@@ -121,6 +157,7 @@ class TokenHandler:
             list of `RagChunk` objects, available tokens after context usage
         """
         rag_chunks = []
+        self.prompt_budget.rag_context = 0
 
         for node in retrieved_nodes:
             score = float(node.get_score(raise_error=False))
@@ -146,7 +183,9 @@ class TokenHandler:
                 logger.debug("%d tokens are less than threshold.", available_tokens)
                 break
 
-            node_text = self.tokens_to_text(tokens[:available_tokens])
+            tokens = tokens[:available_tokens]
+            self.prompt_budget.rag_context += len(tokens)
+            node_text = self.tokens_to_text(tokens)
             rag_chunks.append(
                 RagChunk(
                     text=node_text,
@@ -159,17 +198,55 @@ class TokenHandler:
 
         return rag_chunks, max_tokens
 
+    @staticmethod
+    def _history_message_text(message: BaseMessage) -> str:
+        """Get text of the message as it is used in conversation history."""
+        return f"{message.type}: {message.content.strip()}"
+
+    def store_message_tokens_count(self, message: BaseMessage) -> None:
+        """Store tokens count of history message into the message metadata.
+
+        Args:
+            message: message to be stored in conversation history
+        """
+        message.response_metadata[HISTORY_MESSAGE_TOKENS_COUNT_KEY] = len(
+            self.text_to_tokens(TokenHandler._history_message_text(message))
+        )
+
+    def message_tokens_count(self, message: BaseMessage) -> int:
+        """Get tokens count of history message.
+
+        The count stored in message metadata is used when it is available,
+        otherwise the message is encoded.
+
+        Args:
+            message: message from conversation history
+
+        Returns:
+            number of tokens of the message
+        """
+        tokens_count = message.response_metadata.get(HISTORY_MESSAGE_TOKENS_COUNT_KEY)
+        if tokens_count is None:
+            tokens_count = len(
+                self.text_to_tokens(TokenHandler._history_message_text(message))
+            )
+        return tokens_count
+
     def limit_conversation_history(
         self, history: list[BaseMessage], limit: int = 0
     ) -> tuple[list[BaseMessage], bool]:
-        """Limit conversation history to specified number of tokens."""
+        """Limit conversation history to specified number of tokens.
+
+        Tokens count stored along with the history messages is used, so only
+        messages without stored count are encoded.
+        """
         total_length = 0
         index = 0
+        self.prompt_budget.history = 0
 
         for message in reversed(history):
-            message_length = TokenHandler._get_token_count(
-                self.text_to_tokens(f"{message.type}: {message.content}")
-            )
+            tokens_count = self.message_tokens_count(message)
+            message_length = ceil(tokens_count * TOKEN_BUFFER_WEIGHT)
             total_length += message_length + 1  # 1 for new-line char
 
             # if total length of already checked messages is higher than limit
@@ -179,6 +256,7 @@ class TokenHandler:
                     "History truncated, it exceeds available %d tokens.", limit
                 )
                 return history[len(history) - index :], True
+            self.prompt_budget.history += tokens_count
             index += 1
 
         return history, False
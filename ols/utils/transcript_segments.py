@@ -0,0 +1,196 @@
+"""Transcripts appended to rotating, compressed JSONL segment files.
+
+Instead of one small file per transcript, transcripts are buffered in
+memory and periodically appended to a segment file by a background
+thread. Each flush is appended as a separate gzip member (zstd frame),
+so the segment is always a valid compressed stream. Segments are closed
+when they reach the configured size or age.
+
+Layout of the transcripts storage:
+
+    segments/<YYYYmmddTHHMMSS>-<suid>.jsonl[.gz|.zst]       closed segment
+    segments/<YYYYmmddTHHMMSS>-<suid>.jsonl[.gz|.zst].part  segment being written
+
+Only closed segments are collected. Segment being written is locked by
+its writer, segments left behind by terminated processes are closed
+when the next writer starts.
+"""
+
+import fcntl
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Optional
+
+from ols import constants
+from ols.app.models.config import TranscriptSegmentsConfig
+from ols.utils import suid
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIXES = {"none": ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    """Compress data into a self-contained gzip member or zstd frame."""
+    if compression == "gzip":
+        return gzip.compress(data)
+    if compression == "zstd":
+        import zstandard  # pylint: disable=C0415
+
+        return zstandard.ZstdCompressor().compress(data)
+    return data
+
+
+def segment_name(compression: str) -> str:
+    """Construct unique name of new segment, segments sort by creation time."""
+    created = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    return f"{created}-{suid.get_suid()}{SEGMENT_SUFFIXES[compression]}"
+
+
+class SegmentWriter:
+    """Appends transcripts to segment files in the given directory."""
+
+    def __init__(self, directory: Path, segments_config: TranscriptSegmentsConfig):
+        """Initialize segment writer."""
+        self.directory = directory
+        self.config = segments_config
+        self._lock = threading.Lock()  # guards the buffer
+        self._io_lock = threading.Lock()  # guards the segment file
+        self._buffer: list[bytes] = []
+        self._buffered_bytes = 0
+        self._segment: Optional[IO[bytes]] = None
+        self._segment_path: Optional[Path] = None
+        self._segment_opened_at = 0.0
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Close segments left by terminated writers and start flushing."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.recover_segments()
+        self._flusher = threading.Thread(
+            target=self._flush_periodically, name="transcript-segments", daemon=True
+        )
+        self._flusher.start()
+
+    def append(self, record: dict[str, Any]) -> None:
+        """Buffer the record, flush it immediately when too much is buffered."""
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self._buffer.append(line)
+            self._buffered_bytes += len(line)
+            flush_now = self._buffered_bytes >= self.config.max_buffered_bytes
+        if flush_now:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append buffered records to the segment, close segment when full or old."""
+        with self._io_lock:
+            with self._lock:
+                data = b"".join(self._buffer)
+                self._buffer.clear()
+                self._buffered_bytes = 0
+            if data:
+                segment = self._open_segment()
+                segment.write(compress(data, self.config.compression))
+                segment.flush()
+            if self._segment is not None and (
+                self._segment.tell() >= self.config.max_bytes
+                or time.monotonic() - self._segment_opened_at >= self.config.max_age
+            ):
+                self._close_segment()
+
+    def close(self) -> None:
+        """Stop flushing, write buffered records and close the segment."""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+        with self._io_lock:
+            self._close_segment()
+
+    def _flush_periodically(self) -> None:
+        """Flush buffered records until the writer is closed."""
+        while not self._stop.wait(self.config.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("failed to flush transcripts to segment")
+
+    def _open_segment(self) -> IO[bytes]:
+        """Get segment being written, open new one when needed."""
+        if self._segment is None:
+            path = self.directory / (
+                segment_name(self.config.compression)
+                + constants.TRANSCRIPTS_SEGMENT_PART_SUFFIX
+            )
+            segment = open(path, "ab")
+            # the lock tells other processes the segment is being written
+            fcntl.flock(segment, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self._segment, self._segment_path = segment, path
+            self._segment_opened_at = time.monotonic()
+            logger.debug("transcript segment '%s' opened", path)
+        return self._segment
+
+    def _close_segment(self) -> None:
+        """Close the segment, making it available for collection."""
+        if self._segment is None or self._segment_path is None:
+            return
+        # renamed while still locked, so it is not recovered by other writer
+        os.fsync(self._segment.fileno())
+        closed_path = self._segment_path.with_suffix("")
+        self._segment_path.rename(closed_path)
+        self._segment.close()
+        self._segment, self._segment_path = None, None
+        logger.debug("transcript segment '%s' closed", closed_path)
+
+    def recover_segments(self) -> None:
+        """Close segments whose writers are no longer running."""
+        pattern = "*" + constants.TRANSCRIPTS_SEGMENT_PART_SUFFIX
+        for path in self.directory.glob(pattern):
+            try:
+                with open(path, "ab") as segment:
+                    try:
+                        fcntl.flock(segment, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue  # still being written
+                    if segment.tell() == 0:
+                        path.unlink()
+                    else:
+                        path.rename(path.with_suffix(""))
+                logger.info("transcript segment '%s' left by other writer closed", path)
+            except FileNotFoundError:
+                continue  # recovered by other writer
+
+
+_writers: dict[str, SegmentWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_segment_writer(
+    directory: str, segments_config: TranscriptSegmentsConfig
+) -> SegmentWriter:
+    """Get (and start) segment writer for the transcripts storage."""
+    with _writers_lock:
+        writer = _writers.get(directory)
+        if writer is None:
+            writer = SegmentWriter(
+                Path(directory, constants.TRANSCRIPTS_SEGMENTS_DIR), segments_config
+            )
+            writer.start()
+            _writers[directory] = writer
+        return writer
+
+
+def close_segment_writers() -> None:
+    """Close all segment writers, so buffered transcripts are not lost."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
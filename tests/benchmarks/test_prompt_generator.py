@@ -13,7 +13,7 @@ from ols.constants import (
     PROVIDER_RHOAI_VLLM,
     PROVIDER_WATSONX,
 )
-from ols.src.prompts.prompt_generator import GeneratePrompt
+from ols.src.prompts.prompt_generator import GeneratePrompt, _prompt_template
 
 # providers and models used by parametrized benchmarks
 provider_and_model = (
@@ -156,3 +156,36 @@ def test_generate_prompt_long_history(benchmark, provider, model, long_history):
         long_history,
         rag_context,
     )
+
+
+@pytest.mark.parametrize(("provider", "model"), provider_and_model)
+def test_generate_prompt_uncached_template(
+    benchmark, provider, model, conversation_history
+):
+    """Benchmark prompt generator building the prompt template every time."""
+    query = "What is Kubernetes?"
+    rag_context = "context"
+
+    benchmark.pedantic(
+        generate_prompt,
+        args=(provider, model, query, conversation_history, rag_context),
+        setup=_prompt_template.cache_clear,
+        rounds=1000,
+    )
+
+
+@pytest.mark.parametrize(("provider", "model"), provider_and_model)
+def test_generate_prompt_cached_template(
+    benchmark, provider, model, conversation_history
+):
+    """Benchmark prompt generator reusing already cached prompt template."""
+    query = "What is Kubernetes?"
+    rag_context = "context"
+
+    # make sure the template is cached before measurement
+    generate_prompt(provider, model, query, conversation_history, rag_context)
+    benchmark.pedantic(
+        generate_prompt,
+        args=(provider, model, query, conversation_history, rag_context),
+        rounds=1000,
+    )
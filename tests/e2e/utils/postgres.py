@@ -35,7 +35,7 @@ def retrieve_connection():
 
 def read_conversation_history_count(postgres_connection):
     """Read number of items in conversation history."""
-    query = "SELECT count(*) FROM cache;"
+    query = "SELECT count(*) FROM conversations;"
     with postgres_connection.cursor() as cursor:
         cursor.execute(query)
         return cursor.fetchone()
@@ -43,7 +43,17 @@ def read_conversation_history_count(postgres_connection):
 
 def read_conversation_history(postgres_connection, conversation_id):
     """Read number of items in conversation history."""
-    query = "SELECT value, updated_at FROM cache WHERE conversation_id = %s"
+    # conversation turns are stored in separate rows, join them into JSON array
+    query = """
+        SELECT convert_to(
+                   '[' || string_agg(convert_from(e.value, 'UTF8'), ',' ORDER BY e.seq)
+                   || ']', 'UTF8'),
+               c.updated_at
+          FROM conversations c
+          JOIN conversation_entries e USING (user_id, conversation_id)
+         WHERE c.conversation_id = %s
+         GROUP BY c.user_id, c.conversation_id, c.updated_at
+        """
     with postgres_connection.cursor() as cursor:
         cursor.execute(query, (conversation_id,))
         return cursor.fetchone()
@@ -5,7 +5,7 @@
 # pyright: reportAttributeAccessIssue=false
 
 import logging
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 
 import pytest
 import requests
@@ -25,7 +25,7 @@ from ols.utils.errors_parsing import DEFAULT_ERROR_MESSAGE, DEFAULT_STATUS_CODE
 from ols.utils.logging_configurator import configure_logging
 from tests.mock_classes.mock_langchain_interface import mock_langchain_interface
 from tests.mock_classes.mock_llm_loader import mock_llm_loader
-from tests.mock_classes.mock_tools import mock_tools_map
+from tests.mock_classes.mock_tools import mock_mcp_session_tools, mock_tools_map
 
 INVALID_QUERY_RESP = prompts.INVALID_QUERY_RESP
 
@@ -126,7 +126,7 @@ def test_post_question_on_generic_response_type_summarize_error(_setup, endpoint
             return_value=answer,
         ),
         patch(
-            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response",
+            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response",
             side_effect=Exception("summarizer error"),
         ),
         patch(
@@ -1187,18 +1187,14 @@ def test_tool_calling(_setup, caplog) -> None:
             return_value=mcp_servers,
         ),
         patch(
-            "ols.src.query_helpers.docs_summarizer.MultiServerMCPClient"
-        ) as mock_mcp_client_cls,
+            "ols.src.query_helpers.docs_summarizer.mcp_session_manager.tools",
+            new=mock_mcp_session_tools,
+        ),
         patch(
             "ols.src.query_helpers.docs_summarizer.DocsSummarizer._invoke_llm",
             new=fake_invoke_llm,
         ) as mock_invoke,
     ):
-        # Create mock tools map
-        mock_mcp_client_instance = AsyncMock()
-        mock_mcp_client_instance.get_tools.return_value = mock_tools_map
-        mock_mcp_client_cls.return_value = mock_mcp_client_instance
-
         with (
             patch(
                 "ols.src.query_helpers.query_helper.load_llm",
@@ -1,5 +1,7 @@
 """Mocked tools for tool calling."""
 
+from contextlib import asynccontextmanager
+
 from langchain.tools import tool
 
 
@@ -14,3 +16,9 @@ default                                            Active   25m
 
 
 mock_tools_map = [get_namespaces_mock]
+
+
+@asynccontextmanager
+async def mock_mcp_session_tools(connections):
+    """Provide mocked tools instead of tools from MCP sessions."""
+    yield mock_tools_map
@@ -1,7 +1,9 @@
 """Unit tests for OLS endpoint."""
 
+import asyncio
 import json
 import re
+import threading
 from http import HTTPStatus
 from pathlib import Path
 from unittest.mock import Mock, patch
@@ -16,11 +18,15 @@ from ols import config, constants
 config.ols_config.authentication_config.module = "k8s"
 
 from ols.app.endpoints import ols  # noqa:E402
-from ols.app.models.config import UserDataCollection  # noqa:E402
+from ols.app.models.config import (  # noqa:E402
+    TranscriptSegmentsConfig,
+    UserDataCollection,
+)
 from ols.app.models.models import (  # noqa:E402
     Attachment,
     CacheEntry,
     LLMRequest,
+    ProcessedRequest,
     RagChunk,
     SummarizerResponse,
     TokenCounter,
@@ -30,7 +36,8 @@ from ols.src.llms.llm_loader import LLMConfigurationError  # noqa:E402
 from ols.utils import suid  # noqa:E402
 from ols.utils.errors_parsing import DEFAULT_ERROR_MESSAGE  # noqa:E402
 from ols.utils.redactor import Redactor, RegexFilter  # noqa:E402
-from ols.utils.token_handler import PromptTooLongError  # noqa:E402
+from ols.utils.token_handler import PromptTooLongError, TokenHandler  # noqa:E402
+from ols.utils.transcript_segments import close_segment_writers  # noqa:E402
 
 
 @pytest.fixture(scope="function")
@@ -106,16 +113,43 @@ def test_retrieve_previous_input_improper_user_id():
 def test_retrieve_previous_input_for_previous_history():
     """Check how function to retrieve previous input handle existing history."""
     conversation_id = suid.get_suid()
-    with patch("ols.config.conversation_cache.get") as get:
-        get.return_value = "input"
+    with patch("ols.config.conversation_cache.get_tail") as get_tail:
+        get_tail.return_value = "input"
         llm_request = LLMRequest(
             query="Tell me about Kubernetes", conversation_id=conversation_id
         )
         assert llm_request.conversation_id is not None
         previous_input = ols.retrieve_previous_input(
-            constants.DEFAULT_USER_UID, llm_request.conversation_id
+            constants.DEFAULT_USER_UID, llm_request.conversation_id, max_tokens=100
         )
         assert previous_input == "input"
+        get_tail.assert_called_once_with(
+            constants.DEFAULT_USER_UID,
+            conversation_id,
+            max_tokens=100,
+            skip_user_id_check=False,
+        )
+
+
+@pytest.mark.usefixtures("_load_config")
+def test_history_tokens_limit():
+    """Check that history is limited by the model's context window."""
+    llm_request = LLMRequest(query="Tell me about Kubernetes")
+    provider_config = config.llm_config.providers.get(
+        config.ols_config.default_provider
+    )
+    model_config = provider_config.models.get(config.ols_config.default_model)
+
+    assert ols.history_tokens_limit(llm_request) == (
+        model_config.context_window_size
+        - model_config.parameters.max_tokens_for_response
+    )
+
+    # unknown model is reported by its validation
+    llm_request = LLMRequest(
+        query="Tell me about Kubernetes", provider="unknown", model="unknown"
+    )
+    assert ols.history_tokens_limit(llm_request) is None
 
 
 @pytest.mark.usefixtures("_load_config")
@@ -233,7 +267,11 @@ def test_store_conversation_history():
             {},
         )
 
-        expected_history = CacheEntry(query=HumanMessage(query))
+        expected_query = HumanMessage(query)
+        expected_response = AIMessage("")
+        TokenHandler().store_message_tokens_count(expected_query)
+        TokenHandler().store_message_tokens_count(expected_response)
+        expected_history = CacheEntry(query=expected_query, response=expected_response)
         insert_or_append.assert_called_with(
             constants.DEFAULT_USER_UID,
             conversation_id,
@@ -257,14 +295,39 @@ def test_store_conversation_history_some_response():
             user_id, conversation_id, llm_request, response, [], skip_user_id_check
         )
 
-    expected_history = CacheEntry(
-        query=HumanMessage(query), response=AIMessage(response)
-    )
+    expected_query = HumanMessage(query)
+    expected_response = AIMessage(response)
+    TokenHandler().store_message_tokens_count(expected_query)
+    TokenHandler().store_message_tokens_count(expected_response)
+    expected_history = CacheEntry(query=expected_query, response=expected_response)
     insert_or_append.assert_called_with(
         user_id, conversation_id, expected_history, skip_user_id_check
     )
 
 
+@pytest.mark.usefixtures("_load_config")
+def test_store_conversation_history_tokens_count():
+    """Test that tokens count of messages is stored along with conversation history."""
+    query = "Tell me about Kubernetes"
+    llm_request = LLMRequest(query=query)
+    response = "  *response*\n"
+
+    with patch("ols.config.conversation_cache.insert_or_append") as insert_or_append:
+        ols.store_conversation_history(
+            "1234", suid.get_suid(), llm_request, response, [], {}
+        )
+
+    cache_entry = insert_or_append.call_args.args[2]
+    token_handler = TokenHandler()
+    assert cache_entry.query.response_metadata[
+        constants.HISTORY_MESSAGE_TOKENS_COUNT_KEY
+    ] == len(token_handler.text_to_tokens(f"human: {query}"))
+    # history messages are stripped, so the count is computed for stripped content
+    assert cache_entry.response.response_metadata[
+        constants.HISTORY_MESSAGE_TOKENS_COUNT_KEY
+    ] == len(token_handler.text_to_tokens("ai: *response*"))
+
+
 @pytest.mark.usefixtures("_load_config")
 def test_store_conversation_history_empty_user_id():
     """Test if basic input verification is done during history store operation."""
@@ -672,8 +735,9 @@ def test_attachments_redact_on_redact_error():
             ols.redact_attachments(conversation_id, attachments)
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-def test_conversation_request(auth):
+async def test_conversation_request(auth):
     """Test conversation request API endpoint."""
     with (
         patch(
@@ -684,9 +748,9 @@ def test_conversation_request(auth):
             "ols.src.query_helpers.question_validator.QuestionValidator.validate_question"
         ) as mock_validate_question,
         patch(
-            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response"
+            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response"
         ) as mock_summarize,
-        patch("ols.config.conversation_cache.get"),
+        patch("ols.config.conversation_cache.get_tail"),
     ):
         # valid question
         mock_validate_question.return_value = True
@@ -700,7 +764,7 @@ def test_conversation_request(auth):
             token_counter=None,
         )
         llm_request = LLMRequest(query="Tell me about Kubernetes")
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
         assert (
             response.response
             == "Kubernetes is an open-source container-orchestration system..."
@@ -712,7 +776,7 @@ def test_conversation_request(auth):
         # invalid question
         mock_validate_question.return_value = False
         llm_request = LLMRequest(query="Generate a yaml")
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
         assert response.response == prompts.INVALID_QUERY_RESP
         assert suid.check_suid(
             response.conversation_id
@@ -722,22 +786,23 @@ def test_conversation_request(auth):
         mock_validate_question.side_effect = HTTPException
         with pytest.raises(HTTPException) as excinfo:
             llm_request = LLMRequest(query="Generate a yaml")
-            response = ols.conversation_request(llm_request, auth)
+            response = await ols.conversation_request(llm_request, auth)
             assert excinfo.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
             assert len(response.conversation_id) == 0
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-def test_conversation_request_dedup_ref_docs(auth):
+async def test_conversation_request_dedup_ref_docs(auth):
     """Test deduplication of referenced docs."""
     with (
         patch(
             "ols.src.query_helpers.question_validator.QuestionValidator.validate_question"
         ) as mock_validate_question,
         patch(
-            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response"
+            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response"
         ) as mock_summarize,
-        patch("ols.config.conversation_cache.get"),
+        patch("ols.config.conversation_cache.get_tail"),
     ):
         mock_rag_chunk = [
             RagChunk(text="text1", doc_url="url-b", doc_title="title-b"),
@@ -754,7 +819,7 @@ def test_conversation_request_dedup_ref_docs(auth):
             token_counter=None,
         )
         llm_request = LLMRequest(query="some query")
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
 
         assert len(response.referenced_documents) == 2
         assert response.referenced_documents[0].doc_url == "url-b"
@@ -763,8 +828,9 @@ def test_conversation_request_dedup_ref_docs(auth):
         assert response.referenced_documents[1].doc_title == "title-a"
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-def test_conversation_request_on_wrong_configuration(auth):
+async def test_conversation_request_on_wrong_configuration(auth):
     """Test conversation request API endpoint."""
     with (
         patch(
@@ -774,7 +840,7 @@ def test_conversation_request_on_wrong_configuration(auth):
         patch(
             "ols.src.query_helpers.question_validator.QuestionValidator.validate_question"
         ) as mock_validate_question,
-        patch("ols.config.conversation_cache.get"),
+        patch("ols.config.conversation_cache.get_tail"),
     ):
         # mock invalid configuration
         message = "wrong model is configured"
@@ -785,11 +851,12 @@ def test_conversation_request_on_wrong_configuration(auth):
 
         # call must fail because we mocked invalid configuration state
         with pytest.raises(HTTPException, match="Unable to process this request"):
-            ols.conversation_request(llm_request, auth)
+            await ols.conversation_request(llm_request, auth)
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-def test_question_validation_in_conversation_start(auth):
+async def test_question_validation_in_conversation_start(auth):
     """Test if question validation is skipped in follow-up conversation."""
     with (
         patch(
@@ -806,13 +873,14 @@ def test_question_validation_in_conversation_start(auth):
         query = "some elaborate question"
         llm_request = LLMRequest(query=query, conversation_id=conversation_id)
 
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
 
         assert response.response.startswith(prompts.INVALID_QUERY_RESP)
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-def test_no_question_validation_in_follow_up_conversation(auth):
+async def test_no_question_validation_in_follow_up_conversation(auth):
     """Test if question validation is skipped in follow-up conversation."""
     with (
         patch(
@@ -824,7 +892,7 @@ def test_no_question_validation_in_follow_up_conversation(auth):
             new=Mock(return_value=constants.SUBJECT_REJECTED),
         ),
         patch(
-            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.create_response"
+            "ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response"
         ) as mock_summarize,
     ):
         # note the `validate_question` is patched to always return as `SUBJECT_REJECTED`
@@ -839,20 +907,21 @@ def test_no_question_validation_in_follow_up_conversation(auth):
         query = "some elaborate question"
         llm_request = LLMRequest(query=query, conversation_id=conversation_id)
 
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
 
         assert response.response == "some elaborate answer"
 
 
+@pytest.mark.asyncio
 @pytest.mark.usefixtures("_load_config")
-def test_conversation_request_invalid_subject(auth):
+async def test_conversation_request_invalid_subject(auth):
     """Test how generate_response function checks validation results."""
     with (patch("ols.app.endpoints.ols.validate_question") as mock_validate,):
         # prepare arguments for DocsSummarizer
         llm_request = LLMRequest(query="Tell me about Kubernetes")
 
         mock_validate.return_value = False
-        response = ols.conversation_request(llm_request, auth)
+        response = await ols.conversation_request(llm_request, auth)
         assert response.response == prompts.INVALID_QUERY_RESP
         assert len(response.referenced_documents) == 0
         assert not response.truncated
@@ -911,6 +980,72 @@ def test_generate_response_on_summarizer_error():
             ols.generate_response(conversation_id, llm_request, previous_input)
 
 
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+async def test_agenerate_response_on_summarizer_error():
+    """Test how agenerate_response function handles summarizer errors."""
+    with patch(
+        "ols.src.query_helpers.docs_summarizer.DocsSummarizer.acreate_response",
+        side_effect=PromptTooLongError("too long"),
+    ):
+        llm_request = LLMRequest(query="Tell me about Kubernetes")
+
+        with pytest.raises(HTTPException, match="Prompt is too long") as excinfo:
+            await ols.agenerate_response(suid.get_suid(), llm_request, [])
+        assert excinfo.value.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+async def test_conversation_request_blocking_calls_in_executor(auth):
+    """Test that blocking calls are not performed in the event loop thread."""
+    threads = {}
+
+    def record_thread(name):
+        def side_effect(*args, **kwargs):
+            threads[name] = threading.current_thread()
+
+        return side_effect
+
+    with (
+        patch(
+            "ols.app.endpoints.ols.process_request",
+            return_value=ProcessedRequest(
+                user_id=constants.DEFAULT_USER_UID,
+                conversation_id=suid.get_suid(),
+                query_without_attachments="query",
+                previous_input=[],
+                attachments=[],
+                valid=False,
+                timestamps={},
+                skip_user_id_check=False,
+                user_token="",
+            ),
+        ),
+        patch(
+            "ols.app.endpoints.ols.store_conversation_history",
+            side_effect=record_thread("store_conversation_history"),
+        ),
+        patch(
+            "ols.app.endpoints.ols.consume_tokens",
+            side_effect=record_thread("consume_tokens"),
+        ),
+        patch("ols.app.endpoints.ols.log_processing_durations"),
+        patch(
+            "ols.app.endpoints.ols.config.ols_config.user_data_collection.transcripts_disabled",
+            True,
+        ),
+    ):
+        llm_request = LLMRequest(query="Tell me about Kubernetes")
+        response = await ols.conversation_request(llm_request, auth)
+
+    assert response.response == prompts.INVALID_QUERY_RESP
+    assert set(threads) == {"store_conversation_history", "consume_tokens"}
+    for thread in threads.values():
+        assert thread is not threading.current_thread()
+        assert thread.name.startswith("ols-blocking")
+
+
 def test_generate_response_unknown_validation_result():
     """Test how generate_response function checks validation results."""
     # prepare arguments for DocsSummarizer
@@ -949,7 +1084,7 @@ def test_transcripts_are_not_stored_when_disabled(transcripts_location, auth):
             return_value=True,
         ),
         patch(
-            "ols.app.endpoints.ols.generate_response",
+            "ols.app.endpoints.ols.agenerate_response",
             return_value=SummarizerResponse("something", [], False, None),
         ),
         patch(
@@ -958,7 +1093,7 @@ def test_transcripts_are_not_stored_when_disabled(transcripts_location, auth):
         ),
     ):
         llm_request = LLMRequest(query="Tell me about Kubernetes")
-        response = ols.conversation_request(llm_request, auth)
+        response = asyncio.run(ols.conversation_request(llm_request, auth))
         assert response
         assert response.response == "something"
 
@@ -1072,6 +1207,43 @@ def test_store_transcript(transcripts_location):
     }
 
 
+def test_store_transcript_in_segment(tmpdir):
+    """Test transcripts are appended to segment when segments are configured."""
+    config.ols_config.user_data_collection = UserDataCollection(
+        transcripts_disabled=False,
+        transcripts_storage=tmpdir.strpath,
+        transcripts_segments=TranscriptSegmentsConfig(compression="none"),
+    )
+    user_id = suid.get_suid()
+    conversation_ids = [suid.get_suid(), suid.get_suid()]
+
+    for conversation_id in conversation_ids:
+        ols.store_transcript(
+            user_id,
+            conversation_id,
+            True,
+            "query",
+            LLMRequest(query="query", conversation_id=conversation_id),
+            "response",
+            [],
+            False,
+            [],
+            [],
+            [],
+        )
+    close_segment_writers()
+
+    # no directories per user and conversation are created
+    assert not (Path(tmpdir.strpath) / user_id).exists()
+    segments = list((Path(tmpdir.strpath) / "segments").glob("*.jsonl"))
+    assert len(segments) == 1
+    transcripts = [json.loads(line) for line in segments[0].read_text().splitlines()]
+    assert [
+        transcript["metadata"]["conversation_id"] for transcript in transcripts
+    ] == conversation_ids
+    assert transcripts[0]["llm_response"] == "response"
+
+
 def test_calc_input_tokens_no_token_counter():
     """Test the helper function calc_input_tokens."""
     token_counter = None
@@ -1,6 +1,9 @@
 """Unit tests for streaming_ols.py."""
 
+import asyncio
 import json
+import threading
+from unittest.mock import patch
 
 import pytest
 
@@ -10,20 +13,30 @@ from ols.app.models.models import StreamedChunk
 # needs to be setup there before is_user_authorized is imported
 config.ols_config.authentication_config.module = "k8s"
 
+from ols.app import metrics  # noqa:E402
+from ols.app.endpoints.ols import transcripts_writer  # noqa:E402
 from ols.app.endpoints.streaming_ols import (  # noqa:E402
     LLM_TOKEN_EVENT,
     LLM_TOOL_CALL_EVENT,
     LLM_TOOL_RESULT_EVENT,
+    STREAM_IDLE,
+    ClientDisconnectedError,
+    TokenCoalescer,
     build_referenced_docs,
+    cancel_on_disconnect,
     format_stream_data,
     generic_llm_error,
     invalid_response_generator,
     prompt_too_long_error,
+    response_processing_wrapper,
     stream_end_event,
     stream_event,
     stream_start_event,
+    token_coalescing,
+    token_event,
 )
-from ols.app.models.models import RagChunk, TokenCounter  # noqa:E402
+from ols.app.models.config import TokenCoalescingConfig  # noqa:E402
+from ols.app.models.models import LLMRequest, RagChunk, TokenCounter  # noqa:E402
 from ols.customize import prompts  # noqa:E402
 from ols.utils import suid  # noqa:E402
 from ols.utils.errors_parsing import DEFAULT_ERROR_MESSAGE  # noqa:E402
@@ -226,3 +239,324 @@ def test_build_referenced_docs():
         {"doc_title": "title_1", "doc_url": "url_1"},
         {"doc_title": "title_2", "doc_url": "url_2"},
     ]
+
+
+async def connected() -> bool:
+    """Client is connected."""
+    return False
+
+
+async def disconnected() -> bool:
+    """Client is disconnected."""
+    return True
+
+
+async def chunks_generator(count, delay=0.0, state=None):
+    """Generate text chunks, record when the generation was cancelled."""
+    try:
+        for i in range(count):
+            await asyncio.sleep(delay)
+            yield StreamedChunk(type="text", text=f"token{i}")
+    except asyncio.CancelledError:
+        state["cancelled"] = True
+        raise
+
+
+@pytest.mark.asyncio
+async def test_cancel_on_disconnect_connected_client():
+    """Test that all items are provided while client is connected."""
+    generator = cancel_on_disconnect(chunks_generator(3), connected, 0.01)
+
+    response = await drain_generator(generator)
+
+    assert [chunk.text for chunk in response] == ["token0", "token1", "token2"]
+
+
+@pytest.mark.asyncio
+async def test_cancel_on_disconnect_generator_error():
+    """Test that generator errors are propagated."""
+
+    async def failing_generator():
+        yield StreamedChunk(type="text", text="token0")
+        raise ValueError("LLM error")
+
+    generator = cancel_on_disconnect(failing_generator(), connected, 0.01)
+
+    with pytest.raises(ValueError, match="LLM error"):
+        await drain_generator(generator)
+
+
+@pytest.mark.asyncio
+async def test_cancel_on_disconnect_disconnected_client():
+    """Test that generation is cancelled when client disconnects."""
+    state = {"cancelled": False}
+    client_state = {"disconnected": False}
+
+    async def is_disconnected():
+        return client_state["disconnected"]
+
+    generator = cancel_on_disconnect(
+        chunks_generator(100, delay=0.05, state=state), is_disconnected, 0.01
+    )
+    assert (await anext(generator)).text == "token0"
+    client_state["disconnected"] = True
+
+    # generation is cancelled while waiting for next token
+    with pytest.raises(ClientDisconnectedError):
+        await anext(generator)
+    assert state["cancelled"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+async def test_response_processing_wrapper_client_disconnected():
+    """Test that nothing is stored when client disconnects."""
+    state = {"cancelled": False}
+    llm_request = LLMRequest(query="bla")
+    cancelled_metric = metrics.llm_generations_cancelled_total.labels(
+        "bam", "model-name"
+    )
+    cancelled_before = cancelled_metric._value.get()
+
+    with (
+        patch("ols.app.endpoints.streaming_ols.store_data") as mock_store_data,
+        patch("ols.app.endpoints.streaming_ols.consume_tokens") as mock_consume,
+    ):
+        response = await drain_generator(
+            response_processing_wrapper(
+                chunks_generator(100, delay=0.05, state=state),
+                "user",
+                conversation_id,
+                llm_request,
+                [],
+                True,
+                "bla",
+                constants.MEDIA_TYPE_JSON,
+                {},
+                False,
+                disconnected,
+            )
+        )
+
+    # generation stopped, response was not finished
+    assert len(response) < 100
+    assert '"event": "end"' not in response[-1]
+    assert state["cancelled"]
+    mock_store_data.assert_not_called()
+    mock_consume.assert_not_called()
+    assert cancelled_metric._value.get() == cancelled_before + 1
+
+
+@pytest.mark.parametrize(
+    "media_type", [constants.MEDIA_TYPE_TEXT, constants.MEDIA_TYPE_JSON]
+)
+@pytest.mark.parametrize("token", ["hi", ' "quoted" ', "line\nbreak", "žluťoučký"])
+def test_token_event(media_type, token):
+    """Test that token_event builds the same event as stream_event."""
+    assert token_event(42, token, media_type) == stream_event(
+        {"id": 42, "token": token}, LLM_TOKEN_EVENT, media_type
+    )
+
+
+def test_token_coalescer_max_tokens():
+    """Test that tokens are flushed when max tokens are buffered."""
+    coalescer = TokenCoalescer(
+        constants.MEDIA_TYPE_TEXT,
+        TokenCoalescingConfig(max_tokens=3, max_delay_ms=10000),
+    )
+
+    assert coalescer.add(0, "a") == ""
+    assert coalescer.add(1, "b") == ""
+    assert coalescer.add(2, "c") == "abc"
+    assert coalescer.add(3, "d") == ""
+    assert coalescer.flush() == "d"
+    assert coalescer.flush() == ""
+
+
+def test_token_coalescer_max_bytes():
+    """Test that tokens are flushed when max bytes are buffered."""
+    coalescer = TokenCoalescer(
+        constants.MEDIA_TYPE_TEXT,
+        TokenCoalescingConfig(max_tokens=100, max_bytes=5, max_delay_ms=10000),
+    )
+
+    assert coalescer.add(0, "abc") == ""
+    assert coalescer.add(1, "def") == "abcdef"
+
+
+def test_token_coalescer_max_delay():
+    """Test that tokens are flushed when they wait for too long."""
+    coalescer = TokenCoalescer(
+        constants.MEDIA_TYPE_JSON,
+        TokenCoalescingConfig(max_tokens=100, max_delay_ms=50),
+    )
+
+    with patch("ols.app.endpoints.streaming_ols.time.monotonic", return_value=1.0):
+        assert coalescer.add(0, "a") == ""
+        assert not coalescer.due()
+    with patch("ols.app.endpoints.streaming_ols.time.monotonic", return_value=1.06):
+        assert coalescer.due()
+        assert coalescer.add(1, "b") == token_event(
+            0, "a", constants.MEDIA_TYPE_JSON
+        ) + token_event(1, "b", constants.MEDIA_TYPE_JSON)
+    assert not coalescer.due()
+
+
+def test_token_coalescer_disabled():
+    """Test that every token is sent when coalescing is disabled."""
+    coalescer = TokenCoalescer(
+        constants.MEDIA_TYPE_TEXT, TokenCoalescingConfig(max_tokens=1)
+    )
+
+    assert coalescer.flush_interval is None
+    assert coalescer.add(0, "a") == "a"
+    assert coalescer.add(1, "b") == "b"
+
+
+@pytest.mark.usefixtures("_load_config")
+def test_token_coalescing_request_override():
+    """Test that request can override token coalescing options."""
+    assert token_coalescing(LLMRequest(query="bla")) == TokenCoalescingConfig()
+
+    llm_request = LLMRequest(query="bla", token_coalescing={"max_tokens": 1})
+    assert token_coalescing(llm_request) == TokenCoalescingConfig(max_tokens=1)
+
+
+@pytest.mark.asyncio
+async def test_cancel_on_disconnect_idle():
+    """Test that idle marker is yielded while the generator is waiting."""
+    generator = cancel_on_disconnect(
+        chunks_generator(2, delay=0.05), connected, 10, idle_interval=0.01
+    )
+
+    response = await drain_generator(generator)
+
+    assert STREAM_IDLE in response
+    assert [item.text for item in response if item is not STREAM_IDLE] == [
+        "token0",
+        "token1",
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+async def test_response_processing_wrapper_coalescing():
+    """Test that tokens are sent in fewer writes, events are not changed."""
+
+    async def generator():
+        for i in range(5):
+            yield StreamedChunk(type="text", text=f"token{i}")
+        yield StreamedChunk(type="tool_call", data={"id": "call_1"})
+        yield StreamedChunk(type="text", text="token5")
+        yield StreamedChunk(
+            type="end",
+            data={"rag_chunks": [], "truncated": False, "token_counter": None},
+        )
+
+    llm_request = LLMRequest(
+        query="bla",
+        media_type=constants.MEDIA_TYPE_JSON,
+        token_coalescing={"max_tokens": 3, "max_delay_ms": 10000},
+    )
+    with (
+        patch("ols.app.endpoints.streaming_ols.store_data"),
+        patch("ols.app.endpoints.streaming_ols.consume_tokens"),
+        patch("ols.app.endpoints.streaming_ols.get_available_quotas", return_value={}),
+        patch("ols.app.endpoints.streaming_ols.log_processing_durations"),
+    ):
+        response = await drain_generator(
+            response_processing_wrapper(
+                generator(),
+                "user",
+                conversation_id,
+                llm_request,
+                [],
+                True,
+                "bla",
+                constants.MEDIA_TYPE_JSON,
+                {},
+                False,
+                connected,
+            )
+        )
+
+    def token(idx):
+        return token_event(idx, f"token{idx}", constants.MEDIA_TYPE_JSON)
+
+    assert response[1:4] == [
+        token(0) + token(1) + token(2),
+        # buffered tokens are sent before tool call
+        token(3)
+        + token(4)
+        + stream_event(
+            {"id": "call_1"}, LLM_TOOL_CALL_EVENT, constants.MEDIA_TYPE_JSON
+        ),
+        # and at the end of the response
+        token(5),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("_load_config")
+async def test_response_processing_wrapper_blocking_calls_off_event_loop():
+    """Test that data are stored outside of the event loop thread."""
+    threads = {}
+
+    def record_thread(name, result=None):
+        def side_effect(*args, **kwargs):
+            threads[name] = threading.current_thread()
+            return result
+
+        return side_effect
+
+    with (
+        patch(
+            "ols.app.endpoints.streaming_ols.store_conversation_history",
+            side_effect=record_thread("store_conversation_history"),
+        ),
+        patch(
+            "ols.app.endpoints.streaming_ols.store_transcript",
+            side_effect=record_thread("store_transcript"),
+        ),
+        patch(
+            "ols.app.endpoints.streaming_ols.consume_tokens",
+            side_effect=record_thread("consume_tokens"),
+        ),
+        patch(
+            "ols.app.endpoints.streaming_ols.get_available_quotas",
+            side_effect=record_thread("get_available_quotas", {"limiter": 10}),
+        ),
+        patch(
+            "ols.app.endpoints.streaming_ols.config.ols_config.user_data_collection.transcripts_disabled",
+            False,
+        ),
+        patch("ols.app.endpoints.streaming_ols.log_processing_durations"),
+    ):
+        response = await drain_generator(
+            response_processing_wrapper(
+                chunks_generator(3),
+                "user",
+                conversation_id,
+                LLMRequest(query="bla"),
+                [],
+                True,
+                "bla",
+                constants.MEDIA_TYPE_JSON,
+                {},
+                False,
+                connected,
+            )
+        )
+        assert transcripts_writer.flush(timeout=5)
+
+    assert '"limiter": 10' in response[-1]
+    assert set(threads) == {
+        "store_conversation_history",
+        "store_transcript",
+        "consume_tokens",
+        "get_available_quotas",
+    }
+    for thread in threads.values():
+        assert thread is not threading.current_thread()
+    assert threads["store_transcript"].name.startswith("ols-transcripts")
+    assert threads["consume_tokens"].name.startswith("ols-blocking")
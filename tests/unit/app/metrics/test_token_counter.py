@@ -1,5 +1,7 @@
 """Unit tests for GenericTokenCounter class."""
 
+from unittest.mock import patch
+
 import pytest
 
 from ols import config
@@ -93,3 +95,35 @@ async def test_on_llm_end():
     # check the textual representation as well
     expected = "GenericTokenCounter: input_tokens: 0 output_tokens: 2 LLM calls: 0"
     assert str(generic_token_counter) == expected
+
+
+@pytest.mark.asyncio
+async def test_on_llm_start_precomputed_prompt_tokens():
+    """Test that precomputed tokens are used for the first prompt."""
+    generic_token_counter = GenericTokenCounter(MockLLM(), prompt_tokens=42)
+
+    await generic_token_counter.on_llm_start({}, ["this is just a test"])
+    assert generic_token_counter.token_counter.llm_calls == 1
+    assert generic_token_counter.token_counter.input_tokens == 42
+
+
+@pytest.mark.asyncio
+async def test_on_llm_start_extended_prompt():
+    """Test that only the new suffix of extended prompt is encoded."""
+    generic_token_counter = GenericTokenCounter(MockLLM(), prompt_tokens=42)
+    prompt = "this is just a test"
+
+    await generic_token_counter.on_llm_start({}, [prompt])
+    with patch.object(
+        generic_token_counter, "tokens_count", wraps=generic_token_counter.tokens_count
+    ) as tokens_count:
+        # next round sends the previous prompt extended by tool messages
+        await generic_token_counter.on_llm_start({}, [prompt + " tool result"])
+        tokens_count.assert_called_once_with(" tool result")
+
+        # prompt which does not extend the previous one is encoded as a whole
+        await generic_token_counter.on_llm_start({}, ["other prompt"])
+        tokens_count.assert_called_with("other prompt")
+
+    assert generic_token_counter.token_counter.llm_calls == 3
+    assert generic_token_counter.token_counter.input_tokens == 42 + (42 + 2) + 2
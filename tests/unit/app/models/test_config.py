@@ -31,11 +31,15 @@ from ols.app.models.config import (
     QuotaHandlersConfig,
     ReferenceContent,
     ReferenceContentIndex,
+    ShardedInMemoryCacheConfig,
     SseTransportConfig,
     StdioTransportConfig,
     StreamableHttpTransportConfig,
+    TieredCacheConfig,
     TLSConfig,
     TLSSecurityProfile,
+    TokenCoalescingConfig,
+    TranscriptSegmentsConfig,
     UserDataCollection,
     UserDataCollectorConfig,
 )
@@ -88,6 +92,46 @@ def test_mcp_server_config(
     assert mcp_server_config.name == "gru"
 
 
+def test_mcp_server_config_cacheable_tools(mcp_server_config_stdio_transport):
+    """Test the MCPServerConfig model cacheable tools options."""
+    mcp_server_config = MCPServerConfig(**mcp_server_config_stdio_transport)
+    assert mcp_server_config.cacheable_tools == []
+    assert (
+        mcp_server_config.tool_results_cache_ttl == constants.MCP_TOOL_RESULTS_CACHE_TTL
+    )
+
+    mcp_server_config = MCPServerConfig(
+        **mcp_server_config_stdio_transport,
+        cacheable_tools=["oc_get"],
+        tool_results_cache_ttl=10,
+    )
+    assert mcp_server_config.cacheable_tools == ["oc_get"]
+    assert mcp_server_config.tool_results_cache_ttl == 10
+
+    with pytest.raises(ValidationError, match="Input should be greater than 0"):
+        MCPServerConfig(**mcp_server_config_stdio_transport, tool_results_cache_ttl=0)
+
+
+def test_mcp_server_config_tool_timeouts(mcp_server_config_stdio_transport):
+    """Test the MCPServerConfig model tool timeouts options."""
+    mcp_server_config = MCPServerConfig(**mcp_server_config_stdio_transport)
+    assert mcp_server_config.tool_timeout == constants.MCP_TOOL_CALL_TIMEOUT
+    assert mcp_server_config.tool_timeouts == {}
+
+    mcp_server_config = MCPServerConfig(
+        **mcp_server_config_stdio_transport,
+        tool_timeout=10,
+        tool_timeouts={"oc_logs": 30},
+    )
+    assert mcp_server_config.tool_timeout == 10
+    assert mcp_server_config.tool_timeouts == {"oc_logs": 30}
+
+    with pytest.raises(ValidationError, match="Input should be greater than 0"):
+        MCPServerConfig(
+            **mcp_server_config_stdio_transport, tool_timeouts={"oc_logs": 0}
+        )
+
+
 def test_mcp_server_config_required_name():
     """Test the MCPServerConfig model for missing name."""
     with pytest.raises(
@@ -2071,6 +2115,22 @@ def test_postgres_config_wrong_port():
         )
 
 
+def test_postgres_config_connections():
+    """Test the PostgresConfig model with connection pool size."""
+    postgres_config = PostgresConfig(min_connections=0, max_connections=4)
+    assert postgres_config.min_connections == 0
+    assert postgres_config.max_connections == 4
+
+    with pytest.raises(
+        ValidationError,
+        match="min_connections can't be greater than max_connections",
+    ):
+        PostgresConfig(min_connections=5, max_connections=4)
+
+    with pytest.raises(ValidationError, match="greater than 0"):
+        PostgresConfig(max_connections=0)
+
+
 def test_postgres_config_equality():
     """Test the PostgresConfig equality check."""
     postgres_config_1 = PostgresConfig()
@@ -2116,6 +2176,22 @@ def test_memory_cache_config():
     assert memory_cache_config.max_entries is None
 
 
+def test_memory_cache_config_max_bytes():
+    """Test the MemoryCacheConfig model with size limit."""
+    memory_cache_config = InMemoryCacheConfig({"max_entries": 100})
+    assert memory_cache_config.max_bytes is None
+
+    memory_cache_config = InMemoryCacheConfig({"max_bytes": "1048576"})
+    assert memory_cache_config.max_bytes == 1048576
+
+    for max_bytes in (0, -1, "foo"):
+        with pytest.raises(
+            InvalidConfigurationError,
+            match="invalid max_bytes for memory conversation cache",
+        ):
+            InMemoryCacheConfig({"max_bytes": max_bytes})
+
+
 def test_memory_cache_config_improper_entries():
     """Test the MemoryCacheConfig model if improper max_entries is used."""
     with pytest.raises(
@@ -2141,11 +2217,124 @@ def test_memory_config_equality():
     memory_config_2.max_entries = 123456
     assert memory_config_1 != memory_config_2
 
+    memory_config_2 = InMemoryCacheConfig()
+    memory_config_2.max_bytes = 123456
+    assert memory_config_1 != memory_config_2
+
     # compare with value of different type
     other_value = "foo"
     assert memory_config_1 != other_value
 
 
+def test_sharded_memory_cache_config():
+    """Test the ShardedInMemoryCacheConfig model."""
+    sharded_config = ShardedInMemoryCacheConfig({"max_entries": 100})
+    assert sharded_config.shards == constants.SHARDED_MEMORY_CACHE_SHARDS
+    assert sharded_config.capacity_per_shard is False
+
+    # global limits are divided between shards
+    sharded_config = ShardedInMemoryCacheConfig(
+        {"max_entries": 10, "max_bytes": 1000, "shards": 4}
+    )
+    shard_config = sharded_config.shard_config()
+    assert shard_config.max_entries == 3
+    assert shard_config.max_bytes == 250
+
+    # per shard limits are used as they are
+    sharded_config = ShardedInMemoryCacheConfig(
+        {"max_entries": 10, "shards": 4, "capacity_per_shard": True}
+    )
+    shard_config = sharded_config.shard_config()
+    assert shard_config.max_entries == 10
+    assert shard_config.max_bytes is None
+
+    for shards in (0, -1, "foo"):
+        with pytest.raises(
+            InvalidConfigurationError,
+            match="invalid shards for sharded memory conversation cache",
+        ):
+            ShardedInMemoryCacheConfig({"shards": shards})
+
+    # limits of memory cache are validated too
+    with pytest.raises(
+        InvalidConfigurationError,
+        match="invalid max_entries for memory conversation cache",
+    ):
+        ShardedInMemoryCacheConfig({"max_entries": -100})
+
+
+def test_sharded_memory_cache_config_equality():
+    """Test the ShardedInMemoryCacheConfig equality check."""
+    sharded_config_1 = ShardedInMemoryCacheConfig({"max_entries": 100})
+    sharded_config_2 = ShardedInMemoryCacheConfig({"max_entries": 100})
+    assert sharded_config_1 == sharded_config_2
+
+    sharded_config_2.shards = 2
+    assert sharded_config_1 != sharded_config_2
+
+    sharded_config_2 = ShardedInMemoryCacheConfig({"max_entries": 100})
+    sharded_config_2.capacity_per_shard = True
+    assert sharded_config_1 != sharded_config_2
+
+    sharded_config_2 = ShardedInMemoryCacheConfig({"max_entries": 10})
+    assert sharded_config_1 != sharded_config_2
+
+    # memory config with the same limits is not the same
+    assert sharded_config_1 != InMemoryCacheConfig({"max_entries": 100})
+
+
+def test_tiered_cache_config():
+    """Test the TieredCacheConfig model."""
+    tiered_config = TieredCacheConfig(
+        {
+            "memory": {"max_entries": 10},
+            "postgres": {"host": "1.2.3.4", "max_connections": 4},
+            "invalidation": True,
+        }
+    )
+    assert tiered_config.memory.max_entries == 10
+    assert tiered_config.postgres.host == "1.2.3.4"
+    assert tiered_config.postgres.max_connections == 4
+    assert tiered_config.invalidation is True
+    tiered_config.validate_yaml()
+
+    # memory cache defaults are used when not configured
+    tiered_config = TieredCacheConfig({"postgres": {}})
+    assert tiered_config.memory == InMemoryCacheConfig({})
+    assert tiered_config.postgres == PostgresConfig()
+    assert tiered_config.invalidation is False
+
+    with pytest.raises(
+        InvalidConfigurationError,
+        match="tiered conversation cache requires Postgres configuration",
+    ):
+        TieredCacheConfig({"memory": {}})
+
+    with pytest.raises(
+        InvalidConfigurationError,
+        match="invalid max_entries for memory conversation cache",
+    ):
+        TieredCacheConfig({"memory": {"max_entries": -1}, "postgres": {}})
+
+
+def test_tiered_cache_config_equality():
+    """Test the TieredCacheConfig equality check."""
+    tiered_config_1 = TieredCacheConfig({"postgres": {}})
+    tiered_config_2 = TieredCacheConfig({"postgres": {}})
+    assert tiered_config_1 == tiered_config_2
+
+    tiered_config_2.invalidation = True
+    assert tiered_config_1 != tiered_config_2
+
+    tiered_config_2 = TieredCacheConfig({"postgres": {"host": "foo"}})
+    assert tiered_config_1 != tiered_config_2
+
+    tiered_config_2 = TieredCacheConfig({"postgres": {}, "memory": {"max_bytes": 1}})
+    assert tiered_config_1 != tiered_config_2
+
+    assert tiered_config_1 != "foo"
+
+
 def test_conversation_cache_config():
     """Test the ConversationCacheConfig model."""
     conversation_cache_config = ConversationCacheConfig(
@@ -2159,6 +2348,21 @@ def test_conversation_cache_config():
     assert conversation_cache_config.type == "memory"
     assert conversation_cache_config.memory.max_entries == 100
 
+    conversation_cache_config = ConversationCacheConfig(
+        {
+            "type": "sharded_memory",
+            "sharded_memory": {
+                "max_entries": 100,
+                "shards": 8,
+            },
+        }
+    )
+    assert conversation_cache_config.type == "sharded_memory"
+    assert conversation_cache_config.sharded_memory.max_entries == 100
+    assert conversation_cache_config.sharded_memory.shards == 8
+    assert conversation_cache_config.memory is None
+    conversation_cache_config.validate_yaml()
+
     conversation_cache_config = ConversationCacheConfig(
         {
             "type": "postgres",
@@ -2189,6 +2393,26 @@ def test_conversation_cache_config():
     ):
         ConversationCacheConfig({"type": "memory"})
 
+    with pytest.raises(
+        InvalidConfigurationError,
+        match="sharded memory conversation cache type is specified, but sharded memory configuration is missing",  # noqa: E501
+    ):
+        ConversationCacheConfig({"type": "sharded_memory"})
+
+    conversation_cache_config = ConversationCacheConfig(
+        {"type": "tiered", "tiered": {"postgres": {"host": "1.2.3.4"}}}
+    )
+    assert conversation_cache_config.type == "tiered"
+    assert conversation_cache_config.tiered.postgres.host == "1.2.3.4"
+    assert conversation_cache_config.postgres is None
+    conversation_cache_config.validate_yaml()
+
+    with pytest.raises(
+        InvalidConfigurationError,
+        match="tiered conversation cache type is specified, but tiered configuration is missing",
+    ):
+        ConversationCacheConfig({"type": "tiered"})
+
     with pytest.raises(
         InvalidConfigurationError,
         match="Postgres conversation cache type is specified, but Postgres configuration is missing",  # noqa: E501
@@ -3518,6 +3742,39 @@ def test_authentication_config_k8s_cluster_api():
         )
 
 
+def test_authentication_config_k8s_auth_cache():
+    """Test method to validate auth. decision cache settings."""
+    cfg = AuthenticationConfig()
+    assert cfg.k8s_auth_cache_max_entries == constants.K8S_AUTH_CACHE_MAX_ENTRIES
+    assert cfg.k8s_auth_cache_ttl == constants.K8S_AUTH_CACHE_TTL
+    assert cfg.k8s_auth_cache_negative_ttl == constants.K8S_AUTH_CACHE_NEGATIVE_TTL
+
+    # zero values are allowed, they disable the cache
+    AuthenticationConfig(
+        k8s_auth_cache_max_entries=0,
+        k8s_auth_cache_ttl=0,
+        k8s_auth_cache_negative_ttl=0,
+    )
+
+    with pytest.raises(
+        ValidationError, match="Input should be greater than or equal to 0"
+    ):
+        AuthenticationConfig(k8s_auth_cache_ttl=-1)
+
+
+def test_authentication_config_k8s_connection_pool_size():
+    """Test method to validate K8S API connection pool size."""
+    cfg = AuthenticationConfig()
+    assert cfg.k8s_connection_pool_size == constants.K8S_CONNECTION_POOL_SIZE
+
+    cfg = AuthenticationConfig(k8s_connection_pool_size=42)
+    assert cfg.k8s_connection_pool_size == 42
+
+    for pool_size in (0, -1):
+        with pytest.raises(ValidationError, match="Input should be greater than 0"):
+            AuthenticationConfig(k8s_connection_pool_size=pool_size)
+
+
 def test_authentication_config_validation_k8s_ca_cert_path():
     """Test method to validate authentication config when cert path is empty."""
     # k8s_ca_cert_path is optional
@@ -3599,6 +3856,34 @@ def test_user_data_config__transcripts(tmpdir):
     assert user_data.transcripts_storage is None
 
 
+def test_user_data_config__transcript_segments(tmpdir):
+    """Tests the UserDataCollection model, transcript segments part."""
+    user_data = UserDataCollection(
+        transcripts_disabled=False,
+        transcripts_storage=tmpdir.strpath,
+        transcripts_segments={"max_bytes": 1024, "compression": "zstd"},
+    )
+    assert user_data.transcripts_segments.max_bytes == 1024
+    assert user_data.transcripts_segments.compression == "zstd"
+    assert (
+        user_data.transcripts_segments.max_age == constants.TRANSCRIPTS_SEGMENT_MAX_AGE
+    )
+
+    # transcripts are stored one per file by default
+    assert UserDataCollection().transcripts_segments is None
+
+    with pytest.raises(ValidationError):
+        TranscriptSegmentsConfig(compression="lz4")
+    with pytest.raises(ValidationError):
+        TranscriptSegmentsConfig(max_bytes=0)
+
+    with (
+        mock.patch("ols.app.models.config.importlib.util.find_spec", return_value=None),
+        pytest.raises(ValidationError, match="requires 'zstandard' package"),
+    ):
+        TranscriptSegmentsConfig(compression="zstd")
+
+
 def test_dev_config_defaults():
     """Test the DevConfig model with default values."""
     dev_config = DevConfig()
@@ -3864,6 +4149,36 @@ def test_ols_config_with_quota_handlers_section():
     assert ols_config.quota_handlers.limiters is not None
 
 
+def test_ols_config_with_token_coalescing():
+    """Test OLSConfig model with token coalescing section specified."""
+    ols_config = OLSConfig(
+        {
+            "default_provider": "test_default_provider",
+            "default_model": "test_default_model",
+            "token_coalescing": {"max_tokens": 8, "max_delay_ms": 0},
+        }
+    )
+    assert ols_config.token_coalescing.max_tokens == 8
+    assert ols_config.token_coalescing.max_delay_ms == 0
+    assert (
+        ols_config.token_coalescing.max_bytes == constants.STREAMING_COALESCE_MAX_BYTES
+    )
+
+    # defaults are used when the section is not specified
+    ols_config = OLSConfig({})
+    assert ols_config.token_coalescing == TokenCoalescingConfig()
+
+
+def test_token_coalescing_config_invalid_values():
+    """Test TokenCoalescingConfig model with invalid values."""
+    with pytest.raises(ValidationError):
+        TokenCoalescingConfig(max_tokens=0)
+    with pytest.raises(ValidationError):
+        TokenCoalescingConfig(max_delay_ms=-1)
+    with pytest.raises(ValidationError):
+        TokenCoalescingConfig(unknown_option=1)
+
+
 def test_ols_config_with_quota_handlers_section_without_storage():
     """Test OLSConfig model with quota handlers section specified but w/o storage part."""
     with pytest.raises(
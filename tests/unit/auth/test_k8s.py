@@ -1,6 +1,7 @@
 """Unit tests for auth/k8s module."""
 
 import os
+import threading
 from typing import Optional
 from unittest.mock import MagicMock, patch
 
@@ -8,13 +9,17 @@ import pytest
 from fastapi import HTTPException, Request
 from kubernetes.client import AuthenticationV1Api, AuthorizationV1Api
 from kubernetes.client.rest import ApiException
+from prometheus_client import REGISTRY
 
 from ols import config
 from ols.src.auth.k8s import (
     CLUSTER_ID_LOCAL,
+    AuthDecision,
+    AuthDecisionCache,
     AuthDependency,
     ClusterIDUnavailableError,
     K8sClientSingleton,
+    decision_cache,
 )
 from tests.mock_classes.mock_k8s_api import (
     MockK8sResponseStatus,
@@ -31,6 +36,7 @@ def _setup():
     global auth_dependency
     config.reload_from_yaml_file("tests/config/auth_config.yaml")
     auth_dependency = AuthDependency(virtual_path="/ols-access")
+    decision_cache.clear()
 
 
 @pytest.mark.usefixtures("_setup")
@@ -146,6 +152,286 @@ async def test_cluster_id_is_used_for_kube_admin():
         assert token == "valid-token"  # noqa: S105
 
 
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_uses_decision_cache():
+    """Test that repeated requests with the same token skip the API round-trips."""
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api") as mock_authz_api,
+    ):
+        mock_authn_api.return_value.create_token_review.side_effect = (
+            mock_token_review_response
+        )
+        mock_authz_api.return_value.create_subject_access_review.side_effect = (
+            mock_subject_access_review_response
+        )
+
+        hits_before = {
+            decision: REGISTRY.get_sample_value(
+                "ols_auth_cache_hits_total", {"decision": decision}
+            )
+            or 0
+            for decision in ("allowed", "denied")
+        }
+        misses_before = REGISTRY.get_sample_value("ols_auth_cache_misses_total")
+
+        for token in (b"valid-token", b"invalid-token"):
+            request = Request(
+                scope={
+                    "type": "http",
+                    "headers": [(b"authorization", b"Bearer " + token)],
+                }
+            )
+            for _ in range(3):
+                try:
+                    await auth_dependency(request)
+                except HTTPException as e:
+                    assert e.status_code == 403
+
+        # one TokenReview per token, one SubjectAccessReview for valid token
+        assert mock_authn_api.return_value.create_token_review.call_count == 2
+        assert mock_authz_api.return_value.create_subject_access_review.call_count == 1
+
+        # the first request for each token is a miss, the other two are hits
+        assert (
+            REGISTRY.get_sample_value("ols_auth_cache_misses_total")
+            == misses_before + 2
+        )
+        for decision in ("allowed", "denied"):
+            assert (
+                REGISTRY.get_sample_value(
+                    "ols_auth_cache_hits_total", {"decision": decision}
+                )
+                == hits_before[decision] + 2
+            )
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_decision_cache_is_shared():
+    """Test that the decision cache is shared by all auth. dependencies."""
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api") as mock_authz_api,
+    ):
+        mock_authn_api.return_value.create_token_review.side_effect = (
+            mock_token_review_response
+        )
+        mock_authz_api.return_value.create_subject_access_review.side_effect = (
+            mock_subject_access_review_response
+        )
+        request = Request(
+            scope={
+                "type": "http",
+                "headers": [(b"authorization", b"Bearer valid-token")],
+            }
+        )
+        await AuthDependency(virtual_path="/ols-access")(request)
+        await AuthDependency(virtual_path="/ols-access")(request)
+        await AuthDependency(virtual_path="/ols-metrics-access")(request)
+
+        # the virtual path is part of the key
+        assert mock_authn_api.return_value.create_token_review.call_count == 2
+        assert len(decision_cache) == 2
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_token_review_failure_is_not_cached():
+    """Test that a failed TokenReview call is retried on the next request."""
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api") as mock_authz_api,
+    ):
+        mock_authn_api.return_value.create_token_review.side_effect = ApiException(
+            status=503
+        )
+        mock_authz_api.return_value.create_subject_access_review.side_effect = (
+            mock_subject_access_review_response
+        )
+        request = Request(
+            scope={
+                "type": "http",
+                "headers": [(b"authorization", b"Bearer valid-token")],
+            }
+        )
+        with pytest.raises(HTTPException) as exc_info:
+            await auth_dependency(request)
+        assert exc_info.value.status_code == 403
+        assert len(decision_cache) == 0
+
+        # API server is back, the review must be performed again
+        mock_authn_api.return_value.create_token_review.side_effect = (
+            mock_token_review_response
+        )
+        user_uid, _, _, _ = await auth_dependency(request)
+
+        assert user_uid == "valid-uid"
+        assert mock_authn_api.return_value.create_token_review.call_count == 2
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_decision_cache_disabled():
+    """Test that the decision cache can be disabled in configuration."""
+    config.ols_config.authentication_config.k8s_auth_cache_max_entries = 0
+    dependency = AuthDependency(virtual_path="/ols-access")
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api") as mock_authz_api,
+    ):
+        mock_authn_api.return_value.create_token_review.side_effect = (
+            mock_token_review_response
+        )
+        mock_authz_api.return_value.create_subject_access_review.side_effect = (
+            mock_subject_access_review_response
+        )
+        request = Request(
+            scope={
+                "type": "http",
+                "headers": [(b"authorization", b"Bearer valid-token")],
+            }
+        )
+        await dependency(request)
+        await dependency(request)
+
+        assert mock_authn_api.return_value.create_token_review.call_count == 2
+        assert len(decision_cache) == 0
+
+
+@pytest.mark.usefixtures("_setup")
+@pytest.mark.asyncio
+async def test_auth_dependency_reviews_outside_of_event_loop():
+    """Test that blocking Kubernetes API calls are not made from the event loop thread."""
+    loop_thread = threading.get_ident()
+    review_threads = []
+
+    def token_review(token_review):
+        review_threads.append(threading.get_ident())
+        return mock_token_review_response(token_review)
+
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authn_api") as mock_authn_api,
+        patch("ols.src.auth.k8s.K8sClientSingleton.get_authz_api") as mock_authz_api,
+    ):
+        mock_authn_api.return_value.create_token_review.side_effect = token_review
+        mock_authz_api.return_value.create_subject_access_review.side_effect = (
+            mock_subject_access_review_response
+        )
+        request = Request(
+            scope={
+                "type": "http",
+                "headers": [(b"authorization", b"Bearer valid-token")],
+            }
+        )
+        user_uid, _, _, _ = await auth_dependency(request)
+
+    assert user_uid == "valid-uid"
+    assert len(review_threads) == 1
+    assert review_threads[0] != loop_thread
+
+
+@pytest.mark.usefixtures("_setup")
+def test_executor_is_bounded_by_connection_pool_size():
+    """Test that the executor size is taken from configuration."""
+    config.ols_config.authentication_config.k8s_connection_pool_size = 3
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton._executor", None),
+        patch("ols.src.auth.k8s.ThreadPoolExecutor") as mock_executor,
+    ):
+        executor = K8sClientSingleton.get_executor()
+        assert K8sClientSingleton.get_executor() is executor
+        mock_executor.assert_called_once_with(
+            max_workers=3, thread_name_prefix="k8s-auth"
+        )
+
+
+@pytest.mark.usefixtures("_setup")
+def test_connection_pool_size_is_set_in_client_configuration():
+    """Test that the K8S API client connection pool size is taken from configuration."""
+    config.ols_config.authentication_config.k8s_connection_pool_size = 7
+    with (
+        patch.dict(os.environ, {"KUBECONFIG": "tests/config/kubeconfig"}),
+        patch("ols.src.auth.k8s.K8sClientSingleton._instance", None),
+        patch("ols.src.auth.k8s.K8sClientSingleton._api_client", None),
+        patch("ols.src.auth.k8s.K8sClientSingleton._authn_api", None, create=True),
+        patch("ols.src.auth.k8s.K8sClientSingleton._authz_api", None, create=True),
+        patch(
+            "ols.src.auth.k8s.K8sClientSingleton._custom_objects_api",
+            None,
+            create=True,
+        ),
+    ):
+        K8sClientSingleton()
+        configuration = K8sClientSingleton._api_client.configuration
+        assert configuration.connection_pool_maxsize == 7
+
+
+def test_failed_initialization_is_retried():
+    """Test that the singleton is not published when client initialization fails."""
+    with (
+        patch("ols.src.auth.k8s.K8sClientSingleton._instance", None),
+        patch(
+            "ols.src.auth.k8s.kubernetes.client.ApiClient",
+            side_effect=Exception("boom"),
+        ),
+        patch("ols.src.auth.k8s.kubernetes.config.load_incluster_config"),
+    ):
+        with pytest.raises(Exception, match="boom"):
+            K8sClientSingleton()
+        assert K8sClientSingleton._instance is None
+
+
+def test_auth_decision_cache_expiration():
+    """Test that allowed and denied decisions expire after their own TTL."""
+    cache = AuthDecisionCache(max_entries=10, ttl=30, negative_ttl=5)
+    allowed_key = cache.construct_key("token1", "/ols-access")
+    denied_key = cache.construct_key("token2", "/ols-access")
+    allowed = AuthDecision("uid", "user")
+    denied = AuthDecision(detail="Forbidden: User does not have access")
+
+    with patch("ols.src.auth.k8s.time.monotonic", return_value=100):
+        cache.put(allowed_key, allowed)
+        cache.put(denied_key, denied)
+
+    with patch("ols.src.auth.k8s.time.monotonic", return_value=104):
+        assert cache.get(allowed_key) == allowed
+        assert cache.get(denied_key) == denied
+
+    with patch("ols.src.auth.k8s.time.monotonic", return_value=106):
+        assert cache.get(allowed_key) == allowed
+        assert cache.get(denied_key) is None
+
+    with patch("ols.src.auth.k8s.time.monotonic", return_value=131):
+        assert cache.get(allowed_key) is None
+
+
+def test_auth_decision_cache_eviction():
+    """Test that the least recently used decision is evicted first."""
+    cache = AuthDecisionCache(max_entries=2, ttl=30, negative_ttl=5)
+    keys = [cache.construct_key(f"token{i}", "/ols-access") for i in range(3)]
+
+    cache.put(keys[0], AuthDecision("uid0", "user0"))
+    cache.put(keys[1], AuthDecision("uid1", "user1"))
+    # touch the first key so the second one becomes the oldest
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[2], AuthDecision("uid2", "user2"))
+
+    assert len(cache) == 2
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is not None
+
+
+def test_auth_decision_cache_key_does_not_contain_token():
+    """Test that the token itself is not part of the cache key."""
+    key = AuthDecisionCache.construct_key("secret-token", "/ols-access")
+    assert "secret-token" not in key[0]
+    assert key[1] == "/ols-access"
+    assert key != AuthDecisionCache.construct_key("secret-token", "/ols-metrics-access")
+
+
 @pytest.mark.usefixtures("_setup")
 def test_auth_dependency_config():
     """Test the auth dependency can load kubeconfig file."""
@@ -0,0 +1,72 @@
+"""Unit tests for Cache abstract class."""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ols import constants
+from ols.app.models.models import CacheEntry
+from ols.src.cache.cache import Cache
+from ols.utils import suid
+
+
+class ListCache(Cache):
+    """Cache implementing just the abstract methods."""
+
+    def __init__(self, entries):
+        """Initialize cache with one conversation."""
+        self.entries = entries
+
+    def get(self, user_id, conversation_id, skip_user_id_check=False):
+        """Get the whole conversation."""
+        return self.entries
+
+    def insert_or_append(
+        self, user_id, conversation_id, cache_entry, skip_user_id_check=False
+    ):
+        """Not used."""
+
+    def delete(self, user_id, conversation_id, skip_user_id_check=False):
+        """Not used."""
+
+    def list(self, user_id, skip_user_id_check=False):
+        """Not used."""
+
+    def ready(self):
+        """Not used."""
+
+
+@pytest.mark.parametrize(
+    ("tokens_counts", "max_entries", "max_tokens", "expected"),
+    [
+        ([], None, None, 0),
+        ([5, 5, 5], None, None, 3),
+        ([5, 5, 5], 2, None, 2),
+        ([5, 5, 5], None, 10, 3),
+        ([5, 5, 5], None, 9, 2),
+        ([5, 5, 5], None, 0, 1),
+        ([5, 5, 5], 1, 100, 1),
+        ([0, 0, 0], None, 0, 3),
+    ],
+)
+def test_tail_length(tokens_counts, max_entries, max_tokens, expected):
+    """Test the number of entries in conversation tail."""
+    assert Cache.tail_length(tokens_counts, max_entries, max_tokens) == expected
+
+
+def test_get_tail_default_implementation():
+    """Test that tail is selected from the whole conversation by default."""
+    entries = [
+        CacheEntry(query=HumanMessage(f"query{i}"), response=AIMessage(f"ai{i}"))
+        for i in range(3)
+    ]
+    for entry in entries:
+        entry.response.response_metadata[constants.HISTORY_MESSAGE_TOKENS_COUNT_KEY] = 7
+    cache = ListCache(entries)
+    user_id, conversation_id = suid.get_suid(), suid.get_suid()
+
+    assert cache.get_tail(user_id, conversation_id) == entries
+    assert cache.get_tail(user_id, conversation_id, max_entries=1) == entries[2:]
+    assert cache.get_tail(user_id, conversation_id, max_tokens=7) == entries[1:]
+
+    cache.entries = None
+    assert cache.get_tail(user_id, conversation_id) == []
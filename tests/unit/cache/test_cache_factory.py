@@ -10,6 +10,8 @@ from ols.src.cache.cache_factory import (
     CacheFactory,
     InMemoryCache,
     PostgresCache,
+    ShardedInMemoryCache,
+    TieredCache,
 )
 
 
@@ -24,6 +26,17 @@ def in_memory_cache_config():
     )
 
 
+@pytest.fixture(scope="module")
+def sharded_in_memory_cache_config():
+    """Fixture containing initialized instance of ConversationCacheConfig."""
+    return ConversationCacheConfig(
+        {
+            "type": constants.CACHE_TYPE_SHARDED_MEMORY,
+            constants.CACHE_TYPE_SHARDED_MEMORY: {"max_entries": 10, "shards": 2},
+        }
+    )
+
+
 @pytest.fixture(scope="module")
 def postgres_cache_config():
     """Fixture containing initialized instance of ConversationCacheConfig."""
@@ -51,6 +64,13 @@ def test_conversation_cache_in_memory(in_memory_cache_config):
     assert isinstance(cache, InMemoryCache)
 
 
+def test_conversation_cache_sharded_in_memory(sharded_in_memory_cache_config):
+    """Check if ShardedInMemoryCache is returned by factory with proper configuration."""
+    cache = CacheFactory.conversation_cache(sharded_in_memory_cache_config)
+    assert isinstance(cache, ShardedInMemoryCache)
+    assert len(cache.shards) == 2
+
+
 def test_conversation_cache_in_postgres(postgres_cache_config):
     """Check if PostgresCache is returned by factory with proper configuration."""
     # do not use real PostgreSQL instance
@@ -62,6 +82,23 @@ def test_conversation_cache_in_postgres(postgres_cache_config):
     assert isinstance(cache, PostgresCache), type(cache)
 
 
+def test_conversation_cache_tiered():
+    """Check if TieredCache is returned by factory with proper configuration."""
+    config = ConversationCacheConfig(
+        {
+            "type": constants.CACHE_TYPE_TIERED,
+            constants.CACHE_TYPE_TIERED: {"postgres": {"host": "localhost"}},
+        }
+    )
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect"):
+        cache = CacheFactory.conversation_cache(config)
+
+    assert isinstance(cache, TieredCache)
+    assert isinstance(cache.postgres, PostgresCache)
+    assert cache.postgres.notify_channel is None
+
+
 def test_conversation_cache_wrong_cache(invalid_cache_type_config):
     """Check if wrong cache configuration is detected properly."""
     with pytest.raises(ValueError, match="Invalid cache type"):
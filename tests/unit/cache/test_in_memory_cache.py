@@ -1,12 +1,18 @@
 """Unit tests for InMemoryCache class."""
 
+import gc
+import threading
+from unittest.mock import patch
+
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage
+from prometheus_client import REGISTRY
 
 from ols import constants
 from ols.app.models.config import InMemoryCacheConfig
-from ols.app.models.models import CacheEntry
-from ols.src.cache.in_memory_cache import InMemoryCache
+from ols.app.models.models import Attachment, CacheEntry
+from ols.src.cache import in_memory_cache
+from ols.src.cache.in_memory_cache import CachedEntry, InMemoryCache
 from ols.utils import suid
 
 conversation_id = suid.get_suid()
@@ -19,6 +25,12 @@ cache_entry_2 = CacheEntry(
 )
 
 
+def get_gauge(name):
+    """Read current value of the gauge."""
+    gc.collect()  # caches no longer used are not counted
+    return REGISTRY.get_sample_value(name)
+
+
 @pytest.fixture
 def cache():
     """Fixture with constucted and initialized in memory cache object."""
@@ -96,6 +108,112 @@ def test_insert_or_append_overflow(cache):
     )
 
 
+def test_get_refreshes_conversation(cache):
+    """Test that the least recently used conversation is evicted."""
+    conversation_ids = [suid.get_suid() for _ in range(3)]
+    cache.capacity = 2
+    cache.insert_or_append(
+        constants.DEFAULT_USER_UID, conversation_ids[0], cache_entry_1
+    )
+    cache.insert_or_append(
+        constants.DEFAULT_USER_UID, conversation_ids[1], cache_entry_1
+    )
+
+    # first conversation becomes the most recently used one
+    cache.get(constants.DEFAULT_USER_UID, conversation_ids[0])
+    cache.insert_or_append(
+        constants.DEFAULT_USER_UID, conversation_ids[2], cache_entry_1
+    )
+
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_ids[1]) is None
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_ids[0]) is not None
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_ids[2]) is not None
+
+
+def test_insert_or_append_over_max_bytes(cache):
+    """Test that conversations are evicted when their size exceeds max_bytes."""
+    entry_size = CachedEntry.from_cache_entry(cache_entry_1).size
+    conversation_ids = [suid.get_suid() for _ in range(3)]
+    cache.max_bytes = 2 * entry_size
+    for cid in conversation_ids:
+        cache.insert_or_append(constants.DEFAULT_USER_UID, cid, cache_entry_1)
+
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_ids[0]) is None
+    assert cache.size == 2 * entry_size
+    assert len(cache.cache) == 2
+
+
+def test_conversation_over_max_bytes_truncated(cache):
+    """Test that conversation too big on its own loses its oldest entries."""
+    entry_size = CachedEntry.from_cache_entry(cache_entry_1).size
+    cache.max_bytes = 2 * entry_size
+    for _ in range(3):
+        cache.insert_or_append(
+            constants.DEFAULT_USER_UID, conversation_id, cache_entry_1
+        )
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, cache_entry_2)
+
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_id) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+    assert cache.size <= cache.max_bytes
+
+
+def test_delete_updates_size(cache):
+    """Test that size of deleted conversation is not accounted."""
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, cache_entry_1)
+    assert cache.size > 0
+
+    cache.delete(constants.DEFAULT_USER_UID, conversation_id)
+    assert cache.size == 0
+
+
+def test_metrics(cache):
+    """Test that hits, misses, evictions and size are exposed as metrics."""
+    hits = in_memory_cache.cache_hits_total._value.get()
+    misses = in_memory_cache.cache_misses_total._value.get()
+    evictions = in_memory_cache.cache_evictions_total._value.get()
+    # gauges sum up all caches alive, only change caused by this cache is checked
+    conversations = get_gauge("ols_conversation_cache_conversations") - len(cache.cache)
+    size = get_gauge("ols_conversation_cache_size_bytes") - cache.size
+    cache.capacity = 1
+
+    cache.get(constants.DEFAULT_USER_UID, conversation_id)
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, cache_entry_1)
+    cache.get_tail(constants.DEFAULT_USER_UID, conversation_id)
+    cache.insert_or_append(constants.DEFAULT_USER_UID, suid.get_suid(), cache_entry_1)
+
+    assert in_memory_cache.cache_hits_total._value.get() == hits + 1
+    assert in_memory_cache.cache_misses_total._value.get() == misses + 1
+    assert in_memory_cache.cache_evictions_total._value.get() == evictions + 1
+    assert get_gauge("ols_conversation_cache_conversations") == conversations + 1
+    assert get_gauge("ols_conversation_cache_size_bytes") == size + cache.size
+
+
+def test_concurrent_access(cache):
+    """Test that cache state stays consistent when used by more threads."""
+    cache.capacity = 10
+    conversation_ids = [suid.get_suid() for _ in range(20)]
+
+    def worker(offset):
+        for i in range(200):
+            cid = conversation_ids[(offset + i) % len(conversation_ids)]
+            cache.insert_or_append(constants.DEFAULT_USER_UID, cid, cache_entry_1)
+            cache.get(constants.DEFAULT_USER_UID, cid)
+            if i % 7 == 0:
+                cache.delete(constants.DEFAULT_USER_UID, cid)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(cache.cache) <= 10
+    assert cache.size == sum(c.size for c in cache.cache.values())
+
+
 def test_get_nonexistent_user(cache):
     """Test how non-existent items are handled by the cache."""
     # this UUID is different from DEFAULT_USER_UID
@@ -247,3 +365,85 @@ def test_singleton_pattern():
     cache1 = InMemoryCache(mc)
     cache2 = InMemoryCache(mc)
     assert cache1 is cache2
+
+
+def make_entry(number, tokens_count):
+    """Create cache entry with stored tokens count."""
+    entry = CacheEntry(
+        query=HumanMessage(f"user message{number}"),
+        response=AIMessage(f"ai message{number}"),
+    )
+    entry.query.response_metadata[constants.HISTORY_MESSAGE_TOKENS_COUNT_KEY] = (
+        tokens_count
+    )
+    return entry
+
+
+def test_get_tail(cache):
+    """Test that only the most recent entries are returned."""
+    entries = [make_entry(number, 10) for number in range(5)]
+    for entry in entries:
+        cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, entry)
+
+    get_tail = cache.get_tail
+    uid = constants.DEFAULT_USER_UID
+    assert get_tail(uid, conversation_id) == entries
+    assert get_tail(uid, conversation_id, max_entries=2) == entries[3:]
+    assert get_tail(uid, conversation_id, max_entries=0) == []
+    # entry exceeding the tokens limit is included
+    assert get_tail(uid, conversation_id, max_tokens=20) == entries[2:]
+    assert get_tail(uid, conversation_id, max_tokens=19) == entries[3:]
+    assert get_tail(uid, conversation_id, max_entries=1, max_tokens=100) == [entries[4]]
+
+
+def test_get_tail_nonexistent_conversation(cache):
+    """Test get_tail for conversation not stored in cache."""
+    assert cache.get_tail(constants.DEFAULT_USER_UID, suid.get_suid()) == []
+
+
+def test_get_tail_improper_user_id(cache):
+    """Test get_tail with improper user ID."""
+    with pytest.raises(ValueError, match="Invalid user ID"):
+        cache.get_tail("foo", conversation_id, max_entries=1)
+
+
+def test_stored_entries_not_affected_by_mutation(cache):
+    """Test that neither stored nor returned entries share mutable state."""
+    entry = CacheEntry(
+        query=HumanMessage(" query "),
+        response=AIMessage(" response "),
+        attachments=[
+            Attachment(attachment_type="log", content_type="text/plain", content="log")
+        ],
+    )
+    entry.response.response_metadata["model"] = "model"
+    expected = entry.model_copy(deep=True)
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, entry)
+
+    # the original entry is changed after it has been stored
+    entry.response.response_metadata["model"] = "other"
+    # history conversion modifies the messages
+    returned = cache.get(constants.DEFAULT_USER_UID, conversation_id)
+    CacheEntry.cache_entries_to_history(returned)
+    returned[0].response.response_metadata["model"] = "changed"
+    returned[0].attachments.clear()
+
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_id) == [expected]
+    assert cache.get_tail(constants.DEFAULT_USER_UID, conversation_id) == [expected]
+
+
+def test_entries_not_validated_on_read(cache):
+    """Test that entries are not validated again when read."""
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, cache_entry_1)
+
+    with (
+        patch.object(CacheEntry, "from_dict", side_effect=AssertionError("validated")),
+        patch.object(
+            CacheEntry, "model_validate", side_effect=AssertionError("validated")
+        ),
+    ):
+        entries = cache.get(constants.DEFAULT_USER_UID, conversation_id)
+
+    assert entries == [cache_entry_1]
+    assert isinstance(entries[0].query, HumanMessage)
+    assert isinstance(entries[0].response, AIMessage)
@@ -8,7 +8,8 @@ import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
 from ols.app.models.config import PostgresConfig
-from ols.app.models.models import CacheEntry, MessageDecoder, MessageEncoder
+from ols.app.models.models import CacheEntry, MessageEncoder
+from ols.constants import HISTORY_MESSAGE_TOKENS_COUNT_KEY
 from ols.src.cache.cache_error import CacheError
 from ols.src.cache.postgres_cache import PostgresCache
 from ols.utils import suid
@@ -42,14 +43,53 @@ def test_init_cache_failure_detection():
         mock_connect.return_value.close.assert_called_once_with()
 
 
+def test_init_cache_migrates_legacy_table():
+    """Test that conversations stored in the original table are migrated."""
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = ("cache",)
+
+        PostgresCache(PostgresConfig())
+
+    calls = [
+        call(PostgresCache.CREATE_CONVERSATIONS_TABLE),
+        call(PostgresCache.CREATE_CONVERSATION_ENTRIES_TABLE),
+        call(PostgresCache.CREATE_INDEX),
+        call(PostgresCache.LOCK_MIGRATION_STATEMENT),
+        call(PostgresCache.QUERY_LEGACY_CACHE_TABLE),
+        call(PostgresCache.MIGRATE_LEGACY_CONVERSATIONS_STATEMENT),
+        call(PostgresCache.MIGRATE_LEGACY_ENTRIES_STATEMENT),
+        call(PostgresCache.RETIRE_LEGACY_CACHE_TABLE),
+    ]
+    assert mock_cursor.execute.call_args_list == calls
+    mock_connect.return_value.commit.assert_called_once_with()
+
+
+def test_init_cache_without_legacy_table():
+    """Test that nothing is migrated when the original table does not exist."""
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        mock_cursor = mock_connect.return_value.cursor.return_value
+        mock_cursor.fetchone.return_value = (None,)
+
+        PostgresCache(PostgresConfig())
+
+    executed = [c.args[0] for c in mock_cursor.execute.call_args_list]
+    assert PostgresCache.QUERY_LEGACY_CACHE_TABLE in executed
+    assert PostgresCache.MIGRATE_LEGACY_CONVERSATIONS_STATEMENT not in executed
+    assert PostgresCache.RETIRE_LEGACY_CACHE_TABLE not in executed
+
+
 def test_get_operation_on_empty_cache():
     """Test the Cache.get operation on empty cache."""
     # mock the query result - empty cache
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = None
+    mock_cursor.fetchall.return_value = []
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
@@ -62,11 +102,9 @@ def test_get_operation_on_empty_cache():
     conversation = cache.get(user_id, conversation_id)
     assert conversation == []
 
-    # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. select conversation from DB
+    # one DB operation must be performed:
+    # 1. select conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
             (user_id, conversation_id),
@@ -75,17 +113,18 @@ def test_get_operation_on_empty_cache():
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
 
     # Verify the query execution
-    mock_cursor.fetchone.assert_called_once()
+    mock_cursor.fetchall.assert_called_once()
 
 
 def test_get_operation_invalid_value():
     """Test the Cache.get operation when invalid value is returned from cache."""
     # mock the query result
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = "Invalid value"
+    mock_cursor.fetchall.return_value = ["Invalid value"]
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
@@ -98,11 +137,9 @@ def test_get_operation_invalid_value():
         with pytest.raises(ValueError, match="Invalid value read from cache:"):
             cache.get(user_id, conversation_id)
 
-    # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. select conversation from DB
+    # one DB operation must be performed:
+    # 1. select conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
             (user_id, conversation_id),
@@ -111,7 +148,7 @@ def test_get_operation_invalid_value():
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
 
     # Verify the query execution
-    mock_cursor.fetchone.assert_called_once()
+    mock_cursor.fetchall.assert_called_once()
 
 
 def test_get_operation_valid_value():
@@ -120,15 +157,19 @@ def test_get_operation_valid_value():
         cache_entry_1,
         cache_entry_2,
     ]
-    conversation = json.dumps([ce.to_dict() for ce in history], cls=MessageEncoder)
-    as_memview = memoryview(bytearray(conversation, "utf-8"))
+    # one row per conversation turn
+    rows = [
+        (memoryview(json.dumps(ce.to_dict(), cls=MessageEncoder).encode("utf-8")),)
+        for ce in history
+    ]
 
     # mock the query result
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = (as_memview,)
+    mock_cursor.fetchall.return_value = rows
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
@@ -141,11 +182,9 @@ def test_get_operation_valid_value():
     # unjsond history should be returned
     assert cache.get(user_id, conversation_id) == history
 
-    # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. select conversation from DB
+    # one DB operation must be performed:
+    # 1. select conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
             (user_id, conversation_id),
@@ -154,17 +193,18 @@ def test_get_operation_valid_value():
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
 
     # Verify the query execution
-    mock_cursor.fetchone.assert_called_once()
+    mock_cursor.fetchall.assert_called_once()
 
 
 def test_get_operation_on_exception():
     """Test the Cache.get operation when exception is thrown."""
     # mock the query
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.side_effect = psycopg2.DatabaseError("PLSQL error")
+    mock_cursor.fetchall.side_effect = psycopg2.DatabaseError("PLSQL error")
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
@@ -178,14 +218,21 @@ def test_get_operation_on_exception():
         cache.get(user_id, conversation_id)
 
 
-def test_get_operation_on_disconnected_db():
-    """Test the Cache.get operation when DB is not connected."""
-    # mock the query
+def test_get_tail_operation():
+    """Test the Cache.get_tail operation."""
+    history = [cache_entry_1, cache_entry_2]
+    rows = [
+        (memoryview(json.dumps(ce.to_dict(), cls=MessageEncoder).encode("utf-8")),)
+        for ce in history
+    ]
+
+    # mock the query result
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = None
+    mock_cursor.fetchall.return_value = rows
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
@@ -193,33 +240,35 @@ def test_get_operation_on_disconnected_db():
         # initialize Postgres cache
         config = PostgresConfig()
         cache = PostgresCache(config)
-        # simulate DB disconnection
-        cache.connection = None
-        assert not cache.connected()
-        # DB operation should connect automatically
-        cache.get(user_id, conversation_id)
-        assert cache.connected()
 
-    calls = [
-        call(
-            PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id),
-        ),
-    ]
-    mock_cursor.execute.assert_has_calls(calls, any_order=False)
+    # the tail is selected by the database
+    assert cache.get_tail(user_id, conversation_id, max_tokens=100) == history
+    mock_cursor.execute.assert_called_once_with(
+        PostgresCache.SELECT_CONVERSATION_TAIL_STATEMENT,
+        {
+            "user_id": user_id,
+            "conversation_id": conversation_id,
+            "max_entries": None,
+            "max_tokens": 100,
+        },
+    )
+
+    mock_cursor.fetchall.return_value = []
+    assert cache.get_tail(user_id, conversation_id, max_entries=1) == []
 
 
 def test_insert_or_append_operation():
     """Test the Cache.insert_or_append operation for first item to be inserted."""
     history = cache_entry_1
-    conversation = json.dumps([history.to_dict()], cls=MessageEncoder)
+    value = json.dumps(history.to_dict(), cls=MessageEncoder)
 
-    # mock the query result
+    # mock the query result - first entry in new conversation
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = None
+    mock_cursor.fetchone.side_effect = [(1,), (1,)]
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
@@ -233,14 +282,12 @@ def test_insert_or_append_operation():
         cache.insert_or_append(user_id, conversation_id, history)
 
     # multiple DB operations must be performed:
+    # 1. append entry to the conversation
+    # 2. check cache capacity as new conversation has been created
     calls = [
         call(
-            PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id),
-        ),
-        call(
-            PostgresCache.INSERT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id, conversation.encode("utf-8")),
+            PostgresCache.APPEND_CONVERSATION_ENTRY_STATEMENT,
+            (user_id, conversation_id, value.encode("utf-8"), 0),
         ),
         call(PostgresCache.QUERY_CACHE_SIZE),
     ]
@@ -249,24 +296,21 @@ def test_insert_or_append_operation():
 
 def test_insert_or_append_operation_append_item():
     """Test the Cache.insert_or_append operation for more item to be inserted."""
-    stored_history = cache_entry_1
-
-    old_conversation = json.dumps([stored_history.to_dict()], cls=MessageEncoder)
-    as_memview = memoryview(bytearray(old_conversation, "utf-8"))
-
-    appended_history = cache_entry_2
-
-    # create json object in the exactly same format
-    whole_history = json.loads(old_conversation, cls=MessageDecoder)
-    whole_history.append(appended_history.to_dict())
-    new_conversation = json.dumps(whole_history, cls=MessageEncoder)
-
-    # mock the query result
+    appended_history = CacheEntry(
+        query=HumanMessage("user message"), response=AIMessage("ai message")
+    )
+    # tokens counts are stored along with the entry
+    appended_history.query.response_metadata[HISTORY_MESSAGE_TOKENS_COUNT_KEY] = 5
+    appended_history.response.response_metadata[HISTORY_MESSAGE_TOKENS_COUNT_KEY] = 10
+    value = json.dumps(appended_history.to_dict(), cls=MessageEncoder)
+
+    # mock the query result - second entry in the conversation
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = (as_memview,)
+    mock_cursor.fetchone.return_value = (2,)
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
@@ -279,54 +323,72 @@ def test_insert_or_append_operation_append_item():
         # to append new history to the old one
         cache.insert_or_append(user_id, conversation_id, appended_history)
 
-    # multiple DB operations must be performed:
-    calls = [
-        call(
-            PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id),
-        ),
-        call(
-            PostgresCache.UPDATE_CONVERSATION_HISTORY_STATEMENT,
-            (new_conversation.encode("utf-8"), user_id, conversation_id),
-        ),
-    ]
-    mock_cursor.execute.assert_has_calls(calls, any_order=False)
+    # only the new entry is stored, the stored history is not read
+    mock_cursor.execute.assert_called_once_with(
+        PostgresCache.APPEND_CONVERSATION_ENTRY_STATEMENT,
+        (user_id, conversation_id, value.encode("utf-8"), 15),
+    )
 
 
-def test_insert_or_append_operation_on_exception():
-    """Test the Cache.insert_or_append operation when exception is thrown."""
-    history = cache_entry_1
+def test_append_with_notification():
+    """Test that appended entry is announced when notifications are enabled."""
+    mock_cursor = MagicMock()
+    mock_cursor.fetchone.return_value = (2,)
 
-    # mock the query result
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
+            mock_cursor
+        )
+        cache = PostgresCache(PostgresConfig(), notify_channel="channel")
+
+        # sequence number of the entry is returned
+        assert cache.append(user_id, conversation_id, cache_entry_2) == 2
+
+    sql, (channel, payload) = mock_cursor.execute.call_args.args
+    assert sql == PostgresCache.NOTIFY_STATEMENT
+    assert channel == "channel"
+    assert json.loads(payload) == {
+        "sender": cache.instance_id,
+        "user_id": user_id,
+        "conversation_id": conversation_id,
+    }
+
+
+def test_delete_with_notification():
+    """Test that only deleted conversation is announced."""
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.side_effect = psycopg2.DatabaseError("PLSQL error")
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
+        cache = PostgresCache(PostgresConfig(), notify_channel="channel")
 
-        # initialize Postgres cache
-        config = PostgresConfig()
-        cache = PostgresCache(config)
+        mock_cursor.rowcount = 0
+        assert cache.delete(user_id, conversation_id) is False
+        assert mock_cursor.execute.call_count == 1
 
-        # error must be raised during cache operation
-        with pytest.raises(CacheError, match="PLSQL error"):
-            cache.insert_or_append(user_id, conversation_id, history)
+        mock_cursor.rowcount = 1
+        assert cache.delete(user_id, conversation_id) is True
 
+    assert mock_cursor.execute.call_args.args[0] == PostgresCache.NOTIFY_STATEMENT
 
-def test_insert_or_append_operation_on_disconnected_db():
-    """Test the Cache.insert_or_append operation when DB is not connected."""
+
+def test_insert_or_append_operation_on_exception():
+    """Test the Cache.insert_or_append operation when exception is thrown."""
     history = cache_entry_1
-    conversation = json.dumps([history.to_dict()], cls=MessageEncoder)
 
-    # mock the query
+    # mock the query result
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = None
+    mock_cursor.fetchone.side_effect = psycopg2.DatabaseError("PLSQL error")
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
@@ -334,27 +396,10 @@ def test_insert_or_append_operation_on_disconnected_db():
         # initialize Postgres cache
         config = PostgresConfig()
         cache = PostgresCache(config)
-        # simulate DB disconnection
-        cache.connection = None
-        assert not cache.connected()
-        # DB operation should connect automatically
-        cache.insert_or_append(user_id, conversation_id, cache_entry_1)
-        assert cache.connected()
 
-    # multiple DB operations must be performed:
-    calls = [
-        call(
-            PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id),
-        ),
-        call(
-            PostgresCache.INSERT_CONVERSATION_HISTORY_STATEMENT,
-            (user_id, conversation_id, conversation.encode("utf-8")),
-        ),
-        call(PostgresCache.QUERY_CACHE_SIZE),
-        call("SELECT 1"),
-    ]
-    mock_cursor.execute.assert_has_calls(calls, any_order=False)
+        # error must be raised during cache operation
+        with pytest.raises(CacheError, match="PLSQL error"):
+            cache.insert_or_append(user_id, conversation_id, history)
 
 
 def test_list_operation():
@@ -372,6 +417,7 @@ def test_list_operation():
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
@@ -391,11 +437,9 @@ def test_list_operation():
     ]
     assert result == expected_result
 
-    # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. list conversations from DB
+    # one DB operation must be performed:
+    # 1. list conversations from DB
     calls = [
-        call("SELECT 1"),
         call(PostgresCache.LIST_CONVERSATIONS_STATEMENT, (user_id,)),
     ]
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
@@ -412,6 +456,7 @@ def test_list_operation_on_exception():
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
@@ -425,44 +470,15 @@ def test_list_operation_on_exception():
             cache.list(user_id)
 
 
-def test_list_operation_on_disconnected_db():
-    """Test the Cache.list operation when DB is not connected."""
-    # mock the query
-    mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = None
-
-    # do not use real PostgreSQL instance
-    with patch("psycopg2.connect") as mock_connect:
-        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
-            mock_cursor
-        )
-
-        # initialize Postgres cache
-        config = PostgresConfig()
-        cache = PostgresCache(config)
-        # simulate DB disconnection
-        cache.connection = None
-        assert not cache.connected()
-        # DB operation should connect automatically
-        cache.list(user_id, conversation_id)
-        assert cache.connected()
-
-    # one DB operation must be performed:
-    # 1. list conversations from DB
-    calls = [
-        call(PostgresCache.LIST_CONVERSATIONS_STATEMENT, (user_id,)),
-    ]
-    mock_cursor.execute.assert_has_calls(calls, any_order=False)
-
-
 def test_delete_operation():
     """Test the Cache.delete operation."""
     # Mock the database cursor behavior
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = True
+    mock_cursor.rowcount = 1
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
@@ -477,11 +493,9 @@ def test_delete_operation():
     # Verify the result
     assert result is True
 
-    # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. delete one conversation from DB
+    # one DB operation must be performed:
+    # 1. delete one conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.DELETE_SINGLE_CONVERSATION_STATEMENT,
             (user_id, conversation_id),
@@ -490,17 +504,19 @@ def test_delete_operation():
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
 
     # Verify the query execution
-    mock_cursor.fetchone.assert_called_once()
+    # DELETE does not return rows
+    mock_cursor.fetchone.assert_not_called()
 
 
 def test_delete_operation_not_found():
     """Test the Cache.delete operation when the conversation is not found."""
     # Mock the database cursor behavior to simulate no row found
     mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = None
+    mock_cursor.rowcount = 0
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
@@ -515,11 +531,9 @@ def test_delete_operation_not_found():
     # Verify the result
     assert result is False
 
-    # multiple DB operations must be performed:
-    # 1. check if connection to DB is alive
-    # 2. delete one conversation from DB
+    # one DB operation must be performed:
+    # 1. delete one conversation from DB
     calls = [
-        call("SELECT 1"),
         call(
             PostgresCache.DELETE_SINGLE_CONVERSATION_STATEMENT,
             (user_id, conversation_id),
@@ -528,7 +542,8 @@ def test_delete_operation_not_found():
     mock_cursor.execute.assert_has_calls(calls, any_order=False)
 
     # Verify the query execution
-    mock_cursor.fetchone.assert_called_once()
+    # DELETE does not return rows
+    mock_cursor.fetchone.assert_not_called()
 
 
 def test_delete_operation_on_exception():
@@ -539,6 +554,7 @@ def test_delete_operation_on_exception():
 
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
         mock_connect.return_value.cursor.return_value.__enter__.return_value = (
             mock_cursor
         )
@@ -548,41 +564,100 @@ def test_delete_operation_on_exception():
         cache = PostgresCache(config)
 
         # Verify that the exception is raised
-        with pytest.raises(psycopg2.DatabaseError, match="PLSQL error"):
+        with pytest.raises(CacheError, match="PLSQL error"):
             cache.delete(user_id, conversation_id)
 
 
-def test_delete_operation_on_disconnected_db():
-    """Test the Cache.delete operation when DB is not connected."""
-    # mock the query
-    mock_cursor = MagicMock()
-    mock_cursor.fetchone.return_value = None
+def test_operation_retried_on_broken_connection():
+    """Test that operation is retried when idle connection is found broken."""
+    broken_connection = MagicMock(closed=0)
+    broken_cursor = broken_connection.cursor.return_value.__enter__.return_value
+
+    def connection_lost(*args):
+        broken_connection.closed = 2
+        raise psycopg2.OperationalError("server closed the connection")
+
+    broken_cursor.execute.side_effect = connection_lost
+    new_connection = MagicMock(closed=0)
+    new_cursor = new_connection.cursor.return_value.__enter__.return_value
+    new_cursor.fetchall.return_value = []
+
+    # do not use real PostgreSQL instance
+    with patch(
+        "psycopg2.connect", side_effect=[broken_connection, new_connection]
+    ) as mock_connect:
+        cache = PostgresCache(PostgresConfig())
+        assert cache.get(user_id, conversation_id) == []
+
+    # broken connection is closed and replaced by the new one
+    assert mock_connect.call_count == 2
+    broken_connection.close.assert_called_once_with()
+    new_cursor.execute.assert_called_once_with(
+        PostgresCache.SELECT_CONVERSATION_HISTORY_STATEMENT,
+        (user_id, conversation_id),
+    )
+    assert len(cache.pool) == 1
+
+
+def test_operation_not_retried_on_new_connection():
+    """Test that operation is not retried when new connection is broken."""
+    connection = MagicMock(closed=0)
+    cursor = connection.cursor.return_value.__enter__.return_value
+
+    def connection_lost(*args):
+        connection.closed = 2
+        raise psycopg2.OperationalError("server closed the connection")
+
+    cursor.execute.side_effect = connection_lost
 
+    # do not use real PostgreSQL instance
+    with patch(
+        "psycopg2.connect", side_effect=[MagicMock(closed=0), connection]
+    ) as mock_connect:
+        cache = PostgresCache(PostgresConfig(max_connections=2))
+        # the idle connection is used by other thread
+        idle, _ = cache.pool.get()
+
+        with pytest.raises(CacheError, match="server closed the connection"):
+            cache.list(user_id)
+
+    assert mock_connect.call_count == 2
+    connection.close.assert_called_once_with()
+    cache.pool.put(idle)
+    assert len(cache.pool) == 1
+
+
+def test_operation_when_database_unreachable():
+    """Test that error is reported when connection can't be opened."""
     # do not use real PostgreSQL instance
     with patch("psycopg2.connect") as mock_connect:
-        mock_connect.return_value.cursor.return_value.__enter__.return_value = (
-            mock_cursor
-        )
+        mock_connect.return_value.closed = 0
+        cache = PostgresCache(PostgresConfig(max_connections=2))
+        # the idle connection is used by other thread
+        idle, _ = cache.pool.get()
 
-        # initialize Postgres cache
-        config = PostgresConfig()
-        cache = PostgresCache(config)
-        # simulate DB disconnection
-        cache.connection = None
-        assert not cache.connected()
-        # DB operation should connect automatically
-        cache.delete(user_id, conversation_id)
-        assert cache.connected()
-
-    # one DB operations must be performed:
-    # 1. delete one conversation from DB
-    calls = [
-        call(
-            PostgresCache.DELETE_SINGLE_CONVERSATION_STATEMENT,
-            (user_id, conversation_id),
-        ),
-    ]
-    mock_cursor.execute.assert_has_calls(calls, any_order=False)
+        mock_connect.side_effect = psycopg2.OperationalError("unreachable")
+        with pytest.raises(CacheError, match="unreachable"):
+            cache.get(user_id, conversation_id)
+        cache.pool.put(idle)
+
+
+def test_concurrent_operations_use_own_connections():
+    """Test that connection is checked out for each operation."""
+    # do not use real PostgreSQL instance
+    with patch(
+        "psycopg2.connect", side_effect=lambda **kwargs: MagicMock(closed=0)
+    ) as mock_connect:
+        cache = PostgresCache(PostgresConfig(max_connections=2))
+        first, _ = cache.pool.get()
+
+        # connection used by other thread is not shared
+        cache.list(user_id)
+        assert mock_connect.call_count == 2
+        assert not first.cursor.return_value.__enter__.return_value.execute.called
+
+        cache.pool.put(first)
+        assert len(cache.pool) == 2
 
 
 def test_cleanup_method_when_clean_not_needed():
@@ -624,29 +699,53 @@ def test_cleanup_method_when_clean_performed():
 def test_ready():
     """Test the Cache.ready operation."""
     # do not use real PostgreSQL instance
-    with patch("psycopg2.connect"):
+    with patch("psycopg2.connect") as mock_connect:
+        connection = mock_connect.return_value
+        connection.closed = 0
         # initialize Postgres cache
         config = PostgresConfig()
         cache = PostgresCache(config)
 
-        # mock the connection state 0 - open
-        cache.connection.closed = 0
         # patch the poll function to return POLL_OK
-        cache.connection.poll = MagicMock(return_value=psycopg2.extensions.POLL_OK)
+        connection.poll = MagicMock(return_value=psycopg2.extensions.POLL_OK)
         # cache is ready
         assert cache.ready()
 
         # mock the connection state 1 - closed
-        cache.connection.closed = 1
+        connection.closed = 1
         # cache is not ready
         assert not cache.ready()
 
         for error_type in (psycopg2.OperationalError, psycopg2.InterfaceError):
             # mock the connection state 0 - open
-            cache.connection.closed = 0
+            connection.closed = 0
             # patch the poll function to raise OperationalError
-            cache.connection.poll = MagicMock(
-                side_effect=error_type("Connection closed")
-            )
+            connection.poll = MagicMock(side_effect=error_type("Connection closed"))
             # cache is not ready
             assert not cache.ready()
+
+
+def test_ready_when_database_unreachable():
+    """Test the Cache.ready operation when new connection can't be opened."""
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
+        cache = PostgresCache(PostgresConfig(max_connections=2))
+        # the idle connection is used by other thread
+        idle, _ = cache.pool.get()
+
+        mock_connect.side_effect = psycopg2.OperationalError("unreachable")
+        assert not cache.ready()
+        cache.pool.put(idle)
+
+
+def test_ready_when_all_connections_used():
+    """Test that the cache is ready when all connections are in use."""
+    # do not use real PostgreSQL instance
+    with patch("psycopg2.connect") as mock_connect:
+        mock_connect.return_value.closed = 0
+        cache = PostgresCache(PostgresConfig(max_connections=1))
+
+        connection, _ = cache.pool.get()
+        assert cache.ready()
+        cache.pool.put(connection)
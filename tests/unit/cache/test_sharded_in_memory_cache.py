@@ -0,0 +1,149 @@
+"""Unit tests for ShardedInMemoryCache class."""
+
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ols import constants
+from ols.app.models.config import ShardedInMemoryCacheConfig
+from ols.app.models.models import CacheEntry
+from ols.src.cache.sharded_in_memory_cache import ShardedInMemoryCache
+from ols.utils import suid
+
+cache_entry_1 = CacheEntry(
+    query=HumanMessage("user message1"), response=AIMessage("ai message1")
+)
+cache_entry_2 = CacheEntry(
+    query=HumanMessage("user message2"), response=AIMessage("ai message2")
+)
+
+
+@pytest.fixture
+def cache():
+    """Fixture with constructed sharded in memory cache object."""
+    return ShardedInMemoryCache(
+        ShardedInMemoryCacheConfig({"max_entries": "100", "shards": "4"})
+    )
+
+
+def test_insert_or_append(cache):
+    """Test that entries of conversation are stored in one shard."""
+    conversation_id = suid.get_suid()
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, cache_entry_1)
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, cache_entry_2)
+
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_id) == [
+        cache_entry_1,
+        cache_entry_2,
+    ]
+    assert cache.get_tail(constants.DEFAULT_USER_UID, conversation_id, 1) == [
+        cache_entry_2
+    ]
+    assert sum(len(shard.cache) for shard in cache.shards) == 1
+
+
+def test_get_missing_conversation(cache):
+    """Test that missing conversation is reported as in other caches."""
+    conversation_id = suid.get_suid()
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_id) is None
+    assert cache.get_tail(constants.DEFAULT_USER_UID, conversation_id) == []
+
+
+def test_conversations_spread_across_shards(cache):
+    """Test that conversations are stored in more shards."""
+    for _ in range(100):
+        cache.insert_or_append(
+            constants.DEFAULT_USER_UID, suid.get_suid(), cache_entry_1
+        )
+
+    assert all(shard.cache for shard in cache.shards)
+
+
+def test_global_capacity_divided_between_shards():
+    """Test that global capacity limits the number of conversations."""
+    cache = ShardedInMemoryCache(
+        ShardedInMemoryCacheConfig({"max_entries": 8, "shards": 4})
+    )
+    assert [shard.capacity for shard in cache.shards] == [2, 2, 2, 2]
+
+    for _ in range(40):
+        cache.insert_or_append(
+            constants.DEFAULT_USER_UID, suid.get_suid(), cache_entry_1
+        )
+
+    assert len(cache.list(constants.DEFAULT_USER_UID)) <= 8
+
+
+def test_capacity_per_shard():
+    """Test that capacity can be specified for every shard."""
+    cache = ShardedInMemoryCache(
+        ShardedInMemoryCacheConfig(
+            {
+                "max_entries": 8,
+                "max_bytes": 1000,
+                "shards": 4,
+                "capacity_per_shard": True,
+            }
+        )
+    )
+
+    assert [shard.capacity for shard in cache.shards] == [8, 8, 8, 8]
+    assert [shard.max_bytes for shard in cache.shards] == [1000] * 4
+
+
+def test_delete(cache):
+    """Test that conversation is deleted from its shard."""
+    conversation_id = suid.get_suid()
+    cache.insert_or_append(constants.DEFAULT_USER_UID, conversation_id, cache_entry_1)
+
+    assert cache.delete(constants.DEFAULT_USER_UID, conversation_id) is True
+    assert cache.delete(constants.DEFAULT_USER_UID, conversation_id) is False
+    assert cache.get(constants.DEFAULT_USER_UID, conversation_id) is None
+
+
+def test_list(cache):
+    """Test that conversations of the user are listed from all shards."""
+    other_user_id = suid.get_suid()
+    conversation_ids = [suid.get_suid() for _ in range(20)]
+    for cid in conversation_ids:
+        cache.insert_or_append(constants.DEFAULT_USER_UID, cid, cache_entry_1)
+    cache.insert_or_append(other_user_id, suid.get_suid(), cache_entry_1)
+
+    assert sorted(cache.list(constants.DEFAULT_USER_UID)) == sorted(conversation_ids)
+
+
+def test_list_improper_user_id(cache):
+    """Test list with improper user ID."""
+    with pytest.raises(ValueError, match="Invalid user ID foo"):
+        cache.list("foo")
+
+
+def test_get_improper_conversation_id(cache):
+    """Test get with improper conversation ID."""
+    with pytest.raises(ValueError, match="Invalid conversation ID foo"):
+        cache.get(constants.DEFAULT_USER_UID, "foo")
+
+
+def test_ready(cache):
+    """Test if in memory cache always report ready."""
+    assert cache.ready()
+
+
+def test_concurrent_access(cache):
+    """Test that conversations stay consistent when used by more threads."""
+    conversation_ids = [suid.get_suid() for _ in range(16)]
+
+    def worker(cid):
+        for _ in range(50):
+            cache.insert_or_append(constants.DEFAULT_USER_UID, cid, cache_entry_1)
+            cache.get_tail(constants.DEFAULT_USER_UID, cid, max_entries=1)
+
+    threads = [threading.Thread(target=worker, args=(c,)) for c in conversation_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for cid in conversation_ids:
+        assert len(cache.get(constants.DEFAULT_USER_UID, cid)) == 50
@@ -0,0 +1,285 @@
+"""Unit tests for TieredCache class."""
+
+import json
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ols import constants
+from ols.app.models.config import TieredCacheConfig
+from ols.app.models.models import CacheEntry
+from ols.src.cache.cache_error import CacheError
+from ols.src.cache.in_memory_cache import CachedEntry
+from ols.src.cache.tiered_cache import InvalidationListener, TieredCache
+from ols.utils import suid
+
+user_id = suid.get_suid()
+cache_entry_1 = CacheEntry(
+    query=HumanMessage("user message1"), response=AIMessage("ai message1")
+)
+cache_entry_2 = CacheEntry(
+    query=HumanMessage("user message2"), response=AIMessage("ai message2")
+)
+
+
+def make_cache(**options):
+    """Create tiered cache with mocked Postgres cache."""
+    config = TieredCacheConfig({"postgres": {}, **options})
+    with patch("ols.src.cache.tiered_cache.PostgresCache") as mock_postgres:
+        cache = TieredCache(config)
+    mock_postgres.return_value.instance_id = "this-instance"
+    return cache
+
+
+@pytest.fixture
+def cache():
+    """Fixture with tiered cache with mocked Postgres cache."""
+    return make_cache()
+
+
+def notification(sender, conversation_id):
+    """Construct notification payload as sent by PostgresCache."""
+    return json.dumps(
+        {"sender": sender, "user_id": user_id, "conversation_id": conversation_id}
+    )
+
+
+def test_new_conversation_served_from_memory(cache):
+    """Test that entries written through are read without database round-trip."""
+    conversation_id = suid.get_suid()
+    cache.postgres.append.side_effect = [1, 2]
+
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+    cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+
+    assert cache.postgres.append.call_count == 2
+    assert cache.get(user_id, conversation_id) == [cache_entry_1, cache_entry_2]
+    assert cache.get_tail(user_id, conversation_id, max_entries=1) == [cache_entry_2]
+    cache.postgres.get.assert_not_called()
+    cache.postgres.get_tail.assert_not_called()
+
+
+def test_conversation_read_from_postgres_once(cache):
+    """Test that conversation not found in memory is read from Postgres once."""
+    conversation_id = suid.get_suid()
+    cache.postgres.get.return_value = [cache_entry_1, cache_entry_2]
+
+    assert cache.get_tail(user_id, conversation_id, max_entries=1) == [cache_entry_2]
+    assert cache.get(user_id, conversation_id) == [cache_entry_1, cache_entry_2]
+
+    cache.postgres.get.assert_called_once_with(user_id, conversation_id, True)
+
+
+def test_missing_conversation(cache):
+    """Test that missing conversation is read from Postgres every time."""
+    conversation_id = suid.get_suid()
+    cache.postgres.get.return_value = []
+
+    assert cache.get(user_id, conversation_id) == []
+    assert cache.get_tail(user_id, conversation_id) == []
+
+    assert cache.postgres.get.call_count == 2
+
+
+def test_conversation_appended_elsewhere_dropped(cache):
+    """Test that copy is dropped when entries are missing in it."""
+    conversation_id = suid.get_suid()
+    cache.postgres.append.return_value = 1
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    # entry 2 has been appended by other instance
+    cache.postgres.append.return_value = 3
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    cache.postgres.get.return_value = [cache_entry_1, cache_entry_2, cache_entry_1]
+    assert cache.get(user_id, conversation_id) == [
+        cache_entry_1,
+        cache_entry_2,
+        cache_entry_1,
+    ]
+    cache.postgres.get.assert_called_once()
+
+
+def test_conversation_not_filled_when_changed_meanwhile(cache):
+    """Test that conversation read from Postgres is not kept when outdated."""
+    conversation_id = suid.get_suid()
+
+    def get_and_append(*_):
+        # entry appended while the conversation is being read
+        cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+        return [cache_entry_1]
+
+    cache.postgres.get.side_effect = get_and_append
+    cache.postgres.append.return_value = 2
+
+    assert cache.get(user_id, conversation_id) == [cache_entry_1]
+
+    cache.postgres.get.side_effect = None
+    cache.postgres.get.return_value = [cache_entry_1, cache_entry_2]
+    assert cache.get(user_id, conversation_id) == [cache_entry_1, cache_entry_2]
+    assert cache.postgres.get.call_count == 2
+
+
+def test_truncated_conversation():
+    """Test that entries dropped from memory are read from Postgres."""
+    entry_size = CachedEntry.from_cache_entry(cache_entry_1).size
+    cache = make_cache(memory={"max_bytes": 2 * entry_size})
+    conversation_id = suid.get_suid()
+    cache.postgres.append.side_effect = [1, 2, 3]
+    for _ in range(3):
+        cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    # the tail kept in memory is enough
+    assert cache.get_tail(user_id, conversation_id, max_entries=2) == [
+        cache_entry_1,
+        cache_entry_1,
+    ]
+    cache.postgres.get_tail.assert_not_called()
+
+    # the tail might continue with dropped entries
+    cache.postgres.get_tail.return_value = [cache_entry_1] * 3
+    assert cache.get_tail(user_id, conversation_id) == [cache_entry_1] * 3
+    cache.postgres.get_tail.assert_called_once_with(
+        user_id, conversation_id, None, None, True
+    )
+
+    cache.postgres.get.return_value = [cache_entry_1] * 3
+    assert cache.get(user_id, conversation_id) == [cache_entry_1] * 3
+
+
+def test_failed_append_drops_conversation(cache):
+    """Test that conversation is dropped when it is not known what is stored."""
+    conversation_id = suid.get_suid()
+    cache.postgres.append.return_value = 1
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    cache.postgres.append.side_effect = CacheError("insert_or_append")
+    with pytest.raises(CacheError):
+        cache.insert_or_append(user_id, conversation_id, cache_entry_2)
+
+    cache.postgres.get.return_value = [cache_entry_1]
+    assert cache.get(user_id, conversation_id) == [cache_entry_1]
+    cache.postgres.get.assert_called_once()
+
+
+def test_delete(cache):
+    """Test that conversation is deleted from Postgres and memory."""
+    conversation_id = suid.get_suid()
+    cache.postgres.append.return_value = 1
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+    cache.postgres.delete.return_value = True
+
+    assert cache.delete(user_id, conversation_id) is True
+
+    cache.postgres.delete.assert_called_once_with(user_id, conversation_id, True)
+    cache.postgres.get.return_value = []
+    assert cache.get(user_id, conversation_id) == []
+
+
+def test_list_and_ready(cache):
+    """Test that conversations and readiness are reported by Postgres."""
+    cache.postgres.list.return_value = ["conversation"]
+    cache.postgres.ready.return_value = False
+
+    assert cache.list(user_id) == ["conversation"]
+    assert cache.ready() is False
+
+
+def test_improper_conversation_id(cache):
+    """Test that conversation ID is checked."""
+    with pytest.raises(ValueError, match="Invalid conversation ID foo"):
+        cache.get(user_id, "foo")
+
+
+def test_notification_drops_conversation(cache):
+    """Test that conversation changed by other instance is dropped."""
+    conversation_id = suid.get_suid()
+    cache.postgres.append.return_value = 1
+    cache.insert_or_append(user_id, conversation_id, cache_entry_1)
+
+    # own notifications are ignored
+    cache._on_notification(notification("this-instance", conversation_id))
+    assert cache.get(user_id, conversation_id) == [cache_entry_1]
+    cache.postgres.get.assert_not_called()
+
+    cache._on_notification(notification("other-instance", conversation_id))
+    cache.postgres.get.return_value = [cache_entry_1, cache_entry_2]
+    assert cache.get(user_id, conversation_id) == [cache_entry_1, cache_entry_2]
+
+
+def test_invalid_notification(cache, caplog):
+    """Test that invalid notification is logged."""
+    cache._on_notification("not a json")
+    cache._on_notification(notification("other-instance", "foo"))
+
+    assert caplog.text.count("invalid conversation cache notification") == 2
+
+
+def test_invalidation_listener_started():
+    """Test that listener is started only when invalidation is enabled."""
+    assert make_cache().listener is None
+
+    with patch("ols.src.cache.tiered_cache.InvalidationListener") as mock_listener:
+        cache = make_cache(invalidation=True)
+
+    mock_listener.return_value.start.assert_called_once_with()
+    assert cache.listener is mock_listener.return_value
+    assert mock_listener.call_args.args[1] == constants.TIERED_CACHE_NOTIFY_CHANNEL
+
+
+def test_invalidation_listener():
+    """Test that notifications are passed to the callback."""
+    connection = MagicMock()
+    connection.notifies = [SimpleNamespace(payload="first")]
+    connection.poll.side_effect = lambda: connection.notifies.append(
+        SimpleNamespace(payload="second")
+    )
+    received = []
+    listening = threading.Event()
+    listener = InvalidationListener(
+        lambda: connection, "channel", received.append, listening.set
+    )
+
+    with patch(
+        "ols.src.cache.tiered_cache.select.select", return_value=([connection], [], [])
+    ):
+        listener.start()
+        assert listening.wait(timeout=5)
+        listener.stop()
+
+    assert received[:2] == ["first", "second"]
+    assert connection.autocommit is True
+    connection.close.assert_called_once_with()
+
+
+def test_invalidation_listener_reconnects():
+    """Test that listener reconnects when connection is lost."""
+    connection = MagicMock()
+    connection.notifies = []
+    connection.poll.side_effect = psycopg2.OperationalError("connection lost")
+    connections = [connection, connection]
+    listened = threading.Semaphore(0)
+
+    def connect():
+        if not connections:
+            raise psycopg2.OperationalError("unreachable")
+        return connections.pop()
+
+    listener = InvalidationListener(connect, "channel", print, listened.release)
+    with (
+        patch(
+            "ols.src.cache.tiered_cache.select.select",
+            return_value=([connection], [], []),
+        ),
+        patch.object(constants, "TIERED_CACHE_LISTENER_RECONNECT_INTERVAL", 0),
+    ):
+        listener.start()
+        assert listened.acquire(timeout=5)
+        assert listened.acquire(timeout=5)
+        listener.stop()
+
+    assert connection.close.call_count == 2
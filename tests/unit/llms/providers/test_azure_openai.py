@@ -565,6 +565,28 @@ def test_token_is_reused(provider_config):
         assert access_token == token_cache.access_token  # cache is updated
 
 
+def test_is_expired(provider_config):
+    """Test that LLM loaded with API key never expires, with AD token it does."""
+    expired_token_cache = TokenCache(
+        access_token="expired_token",  # noqa: S106
+        expires_on=int(time.time()) - 100,  # expired value
+    )
+    with patch(
+        "ols.src.llms.providers.azure_openai.TOKEN_CACHE", new=expired_token_cache
+    ):
+        azure_openai = AzureOpenAI(
+            model="irrelevant value", provider_config=provider_config
+        )
+        assert not azure_openai.is_expired()
+
+        # no API key -> LLM was loaded with azure AD token
+        azure_openai.credentials = None
+        assert azure_openai.is_expired()
+
+        expired_token_cache.update_token("new_token", int(time.time()) + 3600)
+        assert not azure_openai.is_expired()
+
+
 @pytest.mark.parametrize(
     "model_name,should_have_params",
     [
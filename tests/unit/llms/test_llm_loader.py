@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 from langchain_core.language_models.fake_chat_models import FakeChatModel
+from prometheus_client import REGISTRY
 
 from ols import config, constants
 from ols.app.models.config import LLMProviders
@@ -12,6 +13,7 @@ from ols.src.llms.llm_loader import (
     ModelConfigMissingError,
     UnknownProviderError,
     UnsupportedProviderError,
+    llm_pool,
     load_llm,
 )
 from ols.src.llms.providers.provider import LLMProvider
@@ -101,3 +103,68 @@ def test_load_llm_no_provider_config():
         match=f"Providers configuration missing in {constants.DEFAULT_CONFIGURATION_FILE}",
     ):
         load_llm(provider="fake-provider", model="model")
+
+
+@pytest.fixture
+def _fake_provider_config():
+    """Configure fake provider."""
+    with patch("ols.constants.SUPPORTED_PROVIDER_TYPES", new=["fake-provider"]):
+        config.config.llm_providers = LLMProviders(
+            [
+                {
+                    "name": "fake-provider",
+                    "type": "fake-provider",
+                    "models": [{"name": "model"}, {"name": "other-model"}],
+                }
+            ]
+        )
+        yield
+
+
+@pytest.mark.usefixtures("_registered_fake_provider", "_fake_provider_config")
+def test_load_llm_pooled():
+    """Test that loaded LLM is reused for the same provider, model and params."""
+    llm_pool.clear()
+    params = {constants.GenericLLMParameters.MAX_TOKENS_FOR_RESPONSE: 100}
+
+    llm = load_llm("fake-provider", "model", params)
+    assert load_llm("fake-provider", "model", dict(params)) is llm
+    assert len(llm_pool) == 1
+
+    # different model or parameters need different LLM
+    assert load_llm("fake-provider", "other-model", params) is not llm
+    assert load_llm("fake-provider", "model") is not llm
+    assert len(llm_pool) == 3
+
+    labels = {"provider": "fake-provider", "model": "model"}
+    assert REGISTRY.get_sample_value("ols_llm_pool_size") == 3
+    assert REGISTRY.get_sample_value("ols_llm_pool_hits_total", labels) >= 1
+
+
+@pytest.mark.usefixtures("_registered_fake_provider", "_fake_provider_config")
+def test_load_llm_pool_invalidated_on_config_reload():
+    """Test that pooled LLMs are dropped when configuration changes."""
+    llm_pool.clear()
+    llm = load_llm("fake-provider", "model")
+
+    config.config.llm_providers = LLMProviders(
+        [
+            {
+                "name": "fake-provider",
+                "type": "fake-provider",
+                "models": [{"name": "model"}],
+            }
+        ]
+    )
+    assert load_llm("fake-provider", "model") is not llm
+    assert len(llm_pool) == 1
+
+
+@pytest.mark.usefixtures("_registered_fake_provider", "_fake_provider_config")
+def test_load_llm_pool_expired():
+    """Test that LLM is loaded again when the pooled one expired."""
+    llm_pool.clear()
+    llm = load_llm("fake-provider", "model")
+
+    with patch.object(LLMProvider, "is_expired", return_value=True):
+        assert load_llm("fake-provider", "model") is not llm
@@ -12,7 +12,11 @@ from langchain.prompts import (
 from langchain_core.messages import AIMessage, HumanMessage
 
 from ols.constants import ModelFamily
-from ols.src.prompts.prompt_generator import GeneratePrompt, format_retrieved_chunk
+from ols.src.prompts.prompt_generator import (
+    GeneratePrompt,
+    _prompt_template,
+    format_retrieved_chunk,
+)
 
 model = ["some-granite-model", "some-gpt-model"]
 
@@ -36,6 +40,12 @@ conversation_history = [
 ]
 
 
+@pytest.fixture(autouse=True)
+def _clear_prompt_template_cache():
+    """Clear cached templates, some tests patch the prompt instructions."""
+    _prompt_template.cache_clear()
+
+
 @pytest.mark.parametrize("model", model)
 def test_generate_prompt_default_prompt(model):
     """Test if prompt generator returns default prompt for given input."""
@@ -226,3 +236,38 @@ def test_generate_prompt_with_tool_call(model):
         "AI: First AI message\n"
         f"Human: {query}"
     )
+
+
+@pytest.mark.parametrize("model", model)
+def test_generate_prompt_cached_template(model):
+    """Test that prompt template is built once for the same prompt shape."""
+    prompt1, _ = GeneratePrompt(
+        query, rag_context, conversation_history, system_instruction
+    ).generate_prompt(model)
+    prompt2, llm_input_values = GeneratePrompt(
+        "other query", ["other context"], conversation_history, system_instruction
+    ).generate_prompt(model)
+
+    cache_info = _prompt_template.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 1
+    assert prompt1 == prompt2
+    assert llm_input_values["query"] == "other query"
+    assert llm_input_values["context"] == "other context"
+
+    # different prompt shape needs a different template
+    GeneratePrompt(query, [], [], system_instruction).generate_prompt(model)
+    assert _prompt_template.cache_info().misses == 2
+
+
+def test_generate_prompt_cached_template_isolated():
+    """Test that messages added to generated prompt do not leak into cache."""
+    prompt, _ = GeneratePrompt(
+        query, rag_context, [], system_instruction, True
+    ).generate_prompt("some-gpt-model")
+    prompt.append(AIMessage("tool call"))
+
+    prompt, _ = GeneratePrompt(
+        query, rag_context, [], system_instruction, True
+    ).generate_prompt("some-gpt-model")
+    assert len(prompt.messages) == 2
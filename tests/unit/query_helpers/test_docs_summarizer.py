@@ -1,14 +1,14 @@
 """Unit tests for DocsSummarizer class."""
 
 import logging
-from unittest.mock import ANY, AsyncMock, patch
+from unittest.mock import ANY, patch
 
 import pytest
 from langchain_core.messages import HumanMessage
 from langchain_core.messages.ai import AIMessageChunk
 
 from ols import config
-from tests.mock_classes.mock_tools import mock_tools_map
+from tests.mock_classes.mock_tools import mock_mcp_session_tools, mock_tools_map
 
 # needs to be setup there before is_user_authorized is imported
 config.ols_config.authentication_config.module = "k8s"
@@ -283,8 +283,9 @@ def test_tool_calling_tool_execution(caplog):
     with (
         patch("ols.src.query_helpers.docs_summarizer.MAX_ITERATIONS", 2),
         patch(
-            "ols.src.query_helpers.docs_summarizer.MultiServerMCPClient"
-        ) as mock_mcp_client_cls,
+            "ols.src.query_helpers.docs_summarizer.mcp_session_manager.tools",
+            new=mock_mcp_session_tools,
+        ),
         patch(
             "ols.src.query_helpers.docs_summarizer.DocsSummarizer._invoke_llm"
         ) as mock_invoke,
@@ -302,11 +303,6 @@ def test_tool_calling_tool_execution(caplog):
             ]
         )
 
-        # Create mock tools map
-        mock_mcp_client_instance = AsyncMock()
-        mock_mcp_client_instance.get_tools.return_value = mock_tools_map
-        mock_mcp_client_cls.return_value = mock_mcp_client_instance
-
         summarizer = DocsSummarizer(llm_loader=mock_llm_loader(None))
         summarizer._tool_calling_enabled = True
         summarizer.create_response(question)
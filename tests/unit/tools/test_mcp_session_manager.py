@@ -0,0 +1,193 @@
+"""Tests for MCPSessionManager."""
+
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from ols.src.tools.mcp_session_manager import (
+    MCPSessionManager,
+    connection_fingerprint,
+)
+
+CONNECTIONS = {
+    "openshift": {"transport": "stdio", "env": {"OC_USER_TOKEN": "token1"}},
+    "other": {"transport": "sse", "url": "http://localhost:8080/sse"},
+}
+
+
+class FakeSessions:
+    """Fake create_session, tracks opened and closed sessions."""
+
+    def __init__(self, failing=()):
+        """Initialize fake sessions."""
+        self.failing = failing
+        self.opened = []
+        self.closed = []
+
+    @asynccontextmanager
+    async def __call__(self, connection):
+        """Open fake session."""
+        if connection.get("url") in self.failing:
+            raise ConnectionError("connection refused")
+        session = MagicMock()
+        session.initialize = AsyncMock()
+        session.connection = connection
+        self.opened.append(session)
+        try:
+            yield session
+        finally:
+            self.closed.append(session)
+
+
+async def fake_load_mcp_tools(session):
+    """Return tool per server, named after the transport."""
+    tool = MagicMock()
+    tool.name = f"tool_{session.connection['transport']}"
+    return [tool]
+
+
+@pytest.fixture
+def fake_sessions():
+    """Patch MCP session creation and tools loading."""
+    sessions = FakeSessions()
+    with (
+        patch("ols.src.tools.mcp_session_manager.create_session", new=sessions),
+        patch(
+            "ols.src.tools.mcp_session_manager.load_mcp_tools",
+            side_effect=fake_load_mcp_tools,
+        ) as load_tools,
+    ):
+        sessions.load_tools = load_tools
+        yield sessions
+
+
+async def get_tool_names(manager, connections):
+    """Get names of tools provided by the manager."""
+    async with manager.tools(connections) as tools:
+        return sorted(tool.name for tool in tools)
+
+
+def test_connection_fingerprint():
+    """Test that fingerprint depends on the resolved connection."""
+    connection = CONNECTIONS["openshift"]
+    other_token = {"transport": "stdio", "env": {"OC_USER_TOKEN": "token2"}}
+
+    assert connection_fingerprint(connection) == connection_fingerprint(
+        dict(connection)
+    )
+    assert connection_fingerprint(connection) != connection_fingerprint(other_token)
+
+
+@pytest.mark.asyncio
+async def test_sessions_and_tools_reused(fake_sessions):
+    """Test that sessions and tools are reused across requests."""
+    manager = MCPSessionManager()
+
+    for _ in range(3):
+        assert await get_tool_names(manager, CONNECTIONS) == [
+            "tool_sse",
+            "tool_stdio",
+        ]
+
+    assert len(fake_sessions.opened) == 2
+    assert fake_sessions.load_tools.call_count == 2
+    assert len(manager) == 2
+    manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_tools_cache_expires(fake_sessions):
+    """Test that tools are listed again when cache expires."""
+    manager = MCPSessionManager(tools_ttl=0)
+
+    await get_tool_names(manager, CONNECTIONS)
+    await get_tool_names(manager, CONNECTIONS)
+
+    # session is still reused
+    assert len(fake_sessions.opened) == 2
+    assert fake_sessions.load_tools.call_count == 4
+    manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_sessions_per_user_token(fake_sessions):
+    """Test that sessions with injected token are not shared between users."""
+    manager = MCPSessionManager()
+    other_user = {
+        **CONNECTIONS,
+        "openshift": {"transport": "stdio", "env": {"OC_USER_TOKEN": "token2"}},
+    }
+
+    await get_tool_names(manager, CONNECTIONS)
+    await get_tool_names(manager, other_user)
+
+    # server without token is shared
+    assert len(fake_sessions.opened) == 3
+    assert len(manager) == 3
+    manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_reaped(fake_sessions):
+    """Test that idle sessions are closed."""
+    manager = MCPSessionManager(idle_timeout=0)
+
+    await get_tool_names(manager, {"other": CONNECTIONS["other"]})
+    await get_tool_names(manager, {"openshift": CONNECTIONS["openshift"]})
+    await asyncio.sleep(0.01)
+
+    assert len(manager) == 1
+    assert fake_sessions.closed == fake_sessions.opened[:1]
+    manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_leased_session_not_reaped(fake_sessions):
+    """Test that session used by other request is not closed."""
+    manager = MCPSessionManager(idle_timeout=0)
+
+    async with manager.tools({"other": CONNECTIONS["other"]}):
+        await get_tool_names(manager, {"openshift": CONNECTIONS["openshift"]})
+        await asyncio.sleep(0.01)
+        assert len(manager) == 2
+        assert fake_sessions.closed == []
+    manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_max_sessions(fake_sessions):
+    """Test that least recently used sessions are closed over the limit."""
+    manager = MCPSessionManager(max_sessions=1)
+
+    await get_tool_names(manager, {"other": CONNECTIONS["other"]})
+    await get_tool_names(manager, {"openshift": CONNECTIONS["openshift"]})
+    await asyncio.sleep(0.01)
+
+    assert len(manager) == 1
+    assert fake_sessions.closed == fake_sessions.opened[:1]
+    manager.close_all()
+
+
+@pytest.mark.asyncio
+async def test_failing_server_skipped(fake_sessions, caplog):
+    """Test that tools from reachable servers are provided."""
+    fake_sessions.failing = (CONNECTIONS["other"]["url"],)
+    manager = MCPSessionManager()
+
+    assert await get_tool_names(manager, CONNECTIONS) == ["tool_stdio"]
+    assert "Failed to get tools from MCP server 'other'" in caplog.text
+    # failed session is opened again next time
+    assert len(manager) == 1
+    manager.close_all()
+
+
+def test_sessions_not_shared_between_loops(fake_sessions):
+    """Test that session opened by finished event loop is not reused."""
+    manager = MCPSessionManager()
+
+    asyncio.run(get_tool_names(manager, CONNECTIONS))
+    asyncio.run(get_tool_names(manager, CONNECTIONS))
+
+    assert len(fake_sessions.opened) == 4
@@ -0,0 +1,98 @@
+"""Unit tests for tool results cache."""
+
+from unittest.mock import patch
+
+from langchain_core.tools import tool
+
+from ols.app.models.config import MCPServerConfig
+from ols.src.tools.mcp_session_manager import SERVER_NAME_METADATA_KEY
+from ols.src.tools.tool_results_cache import ToolResultsCache, UserToolResults
+
+
+@tool
+def oc_get(oc_get_args: list[str]) -> str:
+    """Fake oc get."""
+    return "output"
+
+
+@tool
+def oc_logs(oc_logs_args: list[str]) -> str:
+    """Fake oc logs."""
+    return "output"
+
+
+oc_get.metadata = {SERVER_NAME_METADATA_KEY: "openshift"}
+oc_logs.metadata = {SERVER_NAME_METADATA_KEY: "openshift"}
+
+SERVER_CONFIGS = [
+    MCPServerConfig(
+        name="openshift",
+        transport="stdio",
+        stdio={"command": "python"},
+        cacheable_tools=["oc_get"],
+        tool_results_cache_ttl=10,
+    )
+]
+
+
+def test_tool_results_cache_expiration():
+    """Test that cached results expire."""
+    cache = ToolResultsCache()
+
+    with patch("ols.src.tools.tool_results_cache.time.monotonic", return_value=100):
+        cache.put(("user", "server", "tool", "{}"), "output", ttl=10)
+        assert cache.get(("user", "server", "tool", "{}")) == "output"
+        assert cache.get(("user", "server", "tool", '{"a": 1}')) is None
+
+    with patch("ols.src.tools.tool_results_cache.time.monotonic", return_value=110):
+        assert cache.get(("user", "server", "tool", "{}")) is None
+    assert len(cache) == 0
+
+
+def test_tool_results_cache_max_entries():
+    """Test that least recently used results are dropped."""
+    cache = ToolResultsCache(max_entries=2)
+
+    cache.put(("user", "server", "tool", "1"), "output1", ttl=10)
+    cache.put(("user", "server", "tool", "2"), "output2", ttl=10)
+    assert cache.get(("user", "server", "tool", "1")) == "output1"
+    cache.put(("user", "server", "tool", "3"), "output3", ttl=10)
+
+    assert len(cache) == 2
+    assert cache.get(("user", "server", "tool", "2")) is None
+    assert cache.get(("user", "server", "tool", "1")) == "output1"
+
+
+def test_user_tool_results():
+    """Test that only results of cacheable tools are cached."""
+    tool_results = UserToolResults("token1", SERVER_CONFIGS, ToolResultsCache())
+
+    tool_results.put(oc_get, {"oc_get_args": ["pods"]}, "pods")
+    tool_results.put(oc_logs, {"oc_logs_args": ["pod"]}, "logs")
+
+    assert tool_results.get(oc_get, {"oc_get_args": ["pods"]}) == "pods"
+    assert tool_results.get(oc_get, {"oc_get_args": ["nodes"]}) is None
+    assert tool_results.get(oc_logs, {"oc_logs_args": ["pod"]}) is None
+
+
+def test_user_tool_results_not_shared_between_users():
+    """Test that results are cached per user."""
+    cache = ToolResultsCache()
+    args = {"oc_get_args": ["pods"]}
+    UserToolResults("token1", SERVER_CONFIGS, cache).put(oc_get, args, "pods")
+
+    assert UserToolResults("token2", SERVER_CONFIGS, cache).get(oc_get, args) is None
+    assert UserToolResults("token1", SERVER_CONFIGS, cache).get(oc_get, args) == "pods"
+
+
+def test_user_tool_results_other_server():
+    """Test that tools of the same name on other server are not cached."""
+    cache = ToolResultsCache()
+    other_server_tool = oc_get.model_copy(
+        update={"metadata": {SERVER_NAME_METADATA_KEY: "other"}}
+    )
+    tool_results = UserToolResults("token1", SERVER_CONFIGS, cache)
+
+    tool_results.put(other_server_tool, {"oc_get_args": ["pods"]}, "pods")
+
+    assert len(cache) == 0
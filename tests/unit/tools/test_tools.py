@@ -3,17 +3,23 @@
 import asyncio
 import time
 from typing import Optional
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from langchain_core.tools.structured import StructuredTool
 from pydantic import BaseModel
 
+from ols import constants
+from ols.app.models.config import MCPServerConfig
+from ols.src.tools.mcp_session_manager import SERVER_NAME_METADATA_KEY
+from ols.src.tools.tool_results_cache import ToolResultsCache, UserToolResults
 from ols.src.tools.tools import (
     SENSITIVE_KEYWORDS,
+    ToolsIndex,
     execute_tool_call,
     execute_tool_calls,
     get_tool_by_name,
+    iter_tool_calls,
     raise_for_sensitive_tool_args,
 )
 
@@ -56,14 +62,36 @@ def test_get_tool_by_name():
     fake_tools = [FakeTool(name="fake_tool")]
     fake_tools_duplicite = [FakeTool(name="fake_tool"), FakeTool(name="fake_tool")]
 
-    tool = get_tool_by_name(fake_tool_name, fake_tools)
+    tool = get_tool_by_name(fake_tool_name, ToolsIndex(fake_tools))
     assert tool.name == fake_tool_name
 
     with pytest.raises(ValueError, match="Tool 'non_existent_tool' not found."):
-        get_tool_by_name("non_existent_tool", fake_tools)
+        get_tool_by_name("non_existent_tool", ToolsIndex(fake_tools))
 
     with pytest.raises(ValueError, match="Multiple tools found with name 'fake_tool'."):
-        get_tool_by_name(fake_tool_name, fake_tools_duplicite)
+        get_tool_by_name(fake_tool_name, ToolsIndex(fake_tools_duplicite))
+
+
+def test_tools_index(caplog):
+    """Test ToolsIndex with duplicate tool names."""
+    fake_tools = [
+        FakeTool(name="tool1"),
+        FakeTool(name="tool2"),
+        FakeTool(name="tool1"),
+        FakeTool(name="tool3"),
+    ]
+
+    tools_index = ToolsIndex(fake_tools)
+
+    # duplicates are reported once, when the index is built
+    assert "Multiple tools found with names ['tool1']" in caplog.text
+    assert tools_index.duplicates == {"tool1"}
+    assert len(tools_index) == 2
+    assert "tool1" not in tools_index
+    assert "tool2" in tools_index
+    # tools with duplicate names are not provided to the LLM
+    assert [tool.name for tool in tools_index.tools] == ["tool2", "tool3"]
+    assert tools_index.get("tool3") is fake_tools[3]
 
 
 @pytest.mark.asyncio
@@ -77,7 +105,7 @@ async def test_execute_tool_call():
         "ols.src.tools.tools.get_tool_by_name", return_value=FakeTool(fake_tool_name)
     ):
         status, output = await execute_tool_call(
-            fake_tool_name, fake_tool_args, fake_tools
+            fake_tool_name, fake_tool_args, ToolsIndex(fake_tools)
         )
         assert output == "fake_output_from_fake_tool"
         assert status == "success"
@@ -86,16 +114,52 @@ async def test_execute_tool_call():
         "ols.src.tools.tools.get_tool_by_name", side_effect=Exception("Tool error")
     ):
         status, output = await execute_tool_call(
-            fake_tool_name, fake_tool_args, fake_tools
+            fake_tool_name, fake_tool_args, ToolsIndex(fake_tools)
         )
         assert "Error executing tool" in output
         assert status == "error"
 
 
+@pytest.mark.asyncio
+async def test_execute_tool_call_cached_result():
+    """Test that results of cacheable tools are reused."""
+    fake_tool = FakeTool(name="fake_tool")
+    fake_tool.metadata = {SERVER_NAME_METADATA_KEY: "fake_server"}
+    tool_results = UserToolResults(
+        "token",
+        [
+            MCPServerConfig(
+                name="fake_server",
+                transport="stdio",
+                stdio={"command": "python"},
+                cacheable_tools=["fake_tool"],
+            )
+        ],
+        ToolResultsCache(),
+    )
+
+    with patch.object(
+        FakeTool, "arun", new=AsyncMock(return_value="fake_output")
+    ) as mock_arun:
+        for args in ({"arg1": '["value1"]'}, {"arg1": ["value1"]}):
+            status, output = await execute_tool_call(
+                "fake_tool", args, ToolsIndex([fake_tool]), tool_results
+            )
+            assert status == "success"
+            assert output == "fake_output"
+        # arguments are normalized, the second call is served from cache
+        mock_arun.assert_called_once()
+
+        await execute_tool_call(
+            "fake_tool", {"arg1": "value2"}, ToolsIndex([fake_tool]), tool_results
+        )
+        assert mock_arun.call_count == 2
+
+
 @pytest.mark.asyncio
 async def test_execute_tool_calls_empty():
     """Test execute_tool_calls with empty tool calls list."""
-    tool_messages = await execute_tool_calls([], [])
+    tool_messages = await execute_tool_calls([], ToolsIndex([]))
     assert tool_messages == []
 
 
@@ -116,7 +180,7 @@ async def test_execute_tool_calls_parallel_execution():
     ]
 
     start_time = time.time()
-    tool_messages = await execute_tool_calls(tool_calls, fake_tools)
+    tool_messages = await execute_tool_calls(tool_calls, ToolsIndex(fake_tools))
     end_time = time.time()
 
     # If executed in parallel, total time should be close to 0.1s (the delay)
@@ -146,7 +210,7 @@ async def test_execute_tool_calls_with_missing_tool_name():
     with patch(
         "ols.src.tools.tools.execute_tool_call", return_value=("success", "fake_output")
     ):
-        tool_messages = await execute_tool_calls(tool_calls, fake_tools)
+        tool_messages = await execute_tool_calls(tool_calls, ToolsIndex(fake_tools))
         assert len(tool_messages) == 2
         assert tool_messages[0].content == "Error: Tool name is missing from tool call"
         assert tool_messages[0].status == "error"
@@ -178,7 +242,7 @@ async def test_execute_sensitive_tool_calls():
     ]
     fake_tools = []
 
-    tool_messages = await execute_tool_calls(tool_calls, fake_tools)
+    tool_messages = await execute_tool_calls(tool_calls, ToolsIndex(fake_tools))
 
     assert tool_messages[0].status == "error"
     assert "Sensitive keyword" in tool_messages[0].content
@@ -199,7 +263,7 @@ async def test_execute_tool_calls_mixed_success_and_failure():
         {"name": "nonexistent_tool", "args": {}, "id": "call_3"},
     ]
 
-    tool_messages = await execute_tool_calls(tool_calls, fake_tools)
+    tool_messages = await execute_tool_calls(tool_calls, ToolsIndex(fake_tools))
 
     assert len(tool_messages) == 3
 
@@ -231,7 +295,7 @@ async def test_execute_tool_calls_preserves_tool_call_order():
         {"name": "tool_b", "args": {}, "id": "call_b"},
     ]
 
-    tool_messages = await execute_tool_calls(tool_calls, fake_tools)
+    tool_messages = await execute_tool_calls(tool_calls, ToolsIndex(fake_tools))
 
     assert len(tool_messages) == 3
     # Order should match input order, not alphabetical
@@ -241,3 +305,91 @@ async def test_execute_tool_calls_preserves_tool_call_order():
     assert tool_messages[1].content == "fake_output_from_tool_a"
     assert tool_messages[2].tool_call_id == "call_b"
     assert tool_messages[2].content == "fake_output_from_tool_b"
+
+
+def test_tools_index_timeouts():
+    """Test per-server and per-tool timeouts of tool calls."""
+    fake_tools = [FakeTool(name="tool1"), FakeTool(name="tool2"), FakeTool("tool3")]
+    fake_tools[0].metadata = {SERVER_NAME_METADATA_KEY: "fake_server"}
+    fake_tools[1].metadata = {SERVER_NAME_METADATA_KEY: "fake_server"}
+    server_configs = [
+        MCPServerConfig(
+            name="fake_server",
+            transport="stdio",
+            stdio={"command": "python"},
+            tool_timeout=10,
+            tool_timeouts={"tool2": 20},
+        )
+    ]
+
+    tools_index = ToolsIndex(fake_tools, server_configs)
+
+    assert tools_index.timeout("tool1") == 10
+    assert tools_index.timeout("tool2") == 20
+    # tool not provided by configured server
+    assert tools_index.timeout("tool3") == constants.MCP_TOOL_CALL_TIMEOUT
+
+
+@pytest.mark.asyncio
+async def test_execute_tool_call_timeout():
+    """Test that tool call is interrupted after its timeout."""
+    fake_tools = [FakeTool(name="slow_tool", delay=1)]
+    tools_index = ToolsIndex(fake_tools)
+
+    with patch.object(tools_index, "timeout", return_value=0.01):
+        status, output = await execute_tool_call("slow_tool", {}, tools_index)
+
+    assert status == "error"
+    assert output == "Error executing tool 'slow_tool': timed out after 0.01 seconds"
+
+
+@pytest.mark.asyncio
+async def test_iter_tool_calls_in_completion_order():
+    """Test that tool results are provided as soon as tool calls complete."""
+    fake_tools = [
+        FakeTool(name="slow_tool", delay=0.2),
+        FakeTool(name="fast_tool", delay=0.01),
+    ]
+    tool_calls = [
+        {"name": "slow_tool", "args": {}, "id": "call_slow"},
+        {"name": "fast_tool", "args": {}, "id": "call_fast"},
+    ]
+
+    start_time = time.time()
+    stream = iter_tool_calls(tool_calls, ToolsIndex(fake_tools))
+    first = await anext(stream)
+    first_time = time.time() - start_time
+    rest = [message async for message in stream]
+
+    assert first.tool_call_id == "call_fast"
+    assert first_time < 0.15
+    assert [message.tool_call_id for message in rest] == ["call_slow"]
+
+
+@pytest.mark.asyncio
+async def test_iter_tool_calls_cancelled_on_close():
+    """Test that unfinished tool calls are cancelled when stream is closed."""
+    cancelled = asyncio.Event()
+
+    class BlockingTool(FakeTool):
+        """Tool which never completes."""
+
+        async def arun(self, tool_args=None, **kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+    fake_tools = [FakeTool(name="fast_tool"), BlockingTool(name="blocking_tool")]
+    tool_calls = [
+        {"name": "fast_tool", "args": {}, "id": "call_fast"},
+        {"name": "blocking_tool", "args": {}, "id": "call_blocking"},
+    ]
+
+    stream = iter_tool_calls(tool_calls, ToolsIndex(fake_tools))
+    first = await anext(stream)
+    await stream.aclose()
+
+    assert first.tool_call_id == "call_fast"
+    await asyncio.wait_for(cancelled.wait(), 1)
@@ -1,5 +1,7 @@
 """Unit tests for the data_collector module."""
 
+import email.parser
+import io
 import logging
 import os
 import pathlib
@@ -7,6 +9,7 @@ import tarfile
 from unittest.mock import Mock, patch
 
 import pytest
+import requests
 from requests.models import Response
 
 from ols.utils import suid
@@ -75,6 +78,22 @@ def test_collect_ols_data_from(tmp_path):
     ]
 
 
+def test_collect_ols_data_from_transcript_segments(tmp_path):
+    """Test that only closed transcript segments are collected."""
+    segments_dir = tmp_path / "transcripts" / "segments"
+    segments_dir.mkdir(parents=True)
+    (segments_dir / "20250101T000000-a.jsonl.gz").write_bytes(b"")
+    (segments_dir / "20250101T000000-b.jsonl.zst").write_bytes(b"")
+    (segments_dir / "20250101T000000-c.jsonl.gz.part").write_bytes(b"")
+
+    collected = data_collector.collect_ols_data_from(tmp_path)
+
+    assert sorted(collected) == [
+        segments_dir / "20250101T000000-a.jsonl.gz",
+        segments_dir / "20250101T000000-b.jsonl.zst",
+    ]
+
+
 def test_package_files_into_tarball(tmp_path):
     """Test the package_files_into_tarball function."""
     with open(tmp_path / "some.json", "w") as f:
@@ -98,6 +117,67 @@ def test_package_files_into_tarball(tmp_path):
     assert files == ["some.json", "extra_dir/extra.json"]
 
 
+def test_package_files_into_tarball_big_data(tmp_path):
+    """Test that big tarball is not kept in memory."""
+    create_file_with_size(tmp_path / "big.json", 2 * 1024)
+
+    with patch(
+        "ols.user_data_collection.data_collector.OLS_TARBALL_SPOOL_SIZE", new=1024
+    ):
+        tarball = data_collector.package_files_into_tarball(
+            [tmp_path / "big.json"], path_to_strip=tmp_path.as_posix()
+        )
+
+    # rolled over to temporary file
+    assert tarball._rolled
+    with tarfile.open(fileobj=tarball, mode="r:gz") as tar:
+        assert tar.getnames() == ["big.json"]
+    tarball.close()
+
+
+def test_multipart_file_body():
+    """Test that multipart body is streamed with known length."""
+    data = os.urandom(200 * 1024)
+    body = data_collector.MultipartFileBody(
+        "file", "ols.tgz", "application/vnd.redhat.ols.periodic+tar", io.BytesIO(data)
+    )
+
+    blocks = list(body)
+    # iterating again (on retry) produces the same body
+    assert list(body) == blocks
+    assert len(body) == len(b"".join(blocks))
+    assert max(len(block) for block in blocks) <= data_collector.OLS_UPLOAD_BLOCK_SIZE
+
+    # body is valid multipart form data
+    message = email.parser.BytesParser().parsebytes(
+        f"Content-Type: {body.content_type}\r\n\r\n".encode() + b"".join(blocks)
+    )
+    [part] = message.get_payload()
+    assert part.get_param("name", header="content-disposition") == "file"
+    assert part.get_filename() == "ols.tgz"
+    assert part.get_content_type() == "application/vnd.redhat.ols.periodic+tar"
+    assert part.get_payload(decode=True) == data
+
+
+def test_multipart_file_body_request():
+    """Test that the request body is streamed, not read into memory."""
+    body = data_collector.MultipartFileBody(
+        "file", "ols.tgz", "application/gzip", io.BytesIO(b"data")
+    )
+
+    request = requests.Request(
+        "POST",
+        "https://example.com",
+        data=body,
+        headers={"Content-Type": body.content_type},
+    ).prepare()
+
+    assert request.body is body
+    assert request.headers["Content-Length"] == str(len(body))
+    assert "Transfer-Encoding" not in request.headers
+    assert request.headers["Content-Type"].startswith("multipart/form-data")
+
+
 def test_delete_data(tmp_path):
     """Test the delete_data function."""
     with open(tmp_path / "some.json", "w") as f:
@@ -109,10 +189,10 @@ def test_delete_data(tmp_path):
     assert len(list(tmp_path.iterdir())) == 0
 
 
-def mock_collect_ols_data_from(data_path: str) -> list[pathlib.Path]:
+def mock_collect_ols_data_from(data_path: str, index=None) -> list[pathlib.Path]:
     """Mock collect_ols_data_from function."""
     # call the original function and get its result
-    original_result = original_collect_ols_data_from(data_path)
+    original_result = original_collect_ols_data_from(data_path, index)
 
     # create a new file
     with open(data_path + "/new_file.json", "w") as f:
@@ -231,6 +311,143 @@ def test_ensure_data_is_not_bigger_than_defined(tmpdir):
     assert len(feedback_dir.listdir()) == 2
 
 
+def set_mtime(path, mtime):
+    """Set modification time of the path (in the past, so it is not racy)."""
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Create data directory with feedback and transcripts."""
+    feedback_dir = tmp_path / "feedback"
+    feedback_dir.mkdir()
+    create_file_with_size(feedback_dir / "feedback.json", 10)
+    transcripts_dir = tmp_path / "transcripts" / "user" / "conversation"
+    transcripts_dir.mkdir(parents=True)
+    create_file_with_size(transcripts_dir / "transcript.json", 20)
+    for path in (
+        feedback_dir,
+        tmp_path / "transcripts",
+        tmp_path / "transcripts" / "user",
+        transcripts_dir,
+    ):
+        set_mtime(path, 1000)
+    return tmp_path
+
+
+def test_data_index_scan(data_dir):
+    """Test that unchanged directories are not listed again."""
+    index = data_collector.DataIndex(data_dir.as_posix())
+
+    assert index.scan() == [
+        data_dir / "feedback" / "feedback.json",
+        data_dir / "transcripts" / "user" / "conversation" / "transcript.json",
+    ]
+    assert index.total_size == 30
+    assert index.size(data_dir / "feedback" / "feedback.json") == 10
+
+    with patch(
+        "ols.user_data_collection.data_collector.os.scandir", wraps=os.scandir
+    ) as scandir:
+        assert len(index.scan()) == 2
+        scandir.assert_not_called()
+
+        # only changed directory is listed
+        create_file_with_size(data_dir / "feedback" / "new.json", 5)
+        set_mtime(data_dir / "feedback", 2000)
+        assert len(index.scan()) == 3
+        scandir.assert_called_once_with(data_dir / "feedback")
+    assert index.total_size == 35
+
+
+def test_data_index_recently_modified_directory(data_dir):
+    """Test that directory modified just before the scan is listed again."""
+    index = data_collector.DataIndex(data_dir.as_posix())
+    os.utime(data_dir / "feedback")
+    mtime = os.stat(data_dir / "feedback").st_mtime_ns
+    index.scan()
+
+    # file created in the same mtime tick does not change directory mtime
+    create_file_with_size(data_dir / "feedback" / "new.json", 5)
+    os.utime(data_dir / "feedback", ns=(mtime, mtime))
+
+    assert data_dir / "feedback" / "new.json" in index.scan()
+
+
+def test_data_index_removed_files(data_dir):
+    """Test that removed files are removed from the index."""
+    index = data_collector.DataIndex(data_dir.as_posix())
+    index.scan()
+
+    (data_dir / "feedback" / "feedback.json").unlink()
+    set_mtime(data_dir / "feedback", 2000)
+
+    assert index.scan() == [
+        data_dir / "transcripts" / "user" / "conversation" / "transcript.json"
+    ]
+    assert index.total_size == 20
+
+
+def test_data_index_stored(data_dir):
+    """Test that stored index is used after restart."""
+    index_path = data_dir / ".collector_index.json"
+    index = data_collector.DataIndex(data_dir.as_posix(), index_path=index_path)
+    files = index.scan()
+    index.save()
+
+    index = data_collector.DataIndex(data_dir.as_posix(), index_path=index_path)
+    assert index.total_size == 30
+    with patch(
+        "ols.user_data_collection.data_collector.os.scandir", wraps=os.scandir
+    ) as scandir:
+        assert index.scan() == files
+        scandir.assert_not_called()
+    # index file itself is not collected
+    assert index_path not in files
+
+
+def test_data_index_broken_index_file(data_dir, caplog):
+    """Test that broken index file is ignored."""
+    index_path = data_dir / ".collector_index.json"
+    index_path.write_text("{")
+
+    index = data_collector.DataIndex(data_dir.as_posix(), index_path=index_path)
+
+    assert "failed to load data index" in caplog.text
+    assert len(index.scan()) == 2
+
+
+def test_data_index_forget_and_oldest_first(data_dir):
+    """Test that oldest files are provided first."""
+    transcript = data_dir / "transcripts" / "user" / "conversation" / "transcript.json"
+    set_mtime(data_dir / "feedback" / "feedback.json", 2000)
+    set_mtime(transcript, 1000)
+    index = data_collector.DataIndex(data_dir.as_posix())
+    index.scan()
+
+    assert index.oldest_first() == [transcript, data_dir / "feedback" / "feedback.json"]
+
+    index.forget([transcript])
+    assert index.total_size == 10
+
+
+def test_ensure_data_dir_removes_oldest_first(data_dir):
+    """Test that the oldest files are removed to fit the data into the limit."""
+    transcript = data_dir / "transcripts" / "user" / "conversation" / "transcript.json"
+    set_mtime(data_dir / "feedback" / "feedback.json", 1000)
+    set_mtime(transcript, 2000)
+    index = data_collector.DataIndex(data_dir.as_posix())
+    index.scan()
+
+    data_collector.ensure_data_dir_is_not_bigger_than_defined(
+        data_dir.as_posix(), 25, index=index
+    )
+
+    assert not (data_dir / "feedback" / "feedback.json").exists()
+    assert transcript.exists()
+    assert index.total_size == 20
+
+
 def test_access_token_from_offline_token():
     """Test the access_token_from_offline_token function."""
     with patch("requests.post", return_value=Response()):
@@ -0,0 +1,86 @@
+"""Unit tests for BackgroundWriter."""
+
+import asyncio
+import threading
+
+import pytest
+
+from ols.utils.background_writer import BackgroundWriter
+
+
+@pytest.mark.asyncio
+async def test_writes_performed_in_background():
+    """Test that writes are performed in writer threads."""
+    writer = BackgroundWriter("test-writer", max_workers=1, max_pending=10)
+    threads = []
+
+    await writer.submit(lambda: threads.append(threading.current_thread()))
+
+    assert writer.flush(timeout=5)
+    assert len(writer) == 0
+    assert threads[0].name.startswith("test-writer")
+
+
+@pytest.mark.asyncio
+async def test_failed_write_logged(caplog):
+    """Test that failed write does not affect other writes."""
+    writer = BackgroundWriter("test-writer", max_workers=1, max_pending=1)
+    written = []
+
+    def failing_write():
+        raise OSError("disk full")
+
+    await writer.submit(failing_write)
+    await writer.submit(written.append, "data")
+
+    assert writer.flush(timeout=5)
+    assert written == ["data"]
+    assert "Background write in test-writer failed" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_submit_waits_when_too_many_writes_pending():
+    """Test that submit waits for a free slot, event loop is not blocked."""
+    writer = BackgroundWriter("test-writer", max_workers=1, max_pending=1)
+    unblock = threading.Event()
+
+    await writer.submit(unblock.wait)
+    submit = asyncio.create_task(writer.submit(lambda: None))
+    await asyncio.sleep(0.05)
+
+    # loop is still running, submit is waiting
+    assert not submit.done()
+    unblock.set()
+    await asyncio.wait_for(submit, timeout=5)
+    assert writer.flush(timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_submit_returns_slot():
+    """Test that slot is not lost when waiting submit is cancelled."""
+    writer = BackgroundWriter("test-writer", max_workers=1, max_pending=1)
+    unblock = threading.Event()
+
+    await writer.submit(unblock.wait)
+    submit = asyncio.create_task(writer.submit(lambda: None))
+    await asyncio.sleep(0.05)
+    submit.cancel()
+    unblock.set()
+    assert writer.flush(timeout=5)
+
+    written = []
+    await asyncio.wait_for(writer.submit(written.append, "data"), timeout=5)
+    assert writer.flush(timeout=5)
+    assert written == ["data"]
+
+
+def test_flush_timeout():
+    """Test that flush reports writes not finished in time."""
+    writer = BackgroundWriter("test-writer", max_workers=1, max_pending=1)
+    unblock = threading.Event()
+
+    asyncio.run(writer.submit(unblock.wait))
+
+    assert not writer.flush(timeout=0.01)
+    unblock.set()
+    assert writer.flush(timeout=5)
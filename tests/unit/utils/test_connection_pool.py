@@ -0,0 +1,109 @@
+"""Unit tests for ConnectionPool."""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from ols.utils.connection_pool import ConnectionPool, PoolError, PoolTimeoutError
+
+
+def make_pool(min_size=0, max_size=2, timeout=5):
+    """Create pool of mocked connections."""
+    connect = MagicMock(side_effect=lambda: MagicMock(closed=0))
+    return ConnectionPool(connect, min_size, max_size, timeout), connect
+
+
+def test_min_connections_opened():
+    """Test that minimal number of connections is opened upfront."""
+    pool, connect = make_pool(min_size=2)
+
+    assert len(pool) == 2
+    assert connect.call_count == 2
+
+
+def test_idle_connection_reused():
+    """Test that returned connection is handed out again."""
+    pool, connect = make_pool()
+
+    conn, reused = pool.get()
+    assert not reused
+    pool.put(conn)
+
+    assert pool.get() == (conn, True)
+    assert connect.call_count == 1
+
+
+def test_discarded_connection_closed():
+    """Test that discarded and closed connections are not reused."""
+    pool, connect = make_pool()
+
+    conn, _ = pool.get()
+    pool.put(conn, discard=True)
+    conn.close.assert_called_once_with()
+    assert len(pool) == 0
+
+    conn, _ = pool.get()
+    conn.closed = 1
+    pool.put(conn)
+    assert len(pool) == 0
+
+    _, reused = pool.get()
+    assert not reused
+    assert connect.call_count == 3
+
+
+def test_get_times_out_when_all_connections_used():
+    """Test that no more than max_size connections are opened."""
+    pool, connect = make_pool(max_size=1)
+
+    pool.get()
+    with pytest.raises(PoolTimeoutError, match="all 1 connections are in use"):
+        pool.get(timeout=0.01)
+    assert connect.call_count == 1
+
+
+def test_get_waits_for_returned_connection():
+    """Test that waiting thread gets the connection returned by other thread."""
+    pool, _ = make_pool(max_size=1)
+    conn, _ = pool.get()
+
+    timer = threading.Timer(0.05, pool.put, (conn,))
+    timer.start()
+    start = time.monotonic()
+
+    assert pool.get() == (conn, True)
+    assert time.monotonic() - start >= 0.04
+    timer.join()
+
+
+def test_failed_connect_frees_slot():
+    """Test that failure to connect does not leak the slot."""
+    pool, connect = make_pool(max_size=1)
+    connect.side_effect = OSError("unreachable")
+
+    with pytest.raises(OSError, match="unreachable"):
+        pool.get()
+    assert len(pool) == 0
+
+    connect.side_effect = None
+    pool.get(timeout=0)
+
+
+def test_closed_pool():
+    """Test that connections are closed with the pool."""
+    pool, _ = make_pool()
+    idle, _ = pool.get()
+    used, _ = pool.get()
+    pool.put(idle)
+
+    pool.close()
+
+    idle.close.assert_called_once_with()
+    with pytest.raises(PoolError, match="closed"):
+        pool.get()
+    # connection used while closing is closed when returned
+    pool.put(used)
+    used.close.assert_called_once_with()
+    assert len(pool) == 0
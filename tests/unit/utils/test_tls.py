@@ -1,5 +1,6 @@
 """Unit tests for TLS security profiles manipulation."""
 
+import os
 import ssl
 
 import pytest
@@ -165,3 +166,35 @@ def test_ciphers_as_string_with_default(ciphers_for_tls_profile):
     expected_ciphers = ciphers
     for expected_cipher in expected_ciphers:
         assert expected_cipher in ciphers
+
+
+def test_ssl_context_cached(tmpdir):
+    """Check that SSL contexts with the same settings are shared."""
+    cafile = tmpdir / "ca.crt"
+    with open("tests/unit/extra_certs/sample_cert_1.crt", "rb") as cert_file:
+        cafile.write_binary(cert_file.read())
+
+    context = tls.ssl_context(cafile=str(cafile), check_hostname=False)
+    assert not context.check_hostname
+    assert tls.ssl_context(cafile=str(cafile), check_hostname=False) is context
+
+    # different settings need different context
+    assert tls.ssl_context(cafile=str(cafile)) is not context
+    other_context = tls.ssl_context(
+        cafile=str(cafile),
+        check_hostname=False,
+        minimum_version=ssl.TLSVersion.TLSv1_2,
+    )
+    assert other_context is not context
+    assert other_context.minimum_version == ssl.TLSVersion.TLSv1_2
+
+    # regenerated CA file needs to be loaded again
+    stat = os.stat(cafile)
+    os.utime(cafile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert tls.ssl_context(cafile=str(cafile), check_hostname=False) is not context
+
+
+def test_ssl_context_missing_cafile():
+    """Check that missing CA file is reported."""
+    with pytest.raises(FileNotFoundError):
+        tls.ssl_context(cafile="/this/does/not/exist.crt")
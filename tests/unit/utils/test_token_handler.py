@@ -6,7 +6,7 @@ from unittest import TestCase, mock
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
-from ols.constants import TOKEN_BUFFER_WEIGHT
+from ols.constants import HISTORY_MESSAGE_TOKENS_COUNT_KEY, TOKEN_BUFFER_WEIGHT
 from ols.utils.token_handler import PromptTooLongError, TokenHandler
 from tests.mock_classes.mock_retrieved_node import MockRetrievedNode
 
@@ -108,6 +108,20 @@ class TestTokenHandler(TestCase):
             - ceil(prompt_length * TOKEN_BUFFER_WEIGHT)
         )
         assert available_tokens == expected_value
+        assert self._token_handler_obj.prompt_budget.instructions == prompt_length
+
+    def test_check_prompt_budget(self):
+        """Test the check of prompt assembled from already counted parts."""
+        budget = self._token_handler_obj.prompt_budget
+        budget.instructions = 100
+        budget.rag_context = 200
+        budget.history = 100
+
+        available_tokens = self._token_handler_obj.check_prompt_budget(500, 20)
+        assert available_tokens == 500 - 20 - ceil(400 * TOKEN_BUFFER_WEIGHT)
+
+        with pytest.raises(PromptTooLongError):
+            self._token_handler_obj.check_prompt_budget(400, 20)
 
     @mock.patch("ols.utils.token_handler.TOKEN_BUFFER_WEIGHT", 1.05)
     @mock.patch("ols.utils.token_handler.MINIMUM_CONTEXT_TOKEN_LIMIT", 1)
@@ -165,6 +179,12 @@ class TestTokenHandler(TestCase):
         )
         assert available_tokens == 0
 
+        # only tokens of the (truncated) chunks are counted
+        assert self._token_handler_obj.prompt_budget.rag_context == sum(
+            len(self._token_handler_obj.text_to_tokens(chunk.text))
+            for chunk in rag_chunks
+        )
+
     @mock.patch("ols.utils.token_handler.TOKEN_BUFFER_WEIGHT", 1.05)
     @mock.patch("ols.utils.token_handler.RAG_SIMILARITY_CUTOFF", 0.4)
     @mock.patch("ols.utils.token_handler.MINIMUM_CONTEXT_TOKEN_LIMIT", 3)
@@ -224,6 +244,12 @@ class TestTokenHandler(TestCase):
         assert truncated_history == history[2:]
         assert truncated
 
+        # only tokens of the messages kept in history are counted
+        assert self._token_handler_obj.prompt_budget.history == sum(
+            len(self._token_handler_obj.text_to_tokens(f"{m.type}: {m.content}"))
+            for m in truncated_history
+        )
+
         # try to truncate to 14 tokens
         truncated_history, truncated = (
             self._token_handler_obj.limit_conversation_history(history, 16)
@@ -266,3 +292,41 @@ class TestTokenHandler(TestCase):
         # history should truncate to empty list and flag should be True
         assert truncated_history == []
         assert truncated
+
+    def test_message_tokens_count(self):
+        """Check that tokens count stored in message metadata is used."""
+        message = HumanMessage("  first message from human\n")
+        expected = len(
+            self._token_handler_obj.text_to_tokens("human: first message from human")
+        )
+        assert self._token_handler_obj.message_tokens_count(message) == expected
+
+        self._token_handler_obj.store_message_tokens_count(message)
+        assert message.response_metadata[HISTORY_MESSAGE_TOKENS_COUNT_KEY] == expected
+
+        with mock.patch.object(self._token_handler_obj, "text_to_tokens") as encode:
+            assert self._token_handler_obj.message_tokens_count(message) == expected
+            encode.assert_not_called()
+
+    @mock.patch("ols.utils.token_handler.TOKEN_BUFFER_WEIGHT", 1.05)
+    def test_limit_conversation_history_stored_tokens_count(self):
+        """Check that history is limited by tokens count stored with messages."""
+        history = [
+            HumanMessage("first message from human"),
+            AIMessage("first answer from AI"),
+            HumanMessage("second message from human"),
+            AIMessage("second answer from AI"),
+        ]
+        for message in history:
+            message.response_metadata[HISTORY_MESSAGE_TOKENS_COUNT_KEY] = 9
+        # each message counts as ceil(9 * 1.05) + 1 (new-line) = 11 tokens
+
+        with mock.patch.object(self._token_handler_obj, "text_to_tokens") as encode:
+            truncated_history, truncated = (
+                self._token_handler_obj.limit_conversation_history(history, 33)
+            )
+            encode.assert_not_called()
+
+        assert truncated_history == history[1:]
+        assert truncated
+        assert self._token_handler_obj.prompt_budget.history == 27
@@ -0,0 +1,138 @@
+"""Unit tests for transcript segments."""
+
+import fcntl
+import gzip
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+import zstandard
+
+from ols.app.models.config import TranscriptSegmentsConfig
+from ols.utils.transcript_segments import (
+    SegmentWriter,
+    close_segment_writers,
+    get_segment_writer,
+)
+
+
+def read_segment(path):
+    """Read records from segment file."""
+    data = path.read_bytes()
+    if path.name.endswith(".gz"):
+        data = gzip.decompress(data)
+    elif path.name.endswith(".zst"):
+        data = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)).read()
+    return [json.loads(line) for line in data.decode("utf-8").splitlines()]
+
+
+def make_writer(tmp_path, **options):
+    """Create writer not flushing periodically."""
+    writer = SegmentWriter(
+        tmp_path, TranscriptSegmentsConfig(flush_interval=3600, **options)
+    )
+    writer.start()
+    return writer
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip", "zstd"])
+def test_records_appended_to_segment(tmp_path, compression):
+    """Test that records from more flushes are stored in one segment."""
+    writer = make_writer(tmp_path, compression=compression)
+
+    writer.append({"query": "first"})
+    writer.flush()
+    writer.append({"query": "žluťoučký"})
+    writer.flush()
+
+    # segment being written is not closed yet
+    assert [path.suffix for path in tmp_path.iterdir()] == [".part"]
+
+    writer.close()
+
+    segments = list(tmp_path.iterdir())
+    assert len(segments) == 1
+    assert segments[0].name.endswith(
+        {"none": ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}[compression]
+    )
+    assert read_segment(segments[0]) == [{"query": "first"}, {"query": "žluťoučký"}]
+
+
+def test_nothing_written_without_records(tmp_path):
+    """Test that no empty segments are created."""
+    writer = make_writer(tmp_path)
+
+    writer.flush()
+    writer.close()
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_segment_closed_when_full(tmp_path):
+    """Test that new segment is opened when the segment is full."""
+    writer = make_writer(tmp_path, max_bytes=1, compression="none")
+
+    writer.append({"query": "first"})
+    writer.flush()
+    writer.append({"query": "second"})
+    writer.flush()
+
+    records = [read_segment(segment) for segment in tmp_path.iterdir()]
+    assert sorted(records, key=str) == [[{"query": "first"}], [{"query": "second"}]]
+    writer.close()
+
+
+def test_segment_closed_when_old(tmp_path):
+    """Test that segment is closed after its max age, even without new records."""
+    writer = make_writer(tmp_path, max_age=10)
+
+    with patch("ols.utils.transcript_segments.time.monotonic", return_value=100):
+        writer.append({"query": "first"})
+        writer.flush()
+    with patch("ols.utils.transcript_segments.time.monotonic", return_value=110):
+        writer.flush()
+
+    segments = list(tmp_path.iterdir())
+    assert len(segments) == 1
+    assert segments[0].name.endswith(".jsonl.gz")
+    writer.close()
+
+
+def test_flushed_when_too_much_buffered(tmp_path):
+    """Test that records are written immediately when buffer is full."""
+    writer = make_writer(tmp_path, max_buffered_bytes=10, compression="none")
+
+    writer.append({"query": "long enough"})
+
+    segments = list(tmp_path.iterdir())
+    assert read_segment(segments[0]) == [{"query": "long enough"}]
+    writer.close()
+
+
+def test_segments_of_terminated_writers_recovered(tmp_path):
+    """Test that segments left by terminated writers are closed."""
+    (tmp_path / "orphan.jsonl.gz.part").write_bytes(gzip.compress(b"{}\n"))
+    (tmp_path / "empty.jsonl.gz.part").write_bytes(b"")
+    with open(tmp_path / "active.jsonl.gz.part", "ab") as active:
+        fcntl.flock(active, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        make_writer(tmp_path).close()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "active.jsonl.gz.part",
+        "orphan.jsonl.gz",
+    ]
+
+
+def test_get_segment_writer(tmp_path):
+    """Test that one writer is used for the storage."""
+    segments_config = TranscriptSegmentsConfig()
+    writer = get_segment_writer(str(tmp_path), segments_config)
+
+    assert get_segment_writer(str(tmp_path), segments_config) is writer
+    writer.append({"query": "bla"})
+    close_segment_writers()
+
+    segments = list((tmp_path / "segments").iterdir())
+    assert read_segment(segments[0]) == [{"query": "bla"}]